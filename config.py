@@ -3,6 +3,17 @@ from functools import lru_cache
 from pydantic import BaseModel, Field
 
 
+def _parse_int_map(raw: str) -> dict[str, int]:
+    # "kilter=3600,tension=86400" -> {"kilter": 3600, "tension": 86400}
+    out: dict[str, int] = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        key, value = item.split("=", 1)
+        out[key.strip().lower()] = int(value)
+    return out
+
+
 class Settings(BaseModel):
     # --------------------
     # Environment
@@ -33,6 +44,131 @@ class Settings(BaseModel):
     image_cache_dir: str = Field(
         default_factory=lambda: os.getenv("IMAGE_CACHE_DIR", "data/render_cache")
     )
+    # How often the rendered image index is re-listed from the images bucket
+    rendered_index_reconcile_seconds: int = Field(
+        default_factory=lambda: int(os.getenv("RENDERED_INDEX_RECONCILE_SECONDS", "21600"))
+    )
+    # Memory budget for decoded base board images kept between renders
+    base_image_cache_bytes: int = Field(
+        default_factory=lambda: int(os.getenv("BASE_IMAGE_CACHE_BYTES", str(256 * 1024 * 1024)))
+    )
+
+    # Where built board DBs are cached: "supabase", "local:<dir>" or "none"
+    board_artifact_store: str = Field(
+        default_factory=lambda: os.getenv("BOARD_ARTIFACT_STORE", "supabase")
+    )
+
+    # --------------------
+    # Board DB freshness
+    # --------------------
+    # Age after which a board DB is refreshed in the background (<= 0 disables)
+    board_db_ttl_seconds: int = Field(
+        default_factory=lambda: int(os.getenv("BOARD_DB_TTL_SECONDS", "86400"))
+    )
+    # Per-board overrides, e.g. BOARD_DB_TTL_OVERRIDES="kilter=21600,tension=86400"
+    board_db_ttl_overrides: dict[str, int] = Field(
+        default_factory=lambda: _parse_int_map(os.getenv("BOARD_DB_TTL_OVERRIDES", ""))
+    )
+
+    # "delta" applies only changed rows to a copy of the current DB; "full" re-runs boardlib
+    board_db_sync_mode: str = Field(
+        default_factory=lambda: os.getenv("BOARD_DB_SYNC_MODE", "delta")
+    )
+
+    # Worker threads for async board DB build jobs (/board-db/jobs)
+    board_job_workers: int = Field(
+        default_factory=lambda: int(os.getenv("BOARD_JOB_WORKERS", "2"))
+    )
+
+    # Per-connection tuning for pooled read-only board DB connections
+    sqlite_mmap_bytes: int = Field(
+        default_factory=lambda: int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 * 1024)))
+    )
+    sqlite_cache_kib: int = Field(
+        default_factory=lambda: int(os.getenv("SQLITE_CACHE_KIB", str(64 * 1024)))
+    )
+
+    # Serve climb lookups from an in-memory index per DB generation ("0" → SQL per request)
+    climb_index_enabled: bool = Field(
+        default_factory=lambda: os.getenv("CLIMB_INDEX_ENABLED", "1") != "0"
+    )
+
+    # --------------------
+    # Startup warm-up
+    # --------------------
+    # Boards × capabilities built/validated at startup, e.g. WARMUP_BOARDS="tension,decoy"
+    warmup_boards: list[str] = Field(
+        default_factory=lambda: [
+            b.strip().lower() for b in os.getenv("WARMUP_BOARDS", "").split(",") if b.strip()
+        ]
+    )
+    warmup_capabilities: list[str] = Field(
+        default_factory=lambda: [
+            c.strip() for c in os.getenv("WARMUP_CAPABILITIES", "catalog,layouts").split(",") if c.strip()
+        ]
+    )
+    warmup_workers: int = Field(default_factory=lambda: int(os.getenv("WARMUP_WORKERS", "4")))
+
+    # --------------------
+    # Aurora API
+    # --------------------
+    # Overrides the board's Aurora host (e.g. a local stand-in for the sync endpoint)
+    aurora_api_base_url: str = Field(default_factory=lambda: os.getenv("AURORA_API_BASE_URL", ""))
+    aurora_max_sync_pages: int = Field(
+        default_factory=lambda: int(os.getenv("AURORA_MAX_SYNC_PAGES", "100"))
+    )
+    # In-memory Aurora login sessions, per (board, username)
+    aurora_session_ttl_seconds: int = Field(
+        default_factory=lambda: int(os.getenv("AURORA_SESSION_TTL_SECONDS", "43200"))
+    )
+    aurora_session_renew_seconds: int = Field(
+        default_factory=lambda: int(os.getenv("AURORA_SESSION_RENEW_SECONDS", "300"))
+    )
+    aurora_session_cache_size: int = Field(
+        default_factory=lambda: int(os.getenv("AURORA_SESSION_CACHE_SIZE", "1024"))
+    )
+
+    # In-process boardlib logbook fetches (/fetch-user-board-data)
+    logbook_workers: int = Field(default_factory=lambda: int(os.getenv("LOGBOOK_WORKERS", "4")))
+    # Separate pool for /fetch-user-board-data/batch, so batches can't starve single syncs
+    logbook_batch_workers: int = Field(
+        default_factory=lambda: int(os.getenv("LOGBOOK_BATCH_WORKERS", "2"))
+    )
+    logbook_timeout_seconds: int = Field(
+        default_factory=lambda: int(os.getenv("LOGBOOK_TIMEOUT_SECONDS", "90"))
+    )
+    # Per-board Aurora rate limit for logbook syncs: concurrent users + spacing between starts
+    logbook_board_concurrency: int = Field(
+        default_factory=lambda: int(os.getenv("LOGBOOK_BOARD_CONCURRENCY", "2"))
+    )
+    logbook_board_min_interval_seconds: float = Field(
+        default_factory=lambda: float(os.getenv("LOGBOOK_BOARD_MIN_INTERVAL_SECONDS", "0.5"))
+    )
+
+    # --------------------
+    # Admission control (build / fetch / render / read lanes)
+    # --------------------
+    # Running requests per lane, e.g. ADMISSION_LANE_CONCURRENCY="render=2,read=32"
+    admission_lane_concurrency: dict[str, int] = Field(
+        default_factory=lambda: {
+            "build": 2, "fetch": 4, "render": 4, "read": 16,
+            **_parse_int_map(os.getenv("ADMISSION_LANE_CONCURRENCY", "")),
+        }
+    )
+    # Requests allowed to wait behind them before a lane answers 503
+    admission_lane_queue: dict[str, int] = Field(
+        default_factory=lambda: {
+            "build": 4, "fetch": 8, "render": 8, "read": 32,
+            **_parse_int_map(os.getenv("ADMISSION_LANE_QUEUE", "")),
+        }
+    )
+    # Longest a queued request waits for a slot
+    admission_queue_timeouts: dict[str, int] = Field(
+        default_factory=lambda: {
+            "build": 300, "fetch": 60, "render": 30, "read": 10,
+            **_parse_int_map(os.getenv("ADMISSION_QUEUE_TIMEOUTS", "")),
+        }
+    )
 
     # --------------------
     # CORS
@@ -41,6 +177,9 @@ class Settings(BaseModel):
         default_factory=lambda: os.getenv("CORS_ORIGINS", "*").split(",")
     )
 
+    def board_db_ttl_for(self, board: str) -> int:
+        return self.board_db_ttl_overrides.get(board.lower(), self.board_db_ttl_seconds)
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -7,6 +7,7 @@ settings = get_settings()
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import sys
 import logging
 
@@ -18,6 +19,10 @@ from routes.sync_public import router as sync_public_router
 from routes.export_board import router as export_board_router
 from routes.sync_images import router as sync_images_router
 from routes.render_climb_image import router as render_images_router
+from routes.board_db import router as board_db_router
+from routes.climbs_batch import router as climbs_batch_router
+from routes.board_stats import router as board_stats_router
+from services.board_warmup import start_board_warmup, is_warm, warmup_status
 
 # load_dotenv()
 
@@ -32,6 +37,11 @@ def _startup_check():
     except Exception:
         log.exception("❌ boardlib import FAILED")
 
+@app.on_event("startup")
+def _startup_warmup():
+    # runs in the background; "/" reports 503 until it finishes
+    start_board_warmup()
+
 # --- CORS (allow Express backend for now — tighten in prod) ---
 app.add_middleware(
     CORSMiddleware,
@@ -44,11 +54,22 @@ app.add_middleware(
 # --- Root route (health check) ---
 @app.get("/")
 def root():
-    return {"message": "Board service running"}
+    ready = is_warm()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "message": "Board service running",
+            "ready": ready,
+            "warmup": warmup_status(),
+        },
+    )
 
 # --- Register routers ---
 app.include_router(import_private_router)
 app.include_router(sync_public_router)
 app.include_router(export_board_router)
 app.include_router(sync_images_router)
-app.include_router(render_images_router)
\ No newline at end of file
+app.include_router(render_images_router)
+app.include_router(board_db_router)
+app.include_router(climbs_batch_router)
+app.include_router(board_stats_router)
\ No newline at end of file
@@ -0,0 +1,206 @@
+import queue
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import Iterator
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from services.build_sqlite import (
+    build_or_download_board_db,
+    check_board_name,
+    get_build_stats,
+    get_ready_board_db,
+)
+from services.board_jobs import get_board_db_job, submit_board_db_job
+from services.admission import LaneFull, admission_lane, get_admission_stats
+from services.aurora_sessions import get_session_cache_stats
+from services.base_image_cache import get_base_image_cache_stats
+from services.climb_index import get_climb_index_stats
+from services.db_pool import get_pool_stats
+from services.rendered_images import get_rendered_index_stats
+
+router = APIRouter(tags=["Board DB"])
+
+_END_OF_STREAM = object()
+
+
+class BoardDbJobRequest(BaseModel):
+    board: str
+    require: str = "catalog"  # layouts | catalog | geometry | logbook
+    username: str | None = None
+    password: str | None = None
+
+
+# ---------------------------------------------------
+# Helpers (shared with the other routes)
+# ---------------------------------------------------
+
+def job_accepted_response(job: dict) -> JSONResponse:
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "pending",
+            "job": job,
+            "poll_url": f"/board-db/jobs/{job['id']}",
+        },
+    )
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+@contextmanager
+def lane_or_503(lane: str):
+    """
+    admission_lane() for routes: a full lane is a 503 with Retry-After.
+    """
+    with ExitStack() as stack:
+        try:
+            stack.enter_context(admission_lane(lane))
+        except LaneFull as e:
+            raise HTTPException(
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        yield
+
+
+def stream_in_lane(lane: str, chunks: Iterator) -> Iterator:
+    """
+    A streamed body whose chunks are produced while holding a `lane`
+    slot. The slot is taken and the first chunk produced before
+    returning, so a full lane (503) or a failing query is raised before
+    the response starts. The rest is produced on a background thread into
+    a buffer the response drains: the slot is released once the query is
+    done, not when a slow client has read the last byte.
+    """
+    with ExitStack() as stack:
+        stack.enter_context(lane_or_503(lane))
+        first = next(chunks, None)
+        slot = stack.pop_all()
+
+    if first is None:
+        slot.close()
+        return iter(())
+
+    buffered: queue.Queue = queue.Queue()
+    abandoned = threading.Event()
+
+    def produce():
+        with slot:
+            try:
+                for chunk in chunks:
+                    if abandoned.is_set():
+                        break  # client went away
+                    buffered.put(chunk)
+            except Exception as e:
+                buffered.put(e)
+            finally:
+                if hasattr(chunks, "close"):
+                    chunks.close()
+                buffered.put(_END_OF_STREAM)
+
+    def stream():
+        try:
+            yield first
+            while (chunk := buffered.get()) is not _END_OF_STREAM:
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            abandoned.set()
+
+    threading.Thread(target=produce, name=f"stream-{lane}", daemon=True).start()
+    return stream()
+
+
+def board_name_or_400(board: str) -> str:
+    try:
+        return check_board_name(board)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def resolve_board_db(
+    board: str,
+    *,
+    require: str,
+    username: str | None = None,
+    password: str | None = None,
+    wait: bool = True,
+) -> str | JSONResponse:
+    """
+    wait=True  → block until a DB is built (previous behaviour), through
+                 the build lane unless a ready DB exists
+    wait=False → the ready DB path, or a 202 response with a build job
+    """
+    board_name_or_400(board)
+    db_path = get_ready_board_db(board, require=require, username=username, password=password)
+    if db_path:
+        return db_path
+
+    if wait:
+        with lane_or_503("build"):
+            return build_or_download_board_db(
+                board=board,
+                username=username,
+                password=password,
+                require=require,
+            )
+
+    return job_accepted_response(
+        submit_board_db_job(board, require=require, username=username, password=password)
+    )
+
+
+# ---------------------------------------------------
+# Routes
+# ---------------------------------------------------
+
+@router.get("/board-db/stats")
+def board_db_stats():
+    """
+    Build coordination counters (builds, coalesced requests, lock waits),
+    read-only connection pool usage, climb index memory per board,
+    admission lane queue/wait metrics, the rendered image index and the
+    decoded base image cache.
+    """
+    return {
+        **get_build_stats(),
+        "pools": get_pool_stats(),
+        "climb_index": get_climb_index_stats(),
+        "aurora_sessions": get_session_cache_stats(),
+        "admission": get_admission_stats(),
+        "rendered_images": get_rendered_index_stats(),
+        "base_images": get_base_image_cache_stats(),
+    }
+
+
+@router.post("/board-db/jobs", status_code=202)
+def create_board_db_job(payload: BoardDbJobRequest):
+    """
+    Enqueue a board DB build. Returns the board's existing job if one is
+    running (it then also builds this capability). Poll the job from any
+    worker; `progress` is the current build phase.
+    """
+    return submit_board_db_job(
+        board_name_or_400(payload.board.lower().strip()),
+        require=payload.require,
+        username=payload.username,
+        password=payload.password,
+    )
+
+
+@router.get("/board-db/jobs/{job_id}")
+def board_db_job_status(job_id: str):
+    job = get_board_db_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
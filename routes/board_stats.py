@@ -0,0 +1,82 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from routes.board_db import lane_or_503, resolve_board_db
+from services.board_stats import get_board_stats
+
+router = APIRouter(tags=["Board Stats"])
+
+
+@router.get("/boards/{board}/stats")
+def board_stats(
+    board: str,
+    layout_id: int | None = Query(None, description="Only this layout"),
+    angle: int | None = Query(None, description="Only this angle"),
+    username: str | None = Query(
+        None,
+        description="Board username (required for some boards)",
+    ),
+    password: str | None = Query(
+        None,
+        description="Board password (required for some boards)",
+    ),
+    wait: bool = Query(
+        True,
+        description="If false and the DB isn't built yet, return 202 with a build job",
+    ),
+):
+    """
+    Grade distributions and top climbs per layout + angle, and setter
+    counts per layout, precomputed when the board DB was built.
+    """
+    board = board.lower().strip()
+
+    try:
+        db_path = resolve_board_db(
+            board,
+            require="catalog",
+            username=username,
+            password=password,
+            wait=wait,
+        )
+        if isinstance(db_path, JSONResponse):
+            return db_path
+
+        with lane_or_503("read"):
+            stats = get_board_stats(board, db_path)
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to load stats for board '{board}': {str(e)}",
+        )
+
+    if stats is None:
+        raise HTTPException(
+            status_code=404,
+            detail=(
+                f"No stats for '{board}' yet (DB generation predates the stats "
+                "stage and is being reprocessed; retry shortly)"
+            ),
+        )
+
+    layouts = stats["layouts"]
+    if layout_id is not None:
+        layouts = {layout_id: layouts[layout_id]} if layout_id in layouts else {}
+    if angle is not None:
+        layouts = {
+            lid: {
+                **layout,
+                "angles": {angle: layout["angles"][angle]} if angle in layout["angles"] else {},
+            }
+            for lid, layout in layouts.items()
+        }
+
+    return {
+        "board": board,
+        "generation": stats["generation"],
+        "layouts": layouts,
+    }
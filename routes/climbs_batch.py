@@ -0,0 +1,69 @@
+import json
+from typing import List
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from routes.board_db import resolve_board_db, stream_in_lane
+from services.climb_loader import iter_climbs_from_db
+
+router = APIRouter(tags=["Climbs"])
+
+MAX_BATCH_UUIDS = 5000
+
+
+class ClimbBatchRequest(BaseModel):
+    board: str
+    climb_uuids: List[str]
+    wait: bool = True  # False → 202 + build job if the DB isn't ready
+
+
+def _stream_batch(board: str, db_path: str, climb_uuids: list[str]):
+    """
+    {"board": ..., "climbs": [...], "missing": [...], "count": n}
+    written as the records are read.
+    """
+    found: set[str] = set()
+    yield f'{{"board": {json.dumps(board)}, "climbs": ['
+    for i, climb in enumerate(iter_climbs_from_db(db_path, climb_uuids)):
+        found.add(climb["uuid"])
+        yield ("," if i else "") + json.dumps(climb)
+    missing = [u for u in climb_uuids if u not in found]
+    yield f'], "missing": {json.dumps(missing)}, "count": {len(found)}}}'
+
+
+@router.post("/climbs/batch")
+def climbs_batch(payload: ClimbBatchRequest):
+    """
+    Resolve many climbs (with base_image_filename) in one request.
+    """
+    board = payload.board.lower().strip()
+    climb_uuids = list(dict.fromkeys(u for u in payload.climb_uuids if u))
+
+    if not climb_uuids:
+        raise HTTPException(status_code=400, detail="climb_uuids is empty")
+    if len(climb_uuids) > MAX_BATCH_UUIDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_BATCH_UUIDS} climb_uuids per request",
+        )
+
+    try:
+        db_path = resolve_board_db(board, require="layouts", wait=payload.wait)
+        if isinstance(db_path, JSONResponse):
+            return db_path
+
+        return StreamingResponse(
+            stream_in_lane("read", _stream_batch(board, db_path, climb_uuids)),
+            media_type="application/json",
+        )
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to load climbs for board '{board}': {str(e)}",
+        )
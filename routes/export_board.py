@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Query, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+from fastapi.responses import FileResponse, JSONResponse
 import os
 
-from services.build_sqlite import build_or_download_board_db
+from routes.board_db import etag_matches, lane_or_503, resolve_board_db
+from services.board_exports import get_board_export
 
 router = APIRouter(tags=["Board DB Export"])
 
 
 @router.get("/export-board-db")
 def export_board_db(
+    request: Request,
     board: str = Query(..., description="Board name (e.g. tension, kilter)"),
     require: str = Query(
         "logbook",
@@ -23,23 +25,35 @@ def export_board_db(
         None,
         description="Board password (required for some boards)",
     ),
+    wait: bool = Query(
+        True,
+        description="If false and the DB isn't built yet, return 202 with a build job",
+    ),
 ):
     """
-    Export a validated board SQLite DB.
+    Export a validated board SQLite DB, trimmed to the tables the
+    capability needs.
 
     - images   → image + layout tables
     - logbook  → climbs + layouts + attempts resolution
+
+    Sends a strong ETag (content hash), answers If-None-Match with 304,
+    supports Range, and serves a precompressed gzip body when the client
+    accepts it (whole-file requests only).
     """
 
     board = board.lower().strip()
 
     try:
-        db_path = build_or_download_board_db(
-            board=board,
+        db_path = resolve_board_db(
+            board,
+            require=require,
             username=username,
             password=password,
-            require=require,
+            wait=wait,
         )
+        if isinstance(db_path, JSONResponse):
+            return db_path
 
         if not os.path.exists(db_path):
             raise HTTPException(
@@ -47,10 +61,31 @@ def export_board_db(
                 detail=f"DB file not found after build: {db_path}",
             )
 
+        with lane_or_503("read"):
+            export = get_board_export(board, db_path, require)
+
+        use_gzip = (
+            "range" not in request.headers
+            and "gzip" in request.headers.get("accept-encoding", "").lower()
+        )
+        etag = f'"{export["gz_sha256"] if use_gzip else export["sha256"]}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+
         return FileResponse(
-            path=db_path,
+            path=export["gz_path"] if use_gzip else export["path"],
             filename=f"{board}.db",
             media_type="application/octet-stream",
+            headers=headers,
         )
 
     except HTTPException:
@@ -1,13 +1,16 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import sqlite3
 import os
 from supabase import create_client, Client
+from storage3.exceptions import StorageApiError
 from config import get_settings
-from services.build_sqlite import build_or_download_board_db
+from routes.board_db import lane_or_503, resolve_board_db
 from services.build_climb_image import build_climb_image
 from services.climb_loader import load_climb_from_db
 from services.board_assets import resolve_board_image_path
+from services.rendered_images import is_rendered, mark_rendered
 import tempfile
 
 # ---------------------------------------------------
@@ -33,6 +36,7 @@ class RenderClimbRequest(BaseModel):
     board: str
     climb_uuid: str
     force: bool = False
+    wait: bool = True  # False → 202 + build job if the DB isn't ready
 
 def dict_from_row(row: sqlite3.Row) -> dict:
     return {k: row[k] for k in row.keys()}
@@ -50,53 +54,61 @@ def render_climb_image_endpoint(payload: RenderClimbRequest):
     # 2️⃣ Return cached image unless forced
     if not force:
         try:
-            bucket = settings.supabase_bucket
-            existing = supabase.storage.from_(bucket).list(board)
-            if any(obj["name"] == f"{climb_uuid}.png" for obj in existing):
-                public_url = supabase.storage.from_(bucket).get_public_url(
-                    supabase_path
-                )
+            bucket = supabase.storage.from_(settings.supabase_bucket)
+            # local index of rendered keys, reconciled with the bucket in the background
+            if is_rendered(board, climb_uuid, bucket):
+                public_url = bucket.get_public_url(supabase_path)
                 return {
                     "status": "cached",
                     "image_url": public_url,
                     "climb_uuid": climb_uuid,
                 }
         except Exception:
-            # Storage list failure should not crash render
+            # Storage lookup failure should not crash render
             pass
 
     # 3️⃣ Load board DB
-    db_path = build_or_download_board_db(board=board, require="layouts")
+    db_path = resolve_board_db(board, require="layouts", wait=payload.wait)
+    if isinstance(db_path, JSONResponse):
+        return db_path
 
     climb = load_climb_from_db(db_path, climb_uuid)
     if not climb:
         raise HTTPException(status_code=404, detail=f"Climb {climb_uuid} not found")
 
-    # 4️⃣ Render image locally
-    local_out = f"/tmp/{climb_uuid}.png"
-    base_board_img = resolve_board_image_path(board, climb)
-
-    build_climb_image(
-        base_board_path=base_board_img,
-        climb=climb,
-        output_path=local_out
-    )
+    with lane_or_503("render"):
+        # 4️⃣ Render image locally
+        local_out = f"/tmp/{climb_uuid}.png"
+        base_board_img = resolve_board_image_path(board, climb)
 
-    # 5️⃣ Upload to Supabase
-    with open(local_out, "rb") as f:
-        file_options = {
-            "content-type": "image/png",
-        }
+        build_climb_image(
+            base_board_path=base_board_img,
+            climb=climb,
+            output_path=local_out
+        )
 
-        # Only allow overwrite when explicitly forced
-        if payload.force:
-            file_options["x-upsert"] = "true"  # MUST be a string
+        # 5️⃣ Upload to Supabase
+        with open(local_out, "rb") as f:
+            file_options = {
+                "content-type": "image/png",
+            }
+
+            # Only allow overwrite when explicitly forced
+            if payload.force:
+                file_options["x-upsert"] = "true"  # MUST be a string
+
+            try:
+                supabase.storage.from_("climb-images").upload(
+                    path=supabase_path,
+                    file=f,
+                    file_options=file_options,
+                )
+            except StorageApiError as e:
+                # already uploaded (e.g. by another instance) since the index was reconciled
+                if str(e.status) != "409":
+                    raise
 
-        supabase.storage.from_("climb-images").upload(
-            path=supabase_path,
-            file=f,
-            file_options=file_options,
-        )
+        mark_rendered(board, climb_uuid)
 
 
 
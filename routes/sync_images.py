@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import os
-from services.build_sqlite import build_or_download_board_db
+from routes.board_db import lane_or_503, resolve_board_db
+from services.board_assets import invalidate_board_image_index
 from config import get_settings
 
 router = APIRouter(tags=["Public Board Data"])
@@ -11,6 +13,7 @@ class SyncImagesRequest(BaseModel):
     board: str
     username: str | None = None
     password: str | None = None
+    wait: bool = True  # False → 202 + build job if the DB isn't ready
 
 def iter_images_recursive(root: str):
     for dirpath, _, filenames in os.walk(root):
@@ -29,12 +32,15 @@ def fetch_board_images(payload: SyncImagesRequest):
 
     try:
         # 1) Ensure DB exists (needs layouts/images table)
-        db_path = build_or_download_board_db(
-            board=board,
+        db_path = resolve_board_db(
+            board,
+            require="layouts",
             username=payload.username,
             password=payload.password,
-            require="layouts",
+            wait=payload.wait,
         )
+        if isinstance(db_path, JSONResponse):
+            return db_path
         if not os.path.exists(db_path):
             raise HTTPException(status_code=500, detail=f"DB file not found at {db_path}")
 
@@ -61,7 +67,9 @@ def fetch_board_images(payload: SyncImagesRequest):
                 detail=f"Failed to import BoardLib. Is 'boardlib' installed in this env? {e}",
             )
 
-        download_images(board, db_path, images_dir)
+        with lane_or_503("fetch"):
+            download_images(board, db_path, images_dir)
+        invalidate_board_image_index(board)
 
         downloaded = list(iter_images_recursive(images_dir))
         return {
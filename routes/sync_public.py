@@ -1,15 +1,23 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
 import os
+import json
 import sqlite3
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Literal
 
-from services.build_sqlite import build_or_download_board_db
+from routes.board_db import etag_matches, lane_or_503, resolve_board_db, stream_in_lane
+from services.catalog_cache import get_catalog_cache, negotiate_encoding
+from services.catalog_changes import CHANGES_TABLE, META_TABLE, parse_watermark
+from services.build_sqlite import CLIMB_NAME_FTS
+from services.db_pool import pooled_connection
 
 router = APIRouter(tags=["Public Board Data"])
 
 DEBUG = False  # ← flip to True when inspecting schemas
 
+MAX_PAGE_SIZE = 10000
+
 
 # ---------------------------------------------------
 # Request model
@@ -19,6 +27,32 @@ class SyncPublicRequest(BaseModel):
     board: str
     username: str | None = None
     password: str | None = None
+    wait: bool = True  # False → 202 + build job if the DB isn't ready
+    cursor: str | int | None = None  # keyset cursor: last primary key seen
+    limit: int | None = Field(default=None, ge=1, le=MAX_PAGE_SIZE)
+    format: Literal["json", "ndjson"] = "json"
+    since: str | float | None = None  # watermark from a previous response → changes only
+
+    # Filters / projection (full JSON requests with any of these skip the response cache)
+    layout_id: int | None = None
+    product_sizes_layouts_set_id: int | None = None
+    angle: int | None = None
+    grade_min: float | None = None  # difficulty (difficulty_grades.difficulty)
+    grade_max: float | None = None
+    setter: str | None = None
+    q: str | None = Field(default=None, min_length=1)  # name substring search
+    fields: List[str] | None = None  # climbs columns to return (pk always included)
+
+
+CATALOG_FILTERS = (
+    "layout_id",
+    "product_sizes_layouts_set_id",
+    "angle",
+    "grade_min",
+    "grade_max",
+    "setter",
+    "q",
+)
 
 
 # ---------------------------------------------------
@@ -64,9 +98,11 @@ def detect_pk(columns: List[str]) -> str:
 # Core extractor (BOARDLIB-CORRECT + SAFE)
 # ---------------------------------------------------
 
-def extract_climb_catalog(db_path: str) -> list[dict]:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+def _catalog_columns(conn, fields: list[str] | None = None) -> list[str] | None:
+    """
+    [pk, *optional columns] for the catalog, or None if there is no climbs table.
+    `fields` replaces the default optional columns (ValueError if unknown).
+    """
     cur = conn.cursor()
 
     # Required table
@@ -74,8 +110,7 @@ def extract_climb_catalog(db_path: str) -> list[dict]:
     tables = {r[0] for r in cur.fetchall()}
 
     if "climbs" not in tables:
-        conn.close()
-        return []
+        return None
 
     # Detect columns
     cur.execute("PRAGMA table_info(climbs)")
@@ -86,6 +121,12 @@ def extract_climb_catalog(db_path: str) -> list[dict]:
     if not pk:
         raise RuntimeError(f"No primary key in climbs: {cols}")
 
+    if fields:
+        unknown = [f for f in fields if f not in cols]
+        if unknown:
+            raise ValueError(f"Unknown climbs field(s): {', '.join(unknown)}")
+        return [pk] + [f for f in dict.fromkeys(fields) if f != pk]
+
     optional = [c for c in (
         "name",
         "grade",
@@ -93,13 +134,218 @@ def extract_climb_catalog(db_path: str) -> list[dict]:
         "product_sizes_layouts_set_id",
     ) if c in cols]
 
-    select_cols = ", ".join([pk] + optional)
+    return [pk] + optional
+
+
+def _catalog_filters(conn, filters: dict) -> tuple[list[str], list]:
+    """
+    WHERE clauses (on climbs AS c) + params. Angle and grade match any
+    climb_stats row when stats exist; `q` uses the FTS5 name index built
+    at optimize time, else LIKE.
+    """
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(climbs)")}
+    clauses: list[str] = []
+    params: list = []
+
+    def require_column(col: str):
+        if col not in cols:
+            raise ValueError(f"climbs has no '{col}' column to filter on")
+
+    for col in ("layout_id", "product_sizes_layouts_set_id"):
+        if filters.get(col) is not None:
+            require_column(col)
+            clauses.append(f"c.{col} = ?")
+            params.append(filters[col])
+
+    if filters.get("setter"):
+        setter_col = "setter_username" if "setter_username" in cols else "setter"
+        require_column(setter_col)
+        clauses.append(f"c.{setter_col} = ? COLLATE NOCASE")
+        params.append(filters["setter"])
+
+    stat_filters = {k: filters.get(k) for k in ("angle", "grade_min", "grade_max")}
+    if any(v is not None for v in stat_filters.values()):
+        if "climb_stats" in tables and "uuid" in cols:
+            stat_clauses = ["s.climb_uuid = c.uuid"]
+            for key, sql in (
+                ("angle", "s.angle = ?"),
+                ("grade_min", "s.display_difficulty >= ?"),
+                ("grade_max", "s.display_difficulty <= ?"),
+            ):
+                if stat_filters[key] is not None:
+                    stat_clauses.append(sql)
+                    params.append(stat_filters[key])
+            clauses.append(
+                f"EXISTS (SELECT 1 FROM climb_stats s WHERE {' AND '.join(stat_clauses)})"
+            )
+        else:
+            for key, sql, col in (
+                ("angle", "c.angle = ?", "angle"),
+                ("grade_min", "c.grade >= ?", "grade"),
+                ("grade_max", "c.grade <= ?", "grade"),
+            ):
+                if stat_filters[key] is not None:
+                    require_column(col)
+                    clauses.append(sql)
+                    params.append(stat_filters[key])
+
+    q = (filters.get("q") or "").strip()
+    if q:
+        require_column("name")
+        if CLIMB_NAME_FTS in tables and len(q) >= 3:
+            # trigram tokenizer: a quoted string matches as a substring
+            clauses.append(f"c.rowid IN (SELECT rowid FROM {CLIMB_NAME_FTS} WHERE {CLIMB_NAME_FTS} MATCH ?)")
+            params.append('"' + q.replace('"', '""') + '"')
+        else:
+            escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            clauses.append("c.name LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+
+    return clauses, params
+
+
+def iter_climb_catalog(
+    db_path: str,
+    *,
+    after: str | int | None = None,
+    limit: int | None = None,
+    filters: dict | None = None,
+    fields: list[str] | None = None,
+) -> Iterator[dict]:
+    """
+    Yield catalog rows in primary-key order as SQLite produces them.
+    `after` is a keyset cursor (the last pk the client has seen).
+    """
+    with pooled_connection(db_path) as conn:
+        cols = _catalog_columns(conn, fields)
+        if not cols:
+            return
+        pk = cols[0]
+
+        clauses, params = _catalog_filters(conn, filters or {})
+        if after is not None:
+            clauses.append(f"c.{pk} > ?")
+            params.append(after)
+
+        sql = f"SELECT {', '.join(f'c.{c}' for c in cols)} FROM climbs c"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY c.{pk}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        for row in conn.execute(sql, params):
+            yield dict(zip(cols, row))
 
-    cur.execute(f"SELECT {select_cols} FROM climbs")
-    climbs = [dict(r) for r in cur.fetchall()]
 
-    conn.close()
-    return climbs
+def extract_climb_catalog(db_path: str) -> list[dict]:
+    return list(iter_climb_catalog(db_path))
+
+
+def catalog_watermark(db_path: str) -> str | None:
+    with pooled_connection(db_path) as conn:
+        try:
+            row = conn.execute(f"SELECT value FROM {META_TABLE} WHERE key = 'watermark'").fetchone()
+        except sqlite3.OperationalError:
+            return None  # built before change tracking
+    return row[0] if row else None
+
+
+def extract_catalog_changes(db_path: str, since: str) -> dict:
+    """
+    Climbs added/updated/deleted after the `since` watermark, from the
+    change log recorded at build time. If the log doesn't reach back that
+    far, every climb is returned with full=True.
+    """
+    with pooled_connection(db_path) as conn:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        meta = {}
+        if META_TABLE in tables:
+            meta = dict(conn.execute(f"SELECT key, value FROM {META_TABLE}").fetchall())
+
+        cols = _catalog_columns(conn)
+        tracked_since = meta.get("tracked_since")
+        if not cols or CHANGES_TABLE not in tables or not tracked_since or since < tracked_since:
+            return {
+                "full": True,
+                "watermark": meta.get("watermark"),
+                "upserts": extract_climb_catalog(db_path),
+                "deleted": [],
+            }
+
+        pk = cols[0]
+        select_cols = ", ".join(f"c.{c}" for c in cols)
+        upserts = conn.execute(
+            f"SELECT {select_cols} FROM {CHANGES_TABLE} ch "
+            f"JOIN climbs c ON c.{pk} = ch.climb_pk "
+            "WHERE ch.changed_at > ? AND ch.deleted = 0 "
+            f"ORDER BY c.{pk}",
+            (since,),
+        )
+        upserts = [dict(zip(cols, row)) for row in upserts]
+        deleted = [
+            r[0] for r in conn.execute(
+                f"SELECT climb_pk FROM {CHANGES_TABLE} "
+                "WHERE changed_at > ? AND deleted = 1 ORDER BY climb_pk",
+                (since,),
+            )
+        ]
+
+    return {
+        "full": False,
+        "watermark": meta.get("watermark"),
+        "upserts": upserts,
+        "deleted": deleted,
+    }
+
+
+def _ndjson_lines(rows: Iterator[dict]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def _catalog_document(board: str, db_path: str) -> Iterator[bytes]:
+    """
+    The full-catalog response body, serialized row by row (same shape
+    as the uncached JSON response).
+    """
+    def dumps(value) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+    yield dumps({"board": board, "status": "ok", "watermark": catalog_watermark(db_path)})[:-1].encode()
+    yield b',"climbs":['
+    first = None
+    count = 0
+    for row in iter_climb_catalog(db_path):
+        if first is None:
+            first = row
+        yield (("," if count else "") + dumps(row)).encode()
+        count += 1
+    yield f'],"sample":{dumps([first] if first else [])},"climb_count":{count}}}'.encode()
+
+
+def _cached_catalog_response(request: Request, board: str, db_path: str) -> Response:
+    cache = get_catalog_cache(board, db_path, lambda: _catalog_document(board, db_path))
+
+    encoding = None
+    if "range" not in request.headers:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), cache["variants"])
+    variant = cache["variants"][encoding] if encoding else cache
+
+    etag = f'"{variant["sha256"]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(variant["path"], media_type="application/json", headers=headers)
 
 
 # ---------------------------------------------------
@@ -107,29 +353,93 @@ def extract_climb_catalog(db_path: str) -> list[dict]:
 # ---------------------------------------------------
 
 @router.post("/sync-public-data")
-def sync_public_board(payload: SyncPublicRequest):
+def sync_public_board(payload: SyncPublicRequest, request: Request):
+    """
+    format="json" without a limit returns the whole catalog, served from
+    a per-DB-content cache (gzip/zstd by Accept-Encoding, ETag → 304).
+    With `limit`, returns one keyset page plus `next_cursor` (pass it back
+    as `cursor`). format="ndjson" streams one climb per line from
+    `cursor`; resume with the last row's primary key.
+    `since` (a previous `watermark`) returns only changed/deleted climbs.
+    Filters (layout, set, angle, grade range, setter, `q` name search) and
+    `fields` projection apply to the json/ndjson catalog modes.
+    """
     board = payload.board.lower().strip()
 
+    since = None
+    if payload.since is not None:
+        try:
+            since = parse_watermark(payload.since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid since: {payload.since!r}")
+
     try:
-        db_path = build_or_download_board_db(
-            board=board,
+        db_path = resolve_board_db(
+            board,
+            require="logbook",
             username=payload.username,
             password=payload.password,
-            require="logbook",
+            wait=payload.wait,
         )
+        if isinstance(db_path, JSONResponse):
+            return db_path
 
         if not os.path.exists(db_path):
             raise HTTPException(status_code=500, detail="DB not found")
 
-        climbs = extract_climb_catalog(db_path)
-
-        return {
+        if since is not None:
+            with lane_or_503("read"):
+                changes = extract_catalog_changes(db_path, since)
+            return {
+                "board": board,
+                "status": "ok",
+                "since": since,
+                "climb_count": len(changes["upserts"]),
+                "deleted_count": len(changes["deleted"]),
+                **changes,
+            }
+
+        filters = {k: getattr(payload, k) for k in CATALOG_FILTERS if getattr(payload, k) is not None}
+        plain = not filters and not payload.fields
+        if plain and payload.limit is None and payload.cursor is None and payload.format == "json":
+            with lane_or_503("read"):
+                return _cached_catalog_response(request, board, db_path)
+
+        rows = iter_climb_catalog(
+            db_path,
+            after=payload.cursor,
+            limit=payload.limit,
+            filters=filters,
+            fields=payload.fields,
+        )
+        if payload.format == "ndjson":
+            # runs the query now, so bad filters/fields are a 400, not a broken stream
+            return StreamingResponse(
+                stream_in_lane("read", _ndjson_lines(rows)),
+                media_type="application/x-ndjson",
+                headers={"X-Catalog-Watermark": catalog_watermark(db_path) or ""},
+            )
+
+        with lane_or_503("read"):
+            climbs = list(rows)
+        response = {
             "board": board,
             "status": "ok",
             "climb_count": len(climbs),
+            "watermark": catalog_watermark(db_path),
             "sample": climbs[:1],
             "climbs": climbs,
         }
+        if payload.limit is not None:
+            full_page = climbs and len(climbs) == payload.limit
+            response["next_cursor"] = next(iter(climbs[-1].values())) if full_page else None
+        return response
+
+    except HTTPException:
+        raise
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
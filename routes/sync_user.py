@@ -1,31 +1,34 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-import csv
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List
 import os
-import sys
-import tempfile
-import re
+import json
+import time
 
-import pexpect
-
-from services.build_sqlite import build_or_download_board_db
+from routes.board_db import lane_or_503, resolve_board_db, stream_in_lane
+from services.user_logbook import (
+    is_logbook_board,
+    is_moon_board,
+    iter_logbook_batch,
+    sync_user_logbook,
+)
 
 router = APIRouter(tags=["User Board Data"])
 
 
-def get_python_bin() -> str:
-    return sys.executable
-
-
 class FetchBoardRequest(BaseModel):
     board: str
     username: str
     password: str | None = None
+    since_sync: int | None = None  # sync_id from a previous response → only newer entries
 
 
-def _strip_ansi(s: str) -> str:
-    # remove terminal color codes so logs are readable
-    return re.sub(r"\x1B\[[0-?]*[ -/]*[@-~]", "", s)
+MAX_BATCH_ACCOUNTS = 200
+
+
+class FetchBoardBatchRequest(BaseModel):
+    accounts: List[FetchBoardRequest] = Field(min_length=1, max_length=MAX_BATCH_ACCOUNTS)
 
 
 @router.post("/fetch-user-board-data")
@@ -33,146 +36,123 @@ def fetch_user_board_data(data: FetchBoardRequest):
     """
     Fetch authenticated user logbook data for a board.
 
-    Uses pexpect to handle the interactive password prompt that boardlib uses.
-    If boardlib fails, we return a 500 with the captured traceback (instead of
-    returning count=0 silently).
+    Only ascents/bids newer than the user's stored watermark are fetched;
+    the logbook is rebuilt in-process (bounded worker pool) and kept in a
+    per-user store. Pass `since_sync` (a previous `sync_id`) to receive
+    just the entries added or changed since then plus `removed` entry_ids;
+    otherwise the full merged logbook is returned. If boardlib fails, we
+    return a 500 with the error (instead of returning count=0 silently).
     """
 
     board = data.board.lower().strip()
-    python_bin = get_python_bin()
-
-    # 1) Ensure "logbook-capable" DB exists (mainly for name resolution / boardlib expectations)
-    try:
-        db_path = build_or_download_board_db(
-            board=board,
-            username=data.username,
-            password=data.password,
-            require="logbook",
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"DB build failed: {str(e)}")
-
-    if not os.path.exists(db_path):
-        raise HTTPException(status_code=500, detail=f"Database not found at {db_path}")
-
-    # 2) Temp CSV output
-    tmp_fd, tmp_csv_path = tempfile.mkstemp(suffix=".csv")
-    os.close(tmp_fd)
-
-    # 3) Run boardlib logbook via pexpect (interactive prompt)
-    cmd = (
-        f"{python_bin} -m boardlib logbook {board} "
-        f"--username={data.username} "
-        f"--database-path={db_path} "
-        f"--output={tmp_csv_path}"
-    )
-
-    print("📘 Running boardlib logbook via pexpect:")
-    print(" ", cmd)
-
-    output_text = ""
-    try:
-        # encoding lets us read child.before directly as str
-        child = pexpect.spawn(cmd, encoding="utf-8", timeout=90)
-
-        # Some boardlib versions prompt "Password:" (case varies), sometimes with leading text.
-        # We try to answer it if it appears; if it doesn't appear, we continue.
-        if data.password:
-            i = child.expect([r"(?i)password\s*:", pexpect.EOF, pexpect.TIMEOUT])
-            if i == 0:
-                child.sendline(data.password)
-                # then wait for completion
-                child.expect(pexpect.EOF)
+    if not is_logbook_board(board):
+        raise HTTPException(status_code=400, detail=f"Unknown board {board}")
 
-        else:
-            # No password provided; just run to completion
-            child.expect(pexpect.EOF)
+    # boardlib's CLI falls back to <BOARD>_PASSWORD; keep that behaviour
+    password = data.password or os.environ.get(f"{board.upper()}_PASSWORD")
+    if not password:
+        raise HTTPException(status_code=400, detail=f"Password required for '{board}' logbook")
 
-        output_text = child.before or ""
-    except Exception as e:
-        try:
-            if os.path.exists(tmp_csv_path):
-                os.remove(tmp_csv_path)
-        except Exception:
-            pass
-        raise HTTPException(status_code=500, detail=f"boardlib logbook failed (pexpect): {str(e)}")
-    finally:
-        try:
-            child.close()
-        except Exception:
-            pass
-
-    output_text_clean = _strip_ansi(output_text)
-
-    # 4) Validate CSV actually exists + has content
-    if not os.path.exists(tmp_csv_path):
-        raise HTTPException(
-            status_code=500,
-            detail=(
-                "boardlib did not produce CSV output.\n\n"
-                f"board={board} user={data.username}\n"
-                f"db={db_path}\n\n"
-                "boardlib output (first 3000 chars):\n"
-                f"{output_text_clean[:3000]}"
-            ),
-        )
-
-    # If boardlib crashed, it often leaves a 0-byte file behind.
-    file_size = os.path.getsize(tmp_csv_path)
-    if file_size == 0:
-        # This is the “silent empty csv” failure mode you’re seeing
+    # 1) Ensure "logbook-capable" DB exists (mainly for name resolution / boardlib expectations)
+    db_path = None  # Moon logbooks come with climb names, no board DB needed
+    if not is_moon_board(board):
         try:
-            os.remove(tmp_csv_path)
-        except Exception:
-            pass
-
-        raise HTTPException(
-            status_code=500,
-            detail=(
-                "boardlib produced EMPTY CSV.\n\n"
-                f"board={board} user={data.username}\n"
-                f"db={db_path}\n\n"
-                "boardlib output (first 3000 chars):\n"
-                f"{output_text_clean[:3000]}"
-            ),
-        )
-
-    # 5) Parse CSV → JSON
-    logbook: list[dict] = []
-    try:
-        with open(tmp_csv_path, "r", newline="") as f:
-            reader = csv.DictReader(f)
-            headers = reader.fieldnames or []
-            print("🧾 CSV headers:", headers)
-
-            for row in reader:
-                # Defensive: boardlib *should* include climb_name, but it’s the crash point right now.
-                # If it’s missing in some future format, skip row safely.
-                date = (row.get("date") or "").strip()
-                climb_name = (row.get("climb_name") or "").strip()
-
-                if not date or not climb_name:
-                    continue
-
-                tries_total = (row.get("tries_total") or "1").strip()
-                sessions_count = (row.get("sessions_count") or "1").strip()
-
-                row["board_attempt_id"] = f"{date}|{climb_name}|{tries_total}|{sessions_count}"
-                logbook.append(row)
-
-    finally:
+            db_path = resolve_board_db(
+                board,
+                require="logbook",
+                username=data.username,
+                password=password,
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"DB build failed: {str(e)}")
+
+        if not os.path.exists(db_path):
+            raise HTTPException(status_code=500, detail=f"Database not found at {db_path}")
+
+    # 2) Incremental sync into the user's logbook store (boardlib in-process)
+    with lane_or_503("fetch"):
         try:
-            os.remove(tmp_csv_path)
-        except Exception:
-            pass
-
+            result = sync_user_logbook(
+                board,
+                data.username,
+                password,
+                db_path,
+                since_sync=data.since_sync,
+            )
+        except TimeoutError:
+            raise HTTPException(
+                status_code=500,
+                detail=f"boardlib logbook timed out for board={board} user={data.username}",
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=(
+                    f"boardlib logbook failed: {type(e).__name__}: {e}\n\n"
+                    f"board={board} user={data.username}\n"
+                    f"db={db_path}"
+                ),
+            )
+
+    logbook = result["entries"]
     if logbook:
         print("🧪 Sample attempt:", logbook[0])
-    else:
-        print("⚠️ No logbook rows parsed (CSV existed but rows missing required fields).")
+    elif data.since_sync is None:
+        print(f"⚠️ No logbook rows for '{board}' user={data.username}")
 
-    return {
+    response = {
         "board": board,
         "entries": logbook,
         "count": len(logbook),
+        "sync_id": result["sync_id"],
+        "delta": data.since_sync is not None,
     }
+    if data.since_sync is not None:
+        response["removed"] = result["removed_ids"]
+    return response
+
+
+def _batch_lines(accounts: list[dict]):
+    started = time.time()
+    ok = failed = 0
+    for result in iter_logbook_batch(accounts):
+        if result["status"] == "ok":
+            ok += 1
+        else:
+            failed += 1
+        yield json.dumps(result) + "\n"
+    yield json.dumps({
+        "summary": {
+            "accounts": len(accounts),
+            "ok": ok,
+            "failed": failed,
+            "seconds": round(time.time() - started, 3),
+        }
+    }) + "\n"
+
+
+@router.post("/fetch-user-board-data/batch")
+def fetch_user_board_data_batch(data: FetchBoardBatchRequest):
+    """
+    Sync many accounts' logbooks. Each board's DB is resolved once, then
+    accounts run on a bounded batch pool (separate from single syncs)
+    with per-board Aurora rate limits, and streams NDJSON: one line per account
+    as it finishes (status, timing, entries or error), then a summary line.
+    """
+    accounts = []
+    for account in data.accounts:
+        board = account.board.lower().strip()
+        accounts.append({
+            "board": board,
+            "username": account.username,
+            # boardlib's CLI falls back to <BOARD>_PASSWORD; keep that behaviour
+            "password": account.password or os.environ.get(f"{board.upper()}_PASSWORD"),
+            "since_sync": account.since_sync,
+        })
+
+    return StreamingResponse(
+        stream_in_lane("fetch", _batch_lines(accounts)),
+        media_type="application/x-ndjson",
+    )
@@ -0,0 +1,147 @@
+import math
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from config import get_settings
+
+settings = get_settings()
+
+# ---------------------------------------------------
+#  Admission control lanes
+# ---------------------------------------------------
+#
+# Heavy work is admitted through a bounded lane instead of piling up in
+# the shared request threadpool:
+#
+#   build   board DB builds a request has to wait for
+#   fetch   Aurora / image downloads (logbooks, board images)
+#   render  Pillow renders + uploads
+#   read    catalog / climb / stats lookups
+#
+# Each lane runs at most ADMISSION_LANE_CONCURRENCY[lane] requests and
+# lets ADMISSION_LANE_QUEUE[lane] more wait (up to
+# ADMISSION_QUEUE_TIMEOUTS[lane] seconds). Anything past that fails fast
+# with LaneFull, which routes turn into 503 + Retry-After.
+
+LANES = ("build", "fetch", "render", "read")
+RECENT_WAITS = 512
+
+
+class LaneFull(RuntimeError):
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"'{lane}' lane is full, retry in {retry_after}s")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class _Lane:
+    def __init__(self, name: str, concurrency: int, max_queue: int, timeout: float):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self.cond = threading.Condition()
+        self.running = 0
+        self.waiting = 0
+        self.stats = {
+            "admitted": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "run_seconds_total": 0.0,
+        }
+        self.recent_waits: deque[float] = deque(maxlen=RECENT_WAITS)
+
+    def retry_after(self) -> int:
+        # roughly: how long until the current queue has drained through
+        finished = self.stats["admitted"] - self.running
+        avg_run = self.stats["run_seconds_total"] / finished if finished > 0 else 1.0
+        backlog = (self.waiting + 1) / self.concurrency
+        return min(60, max(1, math.ceil(avg_run * backlog)))
+
+    def acquire(self):
+        queued_at = time.perf_counter()
+        with self.cond:
+            if self.running >= self.concurrency:
+                if self.waiting >= self.max_queue:
+                    self.stats["rejected"] += 1
+                    raise LaneFull(self.name, self.retry_after())
+                self.waiting += 1
+                try:
+                    admitted = self.cond.wait_for(
+                        lambda: self.running < self.concurrency, timeout=self.timeout
+                    )
+                finally:
+                    self.waiting -= 1
+                if not admitted:
+                    self.stats["timed_out"] += 1
+                    raise LaneFull(self.name, self.retry_after())
+
+            waited = time.perf_counter() - queued_at
+            self.running += 1
+            self.stats["admitted"] += 1
+            self.stats["wait_seconds_total"] += waited
+            self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], waited)
+            self.recent_waits.append(waited)
+
+    def release(self, run_seconds: float):
+        with self.cond:
+            self.running -= 1
+            self.stats["run_seconds_total"] += run_seconds
+            self.cond.notify()
+
+    def snapshot(self) -> dict:
+        with self.cond:
+            waits = sorted(self.recent_waits)
+            stats = dict(self.stats)
+            out = {
+                "concurrency": self.concurrency,
+                "max_queue": self.max_queue,
+                "queue_timeout_seconds": self.timeout,
+                "running": self.running,
+                "waiting": self.waiting,
+            }
+
+        def percentile(p: float) -> float | None:
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 4) if waits else None
+
+        out.update(stats)
+        out["wait_seconds_total"] = round(stats["wait_seconds_total"], 3)
+        out["wait_seconds_max"] = round(stats["wait_seconds_max"], 4)
+        out["run_seconds_total"] = round(stats["run_seconds_total"], 3)
+        out["wait_seconds_p50"] = percentile(0.50)
+        out["wait_seconds_p95"] = percentile(0.95)
+        return out
+
+
+_lanes = {
+    name: _Lane(
+        name,
+        settings.admission_lane_concurrency.get(name, 4),
+        settings.admission_lane_queue.get(name, 8),
+        settings.admission_queue_timeouts.get(name, 30),
+    )
+    for name in LANES
+}
+
+
+@contextmanager
+def admission_lane(lane: str):
+    """
+    Hold a slot in `lane` for the duration of the block. Raises LaneFull
+    if the lane and its queue are full, or the wait times out.
+    """
+    slot = _lanes[lane]
+    slot.acquire()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        slot.release(time.perf_counter() - started)
+
+
+def get_admission_stats() -> dict:
+    return {name: lane.snapshot() for name, lane in _lanes.items()}
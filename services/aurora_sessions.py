@@ -0,0 +1,138 @@
+import hmac
+import time
+import hashlib
+import threading
+import urllib.error
+from collections import OrderedDict
+from typing import Callable, TypeVar
+
+from cryptography.fernet import Fernet
+
+from config import get_settings
+from services.aurora_sync import aurora_login
+
+settings = get_settings()
+
+# ---------------------------------------------------
+#  Aurora session cache
+# ---------------------------------------------------
+#
+# (board, username) → login session, so authenticated builds, delta syncs
+# and logbook syncs don't log in on every call. Tokens are kept Fernet-
+# encrypted with a key that only exists in this process; the password is
+# never stored, only an HMAC of it, so a different password misses the
+# cache instead of reusing someone's session. Sessions are renewed when
+# they get within AURORA_SESSION_RENEW_SECONDS of expiry, dropped on a
+# 401/403 from Aurora, and least-recently-used entries are evicted past
+# AURORA_SESSION_CACHE_SIZE. Logins for the same account are serialized
+# by one of LOGIN_LOCK_STRIPES locks (fixed, so failed or evicted logins
+# don't leave a lock behind per account).
+
+LOGIN_LOCK_STRIPES = 64
+
+_fernet = Fernet(Fernet.generate_key())
+_mac_key = Fernet.generate_key()
+
+_sessions: "OrderedDict[tuple[str, str], dict]" = OrderedDict()
+_sessions_lock = threading.Lock()
+_login_locks = [threading.Lock() for _ in range(LOGIN_LOCK_STRIPES)]
+
+_stats = {"hits": 0, "logins": 0, "renewals": 0, "invalidations": 0, "evictions": 0}
+
+T = TypeVar("T")
+
+
+def _key(board: str, username: str) -> tuple[str, str]:
+    return board.lower().strip(), username.strip().lower()
+
+
+def _password_mac(password: str) -> bytes:
+    return hmac.new(_mac_key, password.encode(), hashlib.sha256).digest()
+
+
+def _login_lock(key: tuple[str, str]) -> threading.Lock:
+    return _login_locks[hash(key) % LOGIN_LOCK_STRIPES]
+
+
+def _cached(key: tuple[str, str], password_mac: bytes, now: float) -> dict | None:
+    with _sessions_lock:
+        entry = _sessions.get(key)
+        if entry is None or not hmac.compare_digest(entry["password_mac"], password_mac):
+            return None
+        if now >= entry["expires_at"] - settings.aurora_session_renew_seconds:
+            return None
+        _sessions.move_to_end(key)
+        _stats["hits"] += 1
+        return {
+            "token": _fernet.decrypt(entry["token"]).decode(),
+            "user_id": entry["user_id"],
+        }
+
+
+def get_aurora_session(board: str, username: str, password: str) -> dict:
+    """
+    {"token", "user_id"} for the account, from the cache or a fresh login.
+    """
+    key = _key(board, username)
+    password_mac = _password_mac(password)
+
+    session = _cached(key, password_mac, time.time())
+    if session:
+        return session
+
+    with _login_lock(key):
+        # another request may have logged in while we waited
+        session = _cached(key, password_mac, time.time())
+        if session:
+            return session
+
+        session = aurora_login(board, username, password)
+        now = time.time()
+        with _sessions_lock:
+            renewal = key in _sessions
+            _sessions[key] = {
+                "token": _fernet.encrypt(session["token"].encode()),
+                "user_id": session.get("user_id"),
+                "password_mac": password_mac,
+                "expires_at": now + settings.aurora_session_ttl_seconds,
+            }
+            _sessions.move_to_end(key)
+            _stats["renewals" if renewal else "logins"] += 1
+            while len(_sessions) > settings.aurora_session_cache_size:
+                _sessions.popitem(last=False)
+                _stats["evictions"] += 1
+
+    print(f"🔑 Aurora {'session renewed' if renewal else 'login'} for '{board}' user={username}")
+    return {"token": session["token"], "user_id": session.get("user_id")}
+
+
+def invalidate_aurora_session(board: str, username: str):
+    with _sessions_lock:
+        if _sessions.pop(_key(board, username), None) is not None:
+            _stats["invalidations"] += 1
+
+
+def call_with_aurora_session(
+    board: str,
+    username: str,
+    password: str,
+    fn: Callable[[dict], T],
+) -> T:
+    """
+    fn(session) with a cached session; if Aurora rejects the token
+    (401/403), drop it, log in again and retry once.
+    """
+    session = get_aurora_session(board, username, password)
+    try:
+        return fn(session)
+    except urllib.error.HTTPError as e:
+        if e.code not in (401, 403):
+            raise
+        print(f"🔑 Aurora rejected cached session for '{board}' user={username}, logging in again")
+        invalidate_aurora_session(board, username)
+        return fn(get_aurora_session(board, username, password))
+
+
+def get_session_cache_stats() -> dict:
+    with _sessions_lock:
+        return {**_stats, "cached": len(_sessions)}
@@ -0,0 +1,224 @@
+import json
+import time
+import sqlite3
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from typing import Iterator
+
+from config import get_settings
+
+settings = get_settings()
+
+# ---------------------------------------------------
+#  Aurora API (same hosts boardlib uses)
+# ---------------------------------------------------
+
+AURORA_HOSTS = {
+    "aurora": "https://auroraboardapp.com",
+    "decoy": "https://decoyboardapp.com",
+    "grasshopper": "https://grasshopperboardapp.com",
+    "kilter": "https://kilterboardapp.com",
+    "soill": "https://soillboardapp.com",
+    "tension": "https://tensionboardapp2.com",
+    "touchstone": "https://touchstoneboardapp.com",
+}
+
+USER_AGENT = "Kilter%20Board/202 CFNetwork/1568.100.1 Darwin/24.0.0"
+REQUEST_TIMEOUT_SECONDS = 60
+
+# page keys that are protocol metadata, not tables
+_NON_TABLE_KEYS = {"_complete", "user_syncs"}
+
+
+def aurora_base_url(board: str) -> str:
+    """
+    settings.aurora_api_base_url (e.g. a local stand-in) wins over the
+    real host for `board`.
+    """
+    if settings.aurora_api_base_url:
+        return settings.aurora_api_base_url.rstrip("/")
+    try:
+        return AURORA_HOSTS[board]
+    except KeyError:
+        raise ValueError(f"Board '{board}' is not an Aurora board")
+
+
+def _request_json(url: str, *, data: bytes, headers: dict, timeout: float = REQUEST_TIMEOUT_SECONDS) -> dict:
+    req = urllib.request.Request(
+        url,
+        data=data,
+        headers={"Accept": "application/json", "User-Agent": USER_AGENT, **headers},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.load(resp)
+
+
+def aurora_login(board: str, username: str, password: str, base_url: str | None = None) -> dict:
+    """
+    Returns the Aurora session ({"token": ..., "user_id": ...}).
+    """
+    url = f"{base_url or aurora_base_url(board)}/sessions"
+    body = json.dumps({
+        "username": username,
+        "password": password,
+        "tou": "accepted",
+        "pp": "accepted",
+        "ua": "app",
+    }).encode()
+    try:
+        result = _request_json(url, data=body, headers={"Content-Type": "application/json"})
+    except urllib.error.HTTPError as e:
+        if e.code == 422:
+            raise ValueError("Invalid username or password") from e
+        raise
+    return result["session"]
+
+
+def fetch_sync_pages(
+    board: str,
+    tables_and_sync_dates: dict[str, str],
+    *,
+    token: str | None = None,
+    max_pages: int | None = None,
+    base_url: str | None = None,
+    deadline: float | None = None,
+) -> Iterator[dict]:
+    """
+    Yield raw /sync pages, advancing each table's watermark from the
+    shared_syncs / user_syncs rows of the previous page. A page without
+    `_complete` is not the last one (as in boardlib); raises RuntimeError
+    if max_pages go by without a complete page, so a truncated sync is
+    never applied as finished. With a `deadline` (time.monotonic()), no
+    request starts or runs past it (TimeoutError).
+    """
+    url = f"{base_url or aurora_base_url(board)}/sync"
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    if token:
+        headers["Cookie"] = f"token={token}"
+
+    payload = dict(tables_and_sync_dates)
+    max_pages = max_pages or settings.aurora_max_sync_pages
+
+    for _ in range(max_pages):
+        timeout = REQUEST_TIMEOUT_SECONDS
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                raise TimeoutError(f"Aurora /sync for '{board}' ran past its deadline")
+        page = _request_json(
+            url, data=urllib.parse.urlencode(payload).encode(), headers=headers, timeout=timeout
+        )
+        complete = page.pop("_complete", False)
+        yield page
+
+        for sync_row in page.get("shared_syncs", []) + page.get("user_syncs", []):
+            table_name = sync_row.get("table_name")
+            synced_at = sync_row.get("last_synchronized_at")
+            if table_name in payload and synced_at:
+                payload[table_name] = synced_at
+
+        if complete:
+            return
+
+    raise RuntimeError(f"Aurora /sync for '{board}' not complete after {max_pages} pages")
+
+
+# ---------------------------------------------------
+#  Applying rows
+# ---------------------------------------------------
+
+def get_shared_syncs(conn: sqlite3.Connection) -> dict[str, str]:
+    return {
+        table_name: synced_at
+        for table_name, synced_at in conn.execute(
+            "SELECT table_name, last_synchronized_at FROM shared_syncs"
+        )
+    }
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> list[str]:
+    return [r[1] for r in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def _upsert_rows(conn: sqlite3.Connection, table: str, columns: list[str], rows: list[dict]):
+    col_sql = ", ".join(f'"{c}"' for c in columns)
+    params = ", ".join(f":{c}" for c in columns)
+    conn.executemany(
+        f'INSERT OR REPLACE INTO "{table}" ({col_sql}) VALUES ({params})',
+        (defaultdict(lambda: None, row) for row in rows),
+    )
+
+
+def _apply_climb_stats(conn: sqlite3.Connection, columns: list[str], rows: list[dict]):
+    # Aurora signals a removed stat row with no difficulty at all
+    upserts, deletes = [], []
+    for row in rows:
+        display = row.get("benchmark_difficulty") or row.get("difficulty_average")
+        (upserts if display else deletes).append({**row, "display_difficulty": display})
+
+    _upsert_rows(conn, "climb_stats", columns, upserts)
+    conn.executemany(
+        "DELETE FROM climb_stats WHERE climb_uuid = :climb_uuid AND angle = :angle",
+        deletes,
+    )
+
+
+def apply_sync_page(conn: sqlite3.Connection, page: dict, columns_cache: dict) -> dict[str, int]:
+    """
+    Apply one /sync page to `conn` (no commit). Tables the DB does not
+    have are skipped. Returns rows applied per table.
+    """
+    counts: dict[str, int] = {}
+    for table, rows in page.items():
+        if table in _NON_TABLE_KEYS or not isinstance(rows, list) or not rows:
+            continue
+        if table not in columns_cache:
+            columns_cache[table] = _table_columns(conn, table)
+        columns = columns_cache[table]
+        if not columns:
+            continue
+
+        if table == "climb_stats":
+            _apply_climb_stats(conn, columns, rows)
+        else:
+            _upsert_rows(conn, table, columns, rows)
+        counts[table] = len(rows)
+    return counts
+
+
+def delta_sync_board_db(
+    board: str,
+    db_path: str,
+    *,
+    token: str | None = None,
+    base_url: str | None = None,
+) -> dict[str, int]:
+    """
+    Bring `db_path` up to date with only the rows changed since its
+    shared_syncs watermarks. All pages are applied in one transaction,
+    so a failed sync leaves the file untouched.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    totals: dict[str, int] = defaultdict(int)
+    try:
+        shared_syncs = get_shared_syncs(conn)
+        if not shared_syncs:
+            raise RuntimeError(f"'{db_path}' has no shared_syncs watermarks")
+
+        columns_cache: dict[str, list[str]] = {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for page in fetch_sync_pages(board, shared_syncs, token=token, base_url=base_url):
+                for table, count in apply_sync_page(conn, page, columns_cache).items():
+                    totals[table] += count
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+    return dict(totals)
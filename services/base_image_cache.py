@@ -0,0 +1,75 @@
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from config import get_settings
+
+settings = get_settings()
+
+# ---------------------------------------------------
+#  Decoded base board images
+# ---------------------------------------------------
+#
+# A board only has a handful of layout images, but decoding one (a
+# multi-megapixel PNG) is most of a render. Decoded RGBA images are kept
+# in an LRU keyed by (path, mtime, size), bounded by
+# BASE_IMAGE_CACHE_BYTES; every render draws on its own copy.
+
+_images: "OrderedDict[tuple[str, int, int], Image.Image]" = OrderedDict()
+_lock = threading.Lock()
+
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0}
+
+
+def _image_bytes(img: Image.Image) -> int:
+    return img.width * img.height * len(img.getbands())
+
+
+def _evict(key: tuple[str, int, int]):
+    img = _images.pop(key)
+    _stats["bytes"] -= _image_bytes(img)
+    _stats["evictions"] += 1
+
+
+def get_base_image(path: str) -> Image.Image:
+    """
+    An RGBA copy of the image at `path`, safe to draw on. Decoded once
+    per file version while it fits in the cache.
+    """
+    st = os.stat(path)
+    key = (os.path.realpath(path), st.st_mtime_ns, st.st_size)
+
+    with _lock:
+        cached = _images.get(key)
+        if cached is not None:
+            _images.move_to_end(key)
+            _stats["hits"] += 1
+            return cached.copy()
+        _stats["misses"] += 1
+
+    with Image.open(path) as src:
+        img = src.convert("RGBA")
+
+    size = _image_bytes(img)
+    if size <= settings.base_image_cache_bytes:
+        with _lock:
+            if key not in _images:
+                # older versions of the same file won't be asked for again
+                for stale in [k for k in _images if k[0] == key[0]]:
+                    _evict(stale)
+                _images[key] = img
+                _stats["bytes"] += size
+                while _stats["bytes"] > settings.base_image_cache_bytes:
+                    _evict(next(iter(_images)))
+    return img.copy()
+
+
+def get_base_image_cache_stats() -> dict:
+    with _lock:
+        return {
+            **_stats,
+            "images": len(_images),
+            "budget_bytes": settings.base_image_cache_bytes,
+        }
@@ -0,0 +1,285 @@
+import os
+import gzip
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import urllib.request
+from functools import lru_cache
+from typing import Iterator
+
+from config import get_settings
+
+settings = get_settings()
+
+# ---------------------------------------------------
+#  Board DB artifacts (object storage)
+# ---------------------------------------------------
+#
+# <board>/objects/<sha256>.db.gz   gzip of the DB, named by the sha256 of
+#                                  the *uncompressed* file
+# <board>/manifest.json            {"sha256", "object", "size", ...}
+#
+# Uploads are skipped when the manifest already points at the same hash.
+# Downloads stream to .<board>.<sha256>.gz.part next to the destination
+# (resumable), are checked against compressed_sha256, then decompressed
+# while hashing.
+
+ARTIFACT_BUCKET = "board-dbs"
+CHUNK_SIZE = 1024 * 1024
+SIGNED_URL_TTL_SECONDS = 60 * 60
+
+
+def unique_tmp_path(path: str) -> str:
+    """
+    A new, empty temp file next to `path` (same directory, so os.replace
+    onto `path` is atomic), unique across processes and threads.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".",
+        prefix=f"{os.path.basename(path)}.",
+        suffix=".tmp",
+    )
+    os.close(fd)
+    return tmp_path
+
+
+class LocalArtifactStore:
+    """
+    Bucket stand-in backed by a directory (tests / single-host setups).
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self._path(key))
+
+    def read_json(self, key: str) -> dict | None:
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def write_json(self, key: str, data: dict):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = unique_tmp_path(path)
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def upload_file(self, key: str, local_path: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = unique_tmp_path(path)
+        shutil.copyfile(local_path, tmp_path)
+        os.replace(tmp_path, path)
+
+    def iter_bytes(self, key: str, offset: int = 0) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            f.seek(offset)
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+
+
+class SupabaseArtifactStore:
+    def __init__(self, bucket: str):
+        self.bucket_name = bucket
+        self._client = None
+
+    @property
+    def bucket(self):
+        if self._client is None:
+            from services.build_sqlite import get_supabase  # avoid import cycle
+
+            self._client = get_supabase()
+        return self._client.storage.from_(self.bucket_name)
+
+    def exists(self, key: str) -> bool:
+        return self.bucket.exists(key)
+
+    def read_json(self, key: str) -> dict | None:
+        try:
+            return json.loads(self.bucket.download(key))
+        except Exception:
+            return None
+
+    def write_json(self, key: str, data: dict):
+        self.bucket.upload(
+            path=key,
+            file=json.dumps(data).encode(),
+            file_options={"content-type": "application/json", "upsert": "true"},
+        )
+
+    def upload_file(self, key: str, local_path: str):
+        with open(local_path, "rb") as f:
+            self.bucket.upload(
+                path=key,
+                file=f,
+                file_options={"content-type": "application/gzip", "upsert": "true"},
+            )
+
+    def iter_bytes(self, key: str, offset: int = 0) -> Iterator[bytes]:
+        signed = self.bucket.create_signed_url(key, SIGNED_URL_TTL_SECONDS)
+        url = signed.get("signedURL") or signed.get("signedUrl")
+        req = urllib.request.Request(url, headers={"Range": f"bytes={offset}-"} if offset else {})
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            if offset and resp.status != 206:
+                raise ResumeNotSupported(key)
+            while chunk := resp.read(CHUNK_SIZE):
+                yield chunk
+
+
+class ResumeNotSupported(Exception):
+    pass
+
+
+@lru_cache
+def get_artifact_store():
+    """
+    settings.board_artifact_store:
+      - "supabase"     → the board-dbs bucket
+      - "local:<dir>"  → a directory standing in for the bucket
+      - "" / "none"    → disabled (None)
+    """
+    spec = settings.board_artifact_store.strip()
+    if spec.startswith("local:"):
+        return LocalArtifactStore(spec[len("local:"):])
+    if spec == "supabase":
+        return SupabaseArtifactStore(ARTIFACT_BUCKET)
+    return None
+
+
+# ---------------------------------------------------
+#  Helpers
+# ---------------------------------------------------
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _manifest_key(board: str) -> str:
+    return f"{board}/manifest.json"
+
+
+def _object_key(board: str, sha256: str) -> str:
+    return f"{board}/objects/{sha256}.db.gz"
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# ---------------------------------------------------
+#  Upload / download
+# ---------------------------------------------------
+
+def upload_board_artifact(board: str, db_path: str, sha256: str, built_at: float | None = None) -> bool:
+    """
+    Compress and upload `db_path` unless the bucket already has this
+    content hash. `built_at` (when its data was fetched) travels with it
+    so a download keeps the generation's age. Returns True if anything
+    was uploaded.
+    """
+    store = get_artifact_store()
+    if store is None:
+        return False
+
+    remote = store.read_json(_manifest_key(board))
+    if remote and remote.get("sha256") == sha256:
+        print(f"☁️ '{board}.db' unchanged in artifact store ({sha256[:12]})")
+        return False
+
+    object_key = _object_key(board, sha256)
+    gz_path = f"{db_path}.upload.gz"
+    try:
+        # mtime=0 → identical DB bytes give an identical compressed object
+        with open(db_path, "rb") as src, gzip.GzipFile(gz_path, "wb", compresslevel=6, mtime=0) as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        if not store.exists(object_key):
+            store.upload_file(object_key, gz_path)
+
+        store.write_json(_manifest_key(board), {
+            "board": board,
+            "sha256": sha256,
+            "object": object_key,
+            "encoding": "gzip",
+            "size": os.path.getsize(db_path),
+            "compressed_size": os.path.getsize(gz_path),
+            "compressed_sha256": file_sha256(gz_path),
+            "uploaded_at": time.time(),
+            "built_at": built_at,
+        })
+    finally:
+        _remove_quietly(gz_path)
+
+    print(f"☁️ Uploaded '{board}.db' artifact {sha256[:12]}")
+    return True
+
+
+def download_board_artifact(board: str, dest_path: str) -> dict | None:
+    """
+    Stream the board's latest artifact into `dest_path`. Resumes a
+    previous partial download of the same object. Returns the artifact's
+    manifest ({"sha256", "built_at", "uploaded_at", ...}) once verified,
+    or None if there is no usable artifact.
+    """
+    store = get_artifact_store()
+    if store is None:
+        return None
+
+    remote = store.read_json(_manifest_key(board))
+    if not remote or not remote.get("object"):
+        return None
+
+    sha256 = remote["sha256"]
+    part_path = os.path.join(
+        os.path.dirname(dest_path), f".{board}.{sha256}.gz.part"
+    )
+
+    # 1) compressed bytes → .part (resume from what we already have)
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if remote.get("compressed_size") and offset > remote["compressed_size"]:
+        _remove_quietly(part_path)
+        offset = 0
+    try:
+        with open(part_path, "ab") as f:
+            for chunk in store.iter_bytes(remote["object"], offset):
+                f.write(chunk)
+    except ResumeNotSupported:
+        _remove_quietly(part_path)
+        return download_board_artifact(board, dest_path)
+
+    if remote.get("compressed_sha256") and file_sha256(part_path) != remote["compressed_sha256"]:
+        print(f"🧨 Artifact checksum mismatch for '{board}', discarding download")
+        _remove_quietly(part_path)
+        return None
+
+    # 2) decompress → dest while hashing the DB bytes
+    h = hashlib.sha256()
+    with gzip.open(part_path, "rb") as src, open(dest_path, "wb") as dst:
+        while chunk := src.read(CHUNK_SIZE):
+            h.update(chunk)
+            dst.write(chunk)
+    _remove_quietly(part_path)
+
+    if h.hexdigest() != sha256:
+        print(f"🧨 Artifact content hash mismatch for '{board}', discarding")
+        _remove_quietly(dest_path)
+        return None
+
+    print(f"⬇️ Downloaded '{board}.db' artifact {sha256[:12]}")
+    return remote
@@ -1,28 +1,71 @@
 import os
+import threading
 from config import get_settings
 
 settings = get_settings()
 BASE_BOARD_DIR = os.path.join(settings.data_dir, "boards")
 
-def resolve_board_image_path(board: str, climb: dict) -> str:
+# board -> {"files": {relative image path: absolute path}, "fallback": path | None}
+_image_index: dict[str, dict] = {}
+_image_index_lock = threading.Lock()
+
+
+def _scan_board_images(images_root: str) -> dict:
+    files: dict[str, str] = {}
+    fallback = None
+    for dirpath, _, filenames in os.walk(images_root):
+        for f in sorted(filenames):
+            if f.lower().endswith((".png", ".jpg", ".jpeg")):
+                path = os.path.join(dirpath, f)
+                files[os.path.relpath(path, images_root)] = path
+                fallback = fallback or path
+    return {"files": files, "fallback": fallback}
+
+
+def get_board_image_index(board: str) -> dict:
+    """
+    Cached listing of a board's base images (one os.walk per board).
+    """
     board = board.lower()
-    images_root = os.path.join(BASE_BOARD_DIR, board, "images")
+    with _image_index_lock:
+        index = _image_index.get(board)
+    if index is not None:
+        return index
 
+    images_root = os.path.join(BASE_BOARD_DIR, board, "images")
     if not os.path.isdir(images_root):
         raise FileNotFoundError(f"Board images root not found: {images_root}")
 
+    index = _scan_board_images(images_root)
+    if index["files"]:
+        # don't pin an empty listing; images may still be downloading
+        with _image_index_lock:
+            _image_index[board] = index
+    return index
+
+
+def invalidate_board_image_index(board: str):
+    with _image_index_lock:
+        _image_index.pop(board.lower(), None)
+
+
+def resolve_board_image_path(board: str, climb: dict) -> str:
+    board = board.lower()
+    images_root = os.path.join(BASE_BOARD_DIR, board, "images")
+    index = get_board_image_index(board)
+
     # 1) BEST: exact filename from DB join
     image_filename = climb.get("base_image_filename")
     if image_filename:
-        candidate = os.path.join(images_root, image_filename)
+        candidate = index["files"].get(os.path.normpath(image_filename)) or os.path.join(
+            images_root, image_filename
+        )
         if os.path.exists(candidate):
             return candidate
 
     # 2) Fallback: older behavior (optional) – pick *any* png found recursively
-    for dirpath, _, filenames in os.walk(images_root):
-        for f in sorted(filenames):
-            if f.lower().endswith((".png", ".jpg", ".jpeg")):
-                return os.path.join(dirpath, f)
+    if index["fallback"]:
+        return index["fallback"]
 
     raise FileNotFoundError(f"No board image found under: {images_root}")
 
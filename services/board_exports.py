@@ -0,0 +1,107 @@
+import os
+import gzip
+import time
+import shutil
+import sqlite3
+
+from services.board_artifacts import file_sha256
+from services.build_sqlite import CACHE_DIR
+from services.content_artifacts import get_content_artifact
+
+# ---------------------------------------------------
+#  Slim per-capability exports
+# ---------------------------------------------------
+#
+# /export-board-db serves a subset DB with only the tables the requested
+# capability needs, plus a precompressed .gz twin. Both are derived once
+# per source DB content hash:
+#
+#   exports/<board>.<db sha256[:16]>.<require>.db(.gz)
+#   exports/<board>.<db sha256[:16]>.<require>.json   {"sha256", "gz_sha256"}
+#
+# The sha256 values of the served bytes are the strong ETags.
+
+EXPORT_DIR = os.path.join(CACHE_DIR, "exports")
+
+LAYOUT_TABLES = {
+    "products",
+    "product_sizes",
+    "layouts",
+    "sets",
+    "product_sizes_layouts_sets",
+    "holes",
+    "placements",
+    "placement_roles",
+    "leds",
+}
+
+EXPORT_TABLES = {
+    "images": LAYOUT_TABLES,
+    "logbook": LAYOUT_TABLES | {
+        "climbs",
+        "climb_stats",
+        "difficulty_grades",
+        "shared_syncs",
+    },
+}
+
+
+
+def _build_slim_db(db_path: str, out_path: str, keep: set[str]):
+    """
+    VACUUM INTO a compact copy, then drop every table (and view) the
+    export doesn't need and VACUUM again to reclaim the pages.
+    """
+    src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        src.execute("VACUUM INTO ?", (out_path,))
+    finally:
+        src.close()
+
+    conn = sqlite3.connect(out_path, isolation_level=None)
+    try:
+        # virtual tables (FTS) first: dropping one also drops its shadow tables
+        objects = conn.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%' "
+            "ORDER BY sql NOT LIKE 'CREATE VIRTUAL TABLE%'"
+        ).fetchall()
+        if not keep & {name for _, name in objects}:
+            return  # unknown schema: keep everything rather than export nothing
+        for obj_type, name in objects:
+            if name not in keep:
+                conn.execute(f'DROP {obj_type.upper()} IF EXISTS "{name}"')
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+def get_board_export(board: str, db_path: str, require: str) -> dict:
+    """
+    Returns {"path", "gz_path", "sha256", "gz_sha256"} for the slim
+    `require` export of `db_path`, building it on first use.
+    """
+    if require not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export '{require}'")
+
+    def build(tmp: str, base: str) -> tuple[dict, list[str]]:
+        started = time.perf_counter()
+        _build_slim_db(db_path, f"{tmp}.db", EXPORT_TABLES[require])
+        with open(f"{tmp}.db", "rb") as src, gzip.GzipFile(f"{tmp}.db.gz", "wb", mtime=0) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+        print(
+            f"📦 Built {require} export for '{board}' "
+            f"({os.path.getsize(f'{tmp}.db') // 1024} KiB, "
+            f"{os.path.getsize(f'{tmp}.db.gz') // 1024} KiB gz) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        info = {
+            "path": f"{base}.db",
+            "gz_path": f"{base}.db.gz",
+            "sha256": file_sha256(f"{tmp}.db"),
+            "gz_sha256": file_sha256(f"{tmp}.db.gz"),
+        }
+        return info, [".db", ".db.gz"]
+
+    return get_content_artifact(EXPORT_DIR, board, db_path, require, build)
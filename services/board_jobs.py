@@ -0,0 +1,257 @@
+import os
+import json
+import glob
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import get_settings
+from services.board_artifacts import unique_tmp_path
+from services.build_sqlite import (
+    CACHE_DIR,
+    build_or_download_board_db,
+    check_board_name,
+    get_build_phase,
+    pid_alive,
+    resolve_capability,
+)
+
+settings = get_settings()
+
+# ---------------------------------------------------
+#  Board DB build jobs
+# ---------------------------------------------------
+#
+# Builds run on a bounded pool instead of request threads. One active job
+# per board: submitting again returns the running job, adding the new
+# capability to what it builds. Job records are kept on disk so any
+# uvicorn worker can report them:
+#
+#   jobs/<job_id>.json        the job record (+ owning pid)
+#   jobs/<board>.active       id of the board's unfinished job
+#
+# `progress` is the build phase (download/sync/validate/optimize/publish)
+# read from the board's build, whichever worker runs it. Credentials live
+# only in the owning worker's memory, never in the job record.
+
+JOB_RETENTION_SECONDS = 60 * 60
+JOBS_DIR = os.path.join(CACHE_DIR, "jobs")
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.board_job_workers,
+    thread_name_prefix="board-db-job",
+)
+
+_jobs: dict[str, dict] = {}
+_active: dict[str, str] = {}
+_credentials: dict[str, tuple[str | None, str | None]] = {}
+_jobs_lock = threading.Lock()
+
+
+def _job_path(job_id: str) -> str:
+    return os.path.join(JOBS_DIR, f"{job_id}.json")
+
+
+def _active_path(board: str) -> str:
+    return os.path.join(JOBS_DIR, f"{board}.active")
+
+
+def _write_json(path: str, data):
+    try:
+        os.makedirs(JOBS_DIR, exist_ok=True)
+        tmp_path = unique_tmp_path(path)
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not persist {path}: {e}")
+
+
+def _read_json(path: str):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_job(job: dict):
+    _write_json(_job_path(job["id"]), job)
+
+
+def _load_job(job_id: str) -> dict | None:
+    """
+    A job record written by any worker; unfinished jobs whose worker is
+    gone are reported as failed.
+    """
+    if not job_id or "/" in job_id or job_id.startswith("."):
+        return None
+    job = _read_json(_job_path(job_id))
+    if job and not job["finished_at"] and not pid_alive(job["pid"]):
+        job.update(status="failed", error="worker exited before the job finished")
+    return job
+
+
+def _public(job: dict) -> dict:
+    job = dict(job)
+    now = time.time()
+    started = job["started_at"]
+    finished = job["finished_at"]
+    job["queue_seconds"] = round((started or now) - job["created_at"], 3)
+    job["run_seconds"] = round((finished or now) - started, 3) if started else None
+
+    if job["status"] == "running":
+        phase = get_build_phase(job["board"])
+        # no phase → waiting on another build / the board lock
+        job["progress"] = phase["phase"] if phase else "waiting"
+    else:
+        job["progress"] = {"queued": "queued", "succeeded": "done"}.get(job["status"], "failed")
+    return job
+
+
+def _prune_finished(now: float):
+    for job_id, job in list(_jobs.items()):
+        if job["finished_at"] and now - job["finished_at"] > JOB_RETENTION_SECONDS:
+            del _jobs[job_id]
+
+    # records from every worker (including ones that have exited)
+    for path in glob.glob(os.path.join(JOBS_DIR, "*.json")):
+        try:
+            if now - os.path.getmtime(path) <= JOB_RETENTION_SECONDS:
+                continue
+            job = _read_json(path)
+            if not job or job["finished_at"] or not pid_alive(job["pid"]):
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _active_elsewhere(board: str, capability: str) -> dict | None:
+    """
+    The board's unfinished job in another live worker, if it already
+    builds `capability`.
+    """
+    pointer = _read_json(_active_path(board))
+    job = _load_job(pointer) if isinstance(pointer, str) else None
+    if not job or job["finished_at"] or job["status"] == "failed" or job["pid"] == os.getpid():
+        return None
+    if capability not in {resolve_capability(r) for r in job["requires"]}:
+        return None
+    return job
+
+
+def submit_board_db_job(
+    board: str,
+    *,
+    require: str = "catalog",
+    username: str | None = None,
+    password: str | None = None,
+) -> dict:
+    """
+    Enqueue a build for `board`, or return its active job (which then
+    also builds `require` if it didn't already). Raises ValueError for
+    an invalid board name.
+    """
+    board = check_board_name(board.lower().strip())
+    capability = resolve_capability(require)
+    now = time.time()
+
+    with _jobs_lock:
+        _prune_finished(now)
+        active_id = _active.get(board)
+        if active_id:
+            job = _jobs[active_id]
+            if capability not in {resolve_capability(r) for r in job["requires"]}:
+                job["requires"].append(require)
+                print(f"📋 DB job {active_id} for '{board}' now also builds {require}")
+            if username and password:
+                _credentials[active_id] = (username, password)
+            _save_job(job)
+            return _public(job)
+
+        elsewhere = _active_elsewhere(board, capability)
+        if elsewhere:
+            return _public(elsewhere)
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "board": board,
+            "require": require,
+            "requires": [require],
+            "status": "queued",
+            "progress": "queued",
+            "db_path": None,
+            "error": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "pid": os.getpid(),
+        }
+        _jobs[job["id"]] = job
+        _active[board] = job["id"]
+        _credentials[job["id"]] = (username, password)
+        _save_job(job)
+        _write_json(_active_path(board), job["id"])
+
+    _executor.submit(_run_job, job["id"])
+    print(f"📋 Queued {require} DB job {job['id']} for '{board}'")
+    return _public(job)
+
+
+def _finish_job(job: dict, **update):
+    """
+    Call with _jobs_lock held.
+    """
+    job.update(finished_at=time.time(), **update)
+    board = job["board"]
+    if _active.get(board) == job["id"]:
+        del _active[board]
+    _credentials.pop(job["id"], None)
+    _save_job(job)
+    if _read_json(_active_path(board)) == job["id"]:
+        try:
+            os.remove(_active_path(board))
+        except FileNotFoundError:
+            pass
+
+
+def _run_job(job_id: str):
+    with _jobs_lock:
+        job = _jobs[job_id]
+        job.update(status="running", started_at=time.time())
+        _save_job(job)
+
+    built: set[str] = set()
+    db_path = None
+    try:
+        while True:
+            with _jobs_lock:
+                pending = [r for r in job["requires"] if resolve_capability(r) not in built]
+                if not pending:
+                    # finish under the lock, so a late capability upgrade
+                    # either lands in `pending` or starts a new job
+                    _finish_job(job, status="succeeded", db_path=db_path)
+                    return
+                username, password = _credentials.get(job_id, (None, None))
+
+            db_path = build_or_download_board_db(
+                board=job["board"],
+                username=username,
+                password=password,
+                require=pending[0],
+            )
+            built.add(resolve_capability(pending[0]))
+    except Exception as e:
+        print(f"❌ DB job {job_id} for '{job['board']}' failed: {e}")
+        with _jobs_lock:
+            _finish_job(job, status="failed", error=str(e))
+
+
+def get_board_db_job(job_id: str) -> dict | None:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job:
+            return _public(job)
+    job = _load_job(job_id)
+    return _public(job) if job else None
@@ -0,0 +1,201 @@
+import os
+import time
+import sqlite3
+import threading
+
+from services.db_pool import pooled_connection
+
+# ---------------------------------------------------
+#  Climb statistics aggregates
+# ---------------------------------------------------
+#
+# Built into every new generation (after the change log, before
+# ANALYZE) from climbs ⋈ climb_stats, listed non-draft climbs only:
+#
+#   svc_stats_grades   (layout_id, angle, difficulty, grade, climbs, ascents)
+#   svc_stats_popular  (layout_id, angle, rank, uuid, name, setter, ascents,
+#                       quality, difficulty)   top POPULAR_TOP_N per group
+#   svc_stats_setters  (layout_id, setter, climbs, ascents)
+#
+# /boards/{board}/stats reads these small tables once per generation.
+
+POPULAR_TOP_N = 50
+
+STATS_TABLES = ("svc_stats_grades", "svc_stats_popular", "svc_stats_setters")
+
+REQUIRED_COLUMNS = {
+    "climbs": {"uuid", "layout_id", "name", "setter_username"},
+    "climb_stats": {"climb_uuid", "angle", "display_difficulty", "ascensionist_count", "quality_average"},
+}
+
+
+def _columns(conn, table: str) -> set[str]:
+    return {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def build_board_stats(db_path: str) -> dict:
+    """
+    (Re)create the summary tables in `db_path`. Returns a summary for the
+    manifest; {"skipped": ...} when the schema can't support it.
+    """
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        for table, required in REQUIRED_COLUMNS.items():
+            missing = required - _columns(conn, table)
+            if missing:
+                return {"skipped": f"{table} lacks {', '.join(sorted(missing))}"}
+
+        climb_cols = _columns(conn, "climbs")
+        listed = ["1"]
+        if "is_listed" in climb_cols:
+            listed.append("COALESCE(c.is_listed, 1) = 1")
+        if "is_draft" in climb_cols:
+            listed.append("COALESCE(c.is_draft, 0) = 0")
+        has_grades = "difficulty_grades" in {
+            r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        }
+
+        conn.execute("BEGIN IMMEDIATE")
+        for table in STATS_TABLES:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+        conn.execute(f"""
+            CREATE TEMP VIEW svc_stats_base AS
+            SELECT
+                c.layout_id AS layout_id,
+                s.angle AS angle,
+                c.uuid AS uuid,
+                c.name AS name,
+                c.setter_username AS setter,
+                CAST(ROUND(s.display_difficulty) AS INTEGER) AS difficulty,
+                COALESCE(s.ascensionist_count, 0) AS ascents,
+                s.quality_average AS quality
+            FROM climbs c
+            JOIN climb_stats s ON s.climb_uuid = c.uuid
+            WHERE {' AND '.join(listed)}
+        """)
+
+        grade_name = "g.boulder_name" if has_grades else "NULL"
+        grade_join = (
+            "LEFT JOIN difficulty_grades g ON g.difficulty = b.difficulty" if has_grades else ""
+        )
+        conn.execute(f"""
+            CREATE TABLE svc_stats_grades AS
+            SELECT b.layout_id, b.angle, b.difficulty, {grade_name} AS grade,
+                   COUNT(*) AS climbs, SUM(b.ascents) AS ascents
+            FROM svc_stats_base b {grade_join}
+            WHERE b.difficulty IS NOT NULL
+            GROUP BY b.layout_id, b.angle, b.difficulty
+        """)
+        conn.execute(f"""
+            CREATE TABLE svc_stats_popular AS
+            SELECT layout_id, angle, rank, uuid, name, setter, ascents, quality, difficulty
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY layout_id, angle ORDER BY ascents DESC, uuid
+                ) AS rank
+                FROM svc_stats_base
+            )
+            WHERE rank <= {POPULAR_TOP_N}
+        """)
+        # setters count climbs once, summing ascents over every angle
+        conn.execute("""
+            CREATE TABLE svc_stats_setters AS
+            SELECT layout_id, setter, COUNT(DISTINCT uuid) AS climbs, SUM(ascents) AS ascents
+            FROM svc_stats_base
+            WHERE setter IS NOT NULL
+            GROUP BY layout_id, setter
+        """)
+        conn.execute("DROP VIEW svc_stats_base")
+        for table, cols in (
+            ("svc_stats_grades", "layout_id, angle"),
+            ("svc_stats_popular", "layout_id, angle, rank"),
+            ("svc_stats_setters", "layout_id, climbs"),
+        ):
+            conn.execute(f"CREATE INDEX idx_{table} ON {table} ({cols})")
+
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in STATS_TABLES
+        }
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    return {
+        "rows": counts,
+        "top_n": POPULAR_TOP_N,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+# ---------------------------------------------------
+#  Read side
+# ---------------------------------------------------
+
+# board → (generation path, stats); generations are immutable
+_stats_cache: dict[str, tuple[str, dict]] = {}
+_stats_lock = threading.Lock()
+
+
+def _load_board_stats(db_path: str) -> dict | None:
+    with pooled_connection(db_path) as conn:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        if not set(STATS_TABLES) <= tables:
+            return None
+
+        def rows(sql: str) -> list[dict]:
+            cur = conn.execute(sql)
+            cols = [c[0] for c in cur.description]
+            return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+        grades = rows(
+            "SELECT layout_id, angle, difficulty, grade, climbs, ascents "
+            "FROM svc_stats_grades ORDER BY layout_id, angle, difficulty"
+        )
+        popular = rows(
+            "SELECT layout_id, angle, rank, uuid, name, setter, ascents, quality, difficulty "
+            "FROM svc_stats_popular ORDER BY layout_id, angle, rank"
+        )
+        setters = rows(
+            "SELECT layout_id, setter, climbs, ascents "
+            "FROM svc_stats_setters ORDER BY layout_id, climbs DESC, setter"
+        )
+
+    # layout → angle → {...}, so a request is a couple of dict lookups
+    layouts: dict = {}
+    for r in grades:
+        angle = layouts.setdefault(r["layout_id"], {"angles": {}, "setters": []})["angles"] \
+            .setdefault(r["angle"], {"grades": [], "popular": []})
+        angle["grades"].append({k: r[k] for k in ("difficulty", "grade", "climbs", "ascents")})
+    for r in popular:
+        angle = layouts.setdefault(r["layout_id"], {"angles": {}, "setters": []})["angles"] \
+            .setdefault(r["angle"], {"grades": [], "popular": []})
+        angle["popular"].append({k: r[k] for k in r if k not in ("layout_id", "angle")})
+    for r in setters:
+        layouts.setdefault(r["layout_id"], {"angles": {}, "setters": []})["setters"].append(
+            {k: r[k] for k in ("setter", "climbs", "ascents")}
+        )
+    return {"generation": os.path.basename(db_path), "layouts": layouts}
+
+
+def get_board_stats(board: str, db_path: str) -> dict | None:
+    """
+    Aggregates for the board's current generation, or None if the DB was
+    built before the stats stage ran.
+    """
+    with _stats_lock:
+        cached = _stats_cache.get(board)
+    if cached and cached[0] == db_path:
+        return cached[1]
+
+    stats = _load_board_stats(db_path)
+    if stats is not None:
+        with _stats_lock:
+            _stats_cache[board] = (db_path, stats)
+    return stats
@@ -0,0 +1,102 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import get_settings
+from services.board_assets import get_board_image_index
+from services.climb_index import get_climb_index
+from services.build_sqlite import build_or_download_board_db, get_db_manifest
+
+settings = get_settings()
+
+# ---------------------------------------------------
+#  Startup warm-up
+# ---------------------------------------------------
+#
+# Builds/validates settings.warmup_boards × settings.warmup_capabilities
+# on a bounded pool so the first real request doesn't pay for it. The
+# instance reports ready once every task has finished (failures are
+# reported per task but don't hold readiness back forever).
+
+_state = {
+    "status": "idle",  # idle | warming | ready
+    "started_at": None,
+    "finished_at": None,
+    "tasks": {},
+}
+_state_lock = threading.Lock()
+
+
+def _warm_one(board: str, require: str):
+    key = f"{board}:{require}"
+    started = time.perf_counter()
+    with _state_lock:
+        _state["tasks"][key]["status"] = "running"
+
+    try:
+        db_path = build_or_download_board_db(board=board, require=require)
+        get_db_manifest(db_path)
+        image_count = None
+        if require == "layouts":
+            get_climb_index(db_path)
+            try:
+                image_count = len(get_board_image_index(board)["files"])
+            except FileNotFoundError:
+                image_count = 0  # images not fetched yet (/fetch-board-images)
+        update = {"status": "ok", "image_count": image_count}
+    except Exception as e:
+        print(f"⚠️ Warm-up failed for {key}: {e}")
+        update = {"status": "failed", "error": str(e)}
+
+    with _state_lock:
+        _state["tasks"][key].update(seconds=round(time.perf_counter() - started, 3), **update)
+
+
+def _run_warmup(pairs: list[tuple[str, str]]):
+    with ThreadPoolExecutor(
+        max_workers=settings.warmup_workers,
+        thread_name_prefix="board-warmup",
+    ) as pool:
+        for board, require in pairs:
+            pool.submit(_warm_one, board, require)
+
+    with _state_lock:
+        _state.update(status="ready", finished_at=time.time())
+        failed = [k for k, t in _state["tasks"].items() if t["status"] == "failed"]
+    print(f"🔥 Warm-up finished ({len(pairs)} tasks, {len(failed)} failed)")
+
+
+def start_board_warmup():
+    """
+    Kick off warm-up in the background (called from the startup hook).
+    """
+    pairs = [
+        (board, require)
+        for board in settings.warmup_boards
+        for require in settings.warmup_capabilities
+    ]
+    with _state_lock:
+        if _state["status"] != "idle":
+            return
+        _state["started_at"] = time.time()
+        if not pairs:
+            _state.update(status="ready", finished_at=time.time())
+            return
+        _state["status"] = "warming"
+        _state["tasks"] = {f"{b}:{r}": {"status": "queued"} for b, r in pairs}
+
+    print(f"🔥 Warming {len(pairs)} board DB task(s): {', '.join(_state['tasks'])}")
+    threading.Thread(target=_run_warmup, args=(pairs,), name="board-warmup", daemon=True).start()
+
+
+def is_warm() -> bool:
+    with _state_lock:
+        return _state["status"] == "ready"
+
+
+def warmup_status() -> dict:
+    with _state_lock:
+        return {
+            **_state,
+            "tasks": {k: dict(v) for k, v in _state["tasks"].items()},
+        }
@@ -1,4 +1,5 @@
-from PIL import Image, ImageDraw
+from PIL import ImageDraw
+from services.base_image_cache import get_base_image
 from services.render_helpers import parse_frames
 import os
 
@@ -15,8 +16,8 @@ def build_climb_image(
     if not os.path.exists(base_board_path):
         raise FileNotFoundError(f"Base board image not found at {base_board_path}")
 
-    # 1️⃣ Open base board image
-    img = Image.open(base_board_path).convert("RGBA")
+    # 1️⃣ Base board image (decoded once, copied per render)
+    img = get_base_image(base_board_path)
     draw = ImageDraw.Draw(img, "RGBA")
 
     # 2️⃣ Map frames -> hold coordinates
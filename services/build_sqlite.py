@@ -1,9 +1,32 @@
 import os
+import re
 import sys
+import json
+import time
 import sqlite3
+import glob
+import uuid
+import fcntl
+import threading
+import shutil
 import subprocess
+from concurrent.futures import Future
+from contextlib import contextmanager
 from config import get_settings
 from supabase import create_client, Client
+from services.aurora_sync import delta_sync_board_db
+from services.aurora_sessions import call_with_aurora_session
+from services.board_stats import build_board_stats
+from services.catalog_changes import record_catalog_changes
+from services.climb_index import drop_climb_index
+from services.climb_loader import CLIMB_BY_UUID_SQL
+from services.db_pool import close_db_pool, pooled_connection
+from services.board_artifacts import (
+    download_board_artifact,
+    file_sha256,
+    unique_tmp_path,
+    upload_board_artifact,
+)
 
 settings = get_settings()
 
@@ -28,6 +51,18 @@ BUCKET_NAME = "board-dbs"
 # Boards that REQUIRE auth for full DBs
 AUTH_REQUIRED_BOARDS = {"kilter", "moon"}
 
+# board names end up in file names and glob patterns
+BOARD_NAME_RE = re.compile(r"[a-z][a-z0-9_]{0,31}")
+
+
+def check_board_name(board: str) -> str:
+    """
+    Returns `board`, or raises ValueError if it isn't a plain board name.
+    """
+    if not isinstance(board, str) or not BOARD_NAME_RE.fullmatch(board):
+        raise ValueError(f"Invalid board name {board!r}")
+    return board
+
 
 # ---------------------------------------------------
 #  Utilities
@@ -38,34 +73,218 @@ def get_python_bin() -> str:
 
 
 def get_tables(db_path: str) -> set[str]:
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = {row[0] for row in cur.fetchall()}
-    conn.close()
-    return tables
+    with pooled_connection(db_path) as conn:
+        cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        return {row[0] for row in cur.fetchall()}
 
 def climbs_has_name_column(db_path: str) -> bool:
     try:
-        conn = sqlite3.connect(db_path)
-        cur = conn.execute("PRAGMA table_info(climbs)")
-        cols = {r[1] for r in cur.fetchall()}
+        return bool(CLIMB_NAME_COLUMNS & set(get_db_manifest(db_path)["climbs_columns"]))
+    except Exception:
+        return False
+
+
+# ---------------------------------------------------
+#  Capability manifest
+# ---------------------------------------------------
+#
+# One manifest per DB file: tables, climbs columns, row counts and the
+# capabilities it satisfies. Keyed by (mtime, size, inode) so a rebuilt
+# file is re-inspected, held in memory and persisted next to the DB as
+# <db>.manifest.json. The hot path only costs a stat().
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = ".manifest.json"
+
+CLIMB_NAME_COLUMNS = {"name", "climb_name", "title"}
+
+# capability -> tables it needs (logbook additionally needs a name column)
+CAPABILITY_TABLES = {
+    "layouts": {"product_sizes_layouts_sets"},
+    "catalog": {"climbs", "product_sizes_layouts_sets"},
+    "geometry": {"problems", "problem_holds", "holds"},
+    "logbook": {"climbs", "product_sizes_layouts_sets"},
+    "public": {"problems", "problem_holds", "holds", "product_sizes_layouts_sets"},
+}
+
+_manifest_cache: dict[str, dict] = {}
+_manifest_lock = threading.Lock()
+# db_path → lock serializing compute / read-modify-write of its sidecar
+_manifest_path_locks: dict[str, threading.RLock] = {}
+
+
+def _manifest_path_lock(db_path: str) -> threading.RLock:
+    with _manifest_lock:
+        return _manifest_path_locks.setdefault(db_path, threading.RLock())
+
+
+def manifest_path_for(db_path: str) -> str:
+    return db_path + MANIFEST_SUFFIX
+
+
+def _stat_key(st: os.stat_result) -> dict:
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "inode": st.st_ino}
+
+
+def compute_db_manifest(db_path: str, key: dict) -> dict:
+    """
+    Inspect a DB file with a single connection.
+    """
+    error = None
+    tables, climbs_columns, row_counts = [], [], {}
+    # immutable=1: generations never change once built, and it keeps a
+    # WAL-mode file from growing -wal/-shm siblings on a read-only open
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro&immutable=1", uri=True)
+    try:
+        tables = sorted(
+            r[0] for r in conn.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+            )
+        )
+        climbs_columns = (
+            [r[1] for r in conn.execute("PRAGMA table_info(climbs)")]
+            if "climbs" in tables else []
+        )
+        row_counts = {
+            t: conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0]
+            for t in tables
+        }
+    except sqlite3.DatabaseError as e:
+        # corrupt / half-written file: record it so it reads as incapable
+        error = str(e)
+        tables, climbs_columns, row_counts = [], [], {}
+    finally:
         conn.close()
-        return bool({"name", "climb_name", "title"} & cols)
+
+    table_set = set(tables)
+    capabilities = {
+        cap: required.issubset(table_set)
+        for cap, required in CAPABILITY_TABLES.items()
+    }
+    capabilities["logbook"] = capabilities["logbook"] and bool(
+        CLIMB_NAME_COLUMNS & set(climbs_columns)
+    )
+
+    return {
+        "version": MANIFEST_VERSION,
+        "key": key,
+        "tables": tables,
+        "climbs_columns": climbs_columns,
+        "row_counts": row_counts,
+        "capabilities": capabilities,
+        "error": error,
+        "computed_at": time.time(),
+    }
+
+
+def _read_manifest_file(db_path: str, key: dict) -> dict | None:
+    try:
+        with open(manifest_path_for(db_path)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("key") != key:
+        return None
+    return manifest
+
+
+def _write_manifest_file(db_path: str, manifest: dict):
+    path = manifest_path_for(db_path)
+    tmp_path = None
+    try:
+        tmp_path = unique_tmp_path(path)
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not persist manifest for {db_path}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def get_db_manifest(db_path: str) -> dict | None:
+    """
+    Returns the capability manifest for `db_path`, or None if the file
+    does not exist. Recomputed only when the file's stat key changes.
+    """
+    try:
+        st = os.stat(db_path)
+    except FileNotFoundError:
+        return None
+    key = _stat_key(st)
+
+    with _manifest_lock:
+        cached = _manifest_cache.get(db_path)
+    if cached and cached["key"] == key:
+        return cached
+
+    with _manifest_path_lock(db_path):
+        with _manifest_lock:
+            cached = _manifest_cache.get(db_path)
+        if cached and cached["key"] == key:
+            return cached
+
+        manifest = _read_manifest_file(db_path, key)
+        if manifest is None:
+            manifest = compute_db_manifest(db_path, key)
+            _write_manifest_file(db_path, manifest)
+
+        with _manifest_lock:
+            _manifest_cache[db_path] = manifest
+    return manifest
+
+
+def update_db_manifest(db_path: str, **fields) -> dict | None:
+    """
+    Merge extra fields into a DB's manifest (memory + sidecar). Updates
+    to the same DB are serialized, so concurrent merges keep each other's
+    fields.
+    """
+    with _manifest_path_lock(db_path):
+        manifest = get_db_manifest(db_path)
+        if manifest is None:
+            return None
+        manifest = {**manifest, **fields}
+        _write_manifest_file(db_path, manifest)
+        with _manifest_lock:
+            _manifest_cache[db_path] = manifest
+    return manifest
+
+
+def invalidate_db_manifest(db_path: str):
+    with _manifest_lock:
+        _manifest_cache.pop(db_path, None)
+        _manifest_path_locks.pop(db_path, None)
+    try:
+        os.remove(manifest_path_for(db_path))
+    except FileNotFoundError:
+        pass
+
+
+def has_capability(db_path: str, require: str) -> bool:
+    try:
+        manifest = get_db_manifest(db_path)
+        return bool(manifest and manifest["capabilities"].get(require))
     except Exception:
         return False
 
+
+def db_capabilities(db_path: str) -> set[str]:
+    try:
+        manifest = get_db_manifest(db_path)
+        return {cap for cap, ok in (manifest or {}).get("capabilities", {}).items() if ok}
+    except Exception:
+        return set()
+
+
 def has_image_capability(db_path: str) -> bool:
     """
     Required for:
     - images
     - layout rendering
     """
-    try:
-        tables = get_tables(db_path)
-        return "product_sizes_layouts_sets" in tables
-    except Exception:
-        return False
+    return has_capability(db_path, "layouts")
 
 
 def has_logbook_capability(db_path: str) -> bool:
@@ -75,15 +294,7 @@ def has_logbook_capability(db_path: str) -> bool:
     - attempts
     - climb name resolution
     """
-    try:
-        tables = get_tables(db_path)
-        ok_tables = {"climbs", "product_sizes_layouts_sets"}.issubset(tables)
-        if not ok_tables:
-            return False
-        # ✅ NEW: ensure climbs has a name-like column
-        return climbs_has_name_column(db_path)
-    except Exception:
-        return False
+    return has_capability(db_path, "logbook")
     
 def has_public_capability(db_path: str) -> bool:
     """
@@ -92,71 +303,580 @@ def has_public_capability(db_path: str) -> bool:
     - hold coordinates
     - image overlays
     """
+    return has_capability(db_path, "public")
+
+def has_catalog_capability(db_path: str) -> bool:
+    return has_capability(db_path, "catalog")
+
+def has_geometry_capability(db_path: str) -> bool:
+    return has_capability(db_path, "geometry")
+
+def get_db_content_hash(db_path: str) -> str:
+    """
+    sha256 of the DB file, computed once and kept in its manifest.
+    """
+    manifest = get_db_manifest(db_path)
+    if manifest is None:
+        raise FileNotFoundError(db_path)
+    if manifest.get("sha256"):
+        return manifest["sha256"]
+
+    # first caller hashes, concurrent callers wait for its result
+    with _manifest_path_lock(db_path):
+        manifest = get_db_manifest(db_path)
+        if manifest is None:
+            raise FileNotFoundError(db_path)
+        if not manifest.get("sha256"):
+            manifest = update_db_manifest(db_path, sha256=file_sha256(db_path))
+            if manifest is None:
+                raise FileNotFoundError(db_path)
+    return manifest["sha256"]
+
+
+def download_from_supabase(board: str, local_path: str) -> dict | None:
+    """
+    The downloaded artifact's manifest, or None.
+    """
     try:
-        tables = get_tables(db_path)
-        return {
-            "problems",
-            "problem_holds",
-            "holds",
-            "product_sizes_layouts_sets",
-        }.issubset(tables)
-    except Exception:
+        return download_board_artifact(board, local_path)
+    except Exception as e:
+        print(f"⚠️ Supabase download failed: {e}")
+        return None
+
+
+def upload_to_supabase(board: str, local_path: str):
+    try:
+        upload_board_artifact(
+            board,
+            local_path,
+            get_db_content_hash(local_path),
+            built_at=generation_built_at(local_path),
+        )
+    except Exception as e:
+        print(f"⚠️ Supabase upload failed: {e}")
+
+
+# ---------------------------------------------------
+#  Post-build optimization
+# ---------------------------------------------------
+#
+# Runs on every new generation before it is published: make sure the
+# service's hot query shapes have indexes, EXPLAIN them and record any
+# full scans in the manifest, (re)build the climb name search index,
+# then ANALYZE and switch to WAL.
+
+OPTIMIZE_VERSION = 2
+
+# external-content FTS5 over climbs.name; trigram → substring matches
+CLIMB_NAME_FTS = "svc_climbs_name_fts"
+
+# (table, columns) the service filters / joins on; skipped when the
+# schema lacks the columns or an existing index already leads with them
+SERVICE_INDEXES = [
+    ("climbs", ("uuid",)),
+    ("climbs", ("product_sizes_layouts_set_id",)),
+    ("climbs", ("layout_id", "angle")),
+    ("climbs", ("grade",)),
+    ("climbs", ("setter_username",)),
+    ("climb_stats", ("climb_uuid", "angle")),
+    ("climb_stats", ("angle", "display_difficulty")),
+    ("product_sizes_layouts_sets", ("id",)),
+]
+
+# name → (tables, sql, sample params); none of these may plan a full
+# SCAN. Skipped only when the schema has none of its tables.
+HOT_QUERY_PLANS = {
+    "climb_by_uuid": (
+        ("climbs", "product_sizes_layouts_sets"),
+        CLIMB_BY_UUID_SQL,
+        ("0",),
+    ),
+    "climbs_by_set": (
+        ("climbs",),
+        "SELECT uuid FROM climbs WHERE product_sizes_layouts_set_id = ?",
+        (1,),
+    ),
+    "stats_by_angle_grade": (
+        ("climb_stats",),
+        "SELECT climb_uuid FROM climb_stats "
+        "WHERE angle = ? AND display_difficulty BETWEEN ? AND ?",
+        (40, 10, 20),
+    ),
+}
+
+
+def _indexed_prefixes(conn: sqlite3.Connection, table: str) -> list[tuple[str, ...]]:
+    prefixes = [
+        tuple(r[2] for r in conn.execute(f'PRAGMA index_info("{idx[1]}")'))
+        for idx in conn.execute(f'PRAGMA index_list("{table}")')
+    ]
+    # INTEGER PRIMARY KEY is the rowid and never shows up in index_list
+    pk = [r for r in conn.execute(f'PRAGMA table_info("{table}")') if r[5]]
+    if len(pk) == 1 and pk[0][2].upper() == "INTEGER":
+        prefixes.append((pk[0][1],))
+    return prefixes
+
+
+def check_query_plans(conn: sqlite3.Connection) -> dict[str, list[str]]:
+    """
+    EXPLAIN QUERY PLAN for each hot query. Returns {name: [SCAN lines]}
+    for the ones that regressed to a full scan, or {name: ["error: …"]}
+    for ones that no longer prepare against this schema (renamed column,
+    broken SQL).
+    """
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    problems = {}
+    for name, (query_tables, sql, params) in HOT_QUERY_PLANS.items():
+        if not tables & set(query_tables):
+            continue  # e.g. a geometry-only DB has no climbs at all
+        try:
+            plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            problems[name] = [f"error: {e}"]
+            continue
+        scans = [row[3] for row in plan if row[3].startswith("SCAN")]
+        if scans:
+            problems[name] = scans
+    return problems
+
+
+def build_climb_name_search(conn: sqlite3.Connection) -> bool:
+    """
+    Rebuild the FTS5 name index from climbs. Generations are immutable
+    once published, so no triggers: every build (full or delta) rebuilds.
+    """
+    climbs_cols = {r[1] for r in conn.execute("PRAGMA table_info(climbs)")}
+    if "name" not in climbs_cols:
+        return False
+    try:
+        conn.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {CLIMB_NAME_FTS} USING fts5("
+            "name, content='climbs', content_rowid='rowid', tokenize='trigram')"
+        )
+        conn.execute(f"INSERT INTO {CLIMB_NAME_FTS}({CLIMB_NAME_FTS}) VALUES ('rebuild')")
+    except sqlite3.OperationalError as e:
+        # SQLite without FTS5 / trigram: name search falls back to LIKE
+        print(f"⚠️ Climb name search index unavailable: {e}")
         return False
+    return True
 
-def has_catalog_capability(db_path: str) -> bool:
+
+def optimize_board_db(db_path: str) -> dict:
+    """
+    Create missing service indexes, ANALYZE, set WAL and check plans.
+    Returns the summary stored under the manifest's "optimized" key;
+    _build_board_db fails the build if "query_plan_problems" is set.
+    """
+    started = time.perf_counter()
+    created = []
+    conn = sqlite3.connect(db_path, isolation_level=None)
     try:
-        tables = get_tables(db_path)
-        return {
-            "climbs",
-            "product_sizes_layouts_sets",
-        }.issubset(tables)
-    except Exception:
+        for table, cols in SERVICE_INDEXES:
+            table_cols = {r[1] for r in conn.execute(f'PRAGMA table_info("{table}")')}
+            if not table_cols or not set(cols) <= table_cols:
+                continue
+            if any(prefix[:len(cols)] == cols for prefix in _indexed_prefixes(conn, table)):
+                continue
+            name = f"idx_svc_{table}_{'_'.join(cols)}"
+            col_sql = ", ".join(f'"{c}"' for c in cols)
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({col_sql})')
+            created.append(name)
+
+        # before ANALYZE: on tiny/skewed data the planner may rightly
+        # prefer a scan; what we guard against is a missing index
+        problems = check_query_plans(conn)
+        name_search = build_climb_name_search(conn)
+        conn.execute("ANALYZE")
+        journal_mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    finally:
+        conn.close()
+
+    if problems:
+        print(f"❌ Query plan regressions in {os.path.basename(db_path)}: {problems}")
+
+    return {
+        "version": OPTIMIZE_VERSION,
+        "indexes_created": created,
+        "analyzed": True,
+        "journal_mode": journal_mode,
+        "query_plan_problems": problems,
+        "name_search": name_search,
+        "seconds": round(time.perf_counter() - started, 3),
+        "at": time.time(),
+    }
+
+
+# ---------------------------------------------------
+#  DB generations
+# ---------------------------------------------------
+#
+# Every build writes a new immutable generation file under
+# generations/<board>.<id>.db. <board>.db is a symlink to the current
+# generation and is swapped atomically with os.replace(). Callers get the
+# generation path itself, so a reader keeps using the file it was handed;
+# retired generations are removed only after GENERATION_GRACE_SECONDS
+# (open handles survive the unlink on POSIX anyway).
+
+GENERATIONS_DIR = os.path.join(CACHE_DIR, "generations")
+GENERATION_GRACE_SECONDS = 10 * 60
+BUILDING_SUFFIX = ".building"
+RETIRED_SUFFIX = ".retired"
+
+
+def board_db_link_path(board: str) -> str:
+    return os.path.join(CACHE_DIR, f"{board}.db")
+
+
+def current_generation_path(board: str) -> str | None:
+    """
+    Absolute path of the board's current DB generation, or None.
+    A legacy plain-file <board>.db counts as its own generation.
+    """
+    path = os.path.realpath(board_db_link_path(board))
+    return path if os.path.exists(path) else None
+
+
+def is_retired_generation(db_path: str) -> bool:
+    """
+    True once `db_path` is gone, or is a published generation that is no
+    longer its board's current one. Lets every worker drop per-generation
+    state (pools, indexes) that only the publishing worker would
+    otherwise clean up.
+    """
+    if not os.path.exists(db_path):
+        return True
+    path = os.path.realpath(db_path)
+    if os.path.dirname(path) != os.path.realpath(GENERATIONS_DIR):
         return False
+    name = os.path.basename(path)
+    if not name.endswith(".db"):
+        return False  # building / retired files
+    return current_generation_path(name.split(".", 1)[0]) != path
 
-def has_geometry_capability(db_path: str) -> bool:
+
+def new_generation_path(board: str) -> str:
+    os.makedirs(GENERATIONS_DIR, exist_ok=True)
+    gen_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    return os.path.abspath(os.path.join(GENERATIONS_DIR, f"{board}.{gen_id}.db"))
+
+
+def _remove_db_files(db_path: str):
+    close_db_pool(db_path)
+    drop_climb_index(db_path)
+    invalidate_db_manifest(db_path)
+    for path in [db_path, db_path + RETIRED_SUFFIX] + glob.glob(glob.escape(db_path) + "-*"):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _rename_db(src: str, dst: str):
+    """
+    Rename a DB file and carry its manifest (same inode → same key).
+    """
+    manifest = get_db_manifest(src)
+    os.replace(src, dst)
+    invalidate_db_manifest(src)
+    if manifest is not None:
+        _write_manifest_file(dst, manifest)
+        with _manifest_lock:
+            _manifest_cache[dst] = manifest
+
+
+def publish_generation(board: str, gen_path: str):
+    """
+    Atomically point <board>.db at `gen_path` and retire the previous one.
+    """
+    link = board_db_link_path(board)
+    previous = current_generation_path(board)
+    legacy = os.path.isfile(link) and not os.path.islink(link)
+
+    tmp_link = f"{link}.{os.getpid()}.{threading.get_ident()}.swap"
+    os.symlink(os.path.relpath(gen_path, CACHE_DIR), tmp_link)
+    os.replace(tmp_link, link)
+    print(f"🔁 '{board}' now serving {os.path.basename(gen_path)}")
+
+    if not previous or previous == gen_path:
+        return
+    # readers still holding a pooled connection finish on the old file
+    close_db_pool(previous)
+    drop_climb_index(previous)
+    if legacy:
+        # the old plain file was unlinked by the swap; only its sidecar is left
+        invalidate_db_manifest(previous)
+    else:
+        with open(previous + RETIRED_SUFFIX, "w") as f:
+            f.write(str(time.time()))
+
+
+def discard_partial_builds(board: str):
+    """
+    Remove leftover in-progress build files. Caller must hold the build lock.
+    """
+    pattern = os.path.join(glob.escape(GENERATIONS_DIR), f"{glob.escape(board)}.*.db{BUILDING_SUFFIX}")
+    for path in glob.glob(pattern):
+        print(f"🧹 Removing partial build {os.path.basename(path)}")
+        _remove_db_files(path)
+
+
+def gc_board_generations(board: str, grace_seconds: float = GENERATION_GRACE_SECONDS) -> int:
+    """
+    Delete generations of `board` that were retired more than
+    `grace_seconds` ago. Returns the number removed.
+    """
+    current = current_generation_path(board)
+    now = time.time()
+    removed = 0
+
+    for path in glob.glob(os.path.join(glob.escape(GENERATIONS_DIR), f"{glob.escape(board)}.*.db")):
+        path = os.path.abspath(path)
+        if path == current:
+            continue
+        try:
+            retired_at = os.path.getmtime(path + RETIRED_SUFFIX)
+        except FileNotFoundError:
+            # never published (crash between build and swap)
+            retired_at = os.path.getmtime(path)
+        if now - retired_at < grace_seconds:
+            continue
+
+        _remove_db_files(path)
+        removed += 1
+
+    if removed:
+        print(f"🗑 Removed {removed} old '{board}' DB generation(s)")
+    return removed
+
+
+# ---------------------------------------------------
+#  Single-flight build coordination
+# ---------------------------------------------------
+#
+# One build per board at a time: callers in this process share an
+# in-flight Future, and a flock on locks/<board>.lock serializes builds
+# across uvicorn workers.
+
+LOCK_DIR = os.path.join(CACHE_DIR, "locks")
+
+_inflight: dict[str, tuple[str, Future]] = {}
+_inflight_lock = threading.Lock()
+
+_build_stats = {
+    "builds_started": 0,
+    "builds_failed": 0,
+    "build_seconds_total": 0.0,
+    "coalesced_requests": 0,
+    "coalesced_wait_seconds_total": 0.0,
+    "coalesced_wait_seconds_max": 0.0,
+    "lock_acquisitions": 0,
+    "lock_wait_seconds_total": 0.0,
+    "lock_wait_seconds_max": 0.0,
+    "refreshes_started": 0,
+    "refreshes_failed": 0,
+    "delta_syncs_started": 0,
+    "delta_syncs_failed": 0,
+}
+_stats_lock = threading.Lock()
+
+
+def _record_stat(name: str, seconds: float | None = None, max_name: str | None = None):
+    with _stats_lock:
+        if seconds is None:
+            _build_stats[name] += 1
+            return
+        _build_stats[name] += seconds
+        if max_name:
+            _build_stats[max_name] = max(_build_stats[max_name], seconds)
+
+
+def get_build_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_build_stats)
+    with _inflight_lock:
+        stats["inflight"] = {board: cap for board, (cap, _) in _inflight.items()}
+    return stats
+
+
+@contextmanager
+def board_build_lock(board: str):
+    """
+    Cross-process exclusive lock for building `board`.
+    """
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    with open(os.path.join(LOCK_DIR, f"{board}.lock"), "a+") as lock_file:
+        started = time.perf_counter()
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        waited = time.perf_counter() - started
+        _record_stat("lock_acquisitions")
+        _record_stat("lock_wait_seconds_total", waited, "lock_wait_seconds_max")
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# Current phase of the board's build, in a sidecar next to its lock so
+# job status can be read from any worker:
+#   locks/<board>.phase.json   {"phase", "since", "pid"}
+
+BUILD_PHASES = ("download", "sync", "validate", "optimize", "publish")
+
+
+def _build_phase_path(board: str) -> str:
+    return os.path.join(LOCK_DIR, f"{board}.phase.json")
+
+
+def pid_alive(pid: int) -> bool:
     try:
-        tables = get_tables(db_path)
-        return {
-            "problems",
-            "problem_holds",
-            "holds",
-        }.issubset(tables)
-    except Exception:
+        os.kill(pid, 0)
+    except ProcessLookupError:
         return False
+    except PermissionError:
+        pass
+    return True
 
-def download_from_supabase(board: str, local_path: str) -> bool:
+
+def _set_build_phase(board: str, phase: str | None):
+    path = _build_phase_path(board)
     try:
-        bucket = supabase.storage.from_(BUCKET_NAME)
-        data = bucket.download(f"{board}.db")
+        if phase is None:
+            os.remove(path)
+            return
+        os.makedirs(LOCK_DIR, exist_ok=True)
+        tmp_path = unique_tmp_path(path)
+        with open(tmp_path, "w") as f:
+            json.dump({"phase": phase, "since": time.time(), "pid": os.getpid()}, f)
+        os.replace(tmp_path, path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"⚠️ Could not record build phase for '{board}': {e}")
 
-        if isinstance(data, bytes):
-            with open(local_path, "wb") as f:
-                f.write(data)
-            return True
 
-        if hasattr(data, "data") and data.data:
-            with open(local_path, "wb") as f:
-                f.write(data.data)
-            return True
+def get_build_phase(board: str) -> dict | None:
+    """
+    {"phase", "since", "pid"} of the build running for `board` in any
+    worker, or None.
+    """
+    try:
+        with open(_build_phase_path(board)) as f:
+            phase = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return phase if pid_alive(phase.get("pid", 0)) else None
 
-    except Exception as e:
-        print(f"⚠️ Supabase download failed: {e}")
 
-    return False
+# ---------------------------------------------------
+#  Freshness (stale-while-revalidate)
+# ---------------------------------------------------
+#
+# A generation older than the board's TTL (settings.board_db_ttl_for) is
+# still served, but triggers one background rebuild. Failed refreshes
+# back off for REFRESH_RETRY_SECONDS before the next attempt.
 
+REFRESH_RETRY_SECONDS = 5 * 60
 
-def upload_to_supabase(board: str, local_path: str):
+_refresh_not_before: dict[str, float] = {}
+_refresh_lock = threading.Lock()
+
+
+def generation_built_at(db_path: str) -> float | None:
+    """
+    When the generation's data was fetched from Aurora: "built_at" in its
+    manifest (carried over from the artifact for downloads). The file's
+    mtime is only a fallback for DBs built before it was recorded, since
+    the post-build stages rewrite the file.
+    """
+    manifest = get_db_manifest(db_path)
+    if manifest is None:
+        return None
+    return manifest.get("built_at") or manifest["key"]["mtime_ns"] / 1e9
+
+
+def needs_optimize(db_path: str) -> bool:
+    """
+    True for DBs whose manifest has no "optimized" summary from the
+    current OPTIMIZE_VERSION (built before it, or by an older one).
+    """
+    manifest = get_db_manifest(db_path)
+    if manifest is None or manifest.get("error"):
+        return False
+    return (manifest.get("optimized") or {}).get("version", 0) < OPTIMIZE_VERSION
+
+
+def is_generation_stale(board: str, db_path: str) -> bool:
+    ttl = settings.board_db_ttl_for(board)
+    if ttl <= 0:
+        return False
+    built_at = generation_built_at(db_path)
+    if built_at is None:
+        return False
+    return time.time() - built_at > ttl
+
+
+def schedule_board_refresh(
+    board: str,
+    *,
+    require: str = "catalog",
+    username: str | None = None,
+    password: str | None = None,
+    reprocess: bool = False,
+) -> bool:
+    """
+    Start a background rebuild of `board` unless one is already running
+    or backing off. Returns True if a refresh was started. reprocess=True
+    re-runs only the post-build stages on a copy of the current DB (no
+    Aurora fetch, so no credentials needed).
+    """
+    if not reprocess and board in AUTH_REQUIRED_BOARDS and (not username or not password):
+        return False
+
+    now = time.time()
+    with _refresh_lock:
+        if _refresh_not_before.get(board, 0) > now:
+            return False
+        _refresh_not_before[board] = now + REFRESH_RETRY_SECONDS
+    with _inflight_lock:
+        if board in _inflight:
+            return False
+
+    threading.Thread(
+        target=_refresh_board_db,
+        args=(board, require, username, password, reprocess),
+        name=f"board-db-refresh-{board}",
+        daemon=True,
+    ).start()
+    return True
+
+
+def _refresh_board_db(
+    board: str,
+    require: str,
+    username: str | None,
+    password: str | None,
+    reprocess: bool = False,
+):
+    if reprocess:
+        print(f"🧰 Reprocessing '{board}' DB (predates optimize v{OPTIMIZE_VERSION}) in the background")
+    else:
+        print(f"🌱 Refreshing stale DB for '{board}' in the background")
+    _record_stat("refreshes_started")
     try:
-        with open(local_path, "rb") as f:
-            supabase.storage.from_(BUCKET_NAME).upload(
-                f"{board}.db",
-                f,
-                upsert=True,
-                content_type="application/octet-stream",
-            )
-        print(f"☁️ Uploaded '{board}.db' to Supabase cache")
+        _single_flight_build(
+            board,
+            require=require,
+            capability=resolve_capability(require),
+            username=username,
+            password=password,
+            refresh=True,
+            reprocess=reprocess,
+        )
+        with _refresh_lock:
+            _refresh_not_before.pop(board, None)
     except Exception as e:
-        print(f"⚠️ Supabase upload failed: {e}")
+        _record_stat("refreshes_failed")
+        print(f"⚠️ Background refresh failed for '{board}': {e}")
 
 
 # ---------------------------------------------------
@@ -170,18 +890,24 @@ def build_or_download_board_db(
     username: str | None = None,
     password: str | None = None,
     # require: str = "logbook",  # "images" | "logbook" | "public"
-    require: str = "catalog"  # layouts | catalog | geometry | logbook
+    require: str = "catalog",  # layouts | catalog | geometry | logbook
+    sync_mode: str | None = None,  # delta | full (default: settings.board_db_sync_mode)
 ) -> str:
     """
-    Returns path to a DB that satisfies required capability.
+    Returns path to a DB generation that satisfies required capability.
 
     require:
       - "images"   → image/layout tables
       - "logbook"  → climbs + layouts (default)
+
+    Concurrent callers for the same board share a single build. A stale
+    DB is still returned while a background refresh replaces it; only a
+    missing (or incapable) DB blocks the caller. Raises ValueError for an
+    invalid board name.
     """
+    check_board_name(board)
 
     os.makedirs(CACHE_DIR, exist_ok=True)
-    local_path = os.path.join(CACHE_DIR, f"{board}.db")
     # user_dir = os.path.join(CACHE_DIR, "users", user_id)
     # os.makedirs(user_dir, exist_ok=True)
 
@@ -199,44 +925,312 @@ def build_or_download_board_db(
 
 # OR upload user DBs to object storage (S3) on shutdown/startup
 
+    # ---------------------------------------------------
+    # 1️⃣ Local cache (fast path, no locks)
+    # ---------------------------------------------------
+    current = get_ready_board_db(board, require=require, username=username, password=password)
+    if current:
+        print(f"✅ Using local {require}-capable DB for '{board}'")
+        return current
+
+    # ---------------------------------------------------
+    # 2️⃣ Missing (or lacks capability) → wait on a shared build
+    # ---------------------------------------------------
+    return _single_flight_build(
+        board,
+        require=require,
+        capability=resolve_capability(require),
+        username=username,
+        password=password,
+        sync_mode=sync_mode,
+    )
+
+
+def get_ready_board_db(
+    board: str,
+    *,
+    require: str = "catalog",
+    username: str | None = None,
+    password: str | None = None,
+) -> str | None:
+    """
+    Non-blocking: the current generation if it satisfies `require`,
+    else None. A stale generation is returned and refreshed in the
+    background.
+    """
+    check_board_name(board)
+    current = current_generation_path(board)
+    if not current or not has_capability(current, resolve_capability(require)):
+        return None
+
+    if needs_optimize(current):
+        schedule_board_refresh(board, require=require, reprocess=True)
+    elif is_generation_stale(board, current):
+        schedule_board_refresh(board, require=require, username=username, password=password)
+    return current
+
+
+def resolve_capability(require: str) -> str:
+    # "images" (and anything unknown) falls back to the logbook check
+    return require if require in ("layouts", "catalog", "geometry") else "logbook"
+
+
+def _single_flight_build(
+    board: str,
+    *,
+    require: str,
+    capability: str,
+    username: str | None,
+    password: str | None,
+    refresh: bool = False,
+    sync_mode: str | None = None,
+    reprocess: bool = False,
+) -> str | None:
+    """
+    Run (or join) the board's build. With refresh=True an already
+    in-flight build is left alone and None is returned.
+    """
+    while True:
+        if not refresh:
+            current = current_generation_path(board)
+            if current and has_capability(current, capability):
+                return current
+
+        with _inflight_lock:
+            inflight = _inflight.get(board)
+            if inflight is None:
+                future: Future = Future()
+                _inflight[board] = (capability, future)
+
+        if inflight is not None:
+            if refresh:
+                return None
+            inflight_capability, inflight_future = inflight
+            started = time.perf_counter()
+            try:
+                inflight_future.result()
+            except Exception:
+                # same build we wanted → same failure; otherwise try our own
+                if inflight_capability == capability:
+                    raise
+            finally:
+                _record_stat("coalesced_requests")
+                _record_stat(
+                    "coalesced_wait_seconds_total",
+                    time.perf_counter() - started,
+                    "coalesced_wait_seconds_max",
+                )
+            continue
+
+        try:
+            with board_build_lock(board):
+                try:
+                    path = _build_board_db(
+                        board,
+                        require=require,
+                        capability=capability,
+                        username=username,
+                        password=password,
+                        refresh=refresh,
+                        sync_mode=sync_mode,
+                        reprocess=reprocess,
+                    )
+                finally:
+                    _set_build_phase(board, None)
+            future.set_result(path)
+            return path
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with _inflight_lock:
+                _inflight.pop(board, None)
+
+
+def _build_board_db(
+    board: str,
+    *,
+    require: str,
+    capability: str,
+    username: str | None,
+    password: str | None,
+    refresh: bool = False,
+    sync_mode: str | None = None,
+    reprocess: bool = False,
+) -> str:
+    """
+    Build and publish a new DB generation for `board`.
+    Caller must hold the board's build lock.
+
+    sync_mode:
+      - "delta" → refresh a valid current DB with changed rows only
+                  (needs username/password: Aurora's /sync answers 401
+                  without a session token)
+      - "full"  → always rebuild via `boardlib database`
+
+    reprocess=True: the current DB predates OPTIMIZE_VERSION; re-run the
+    post-build stages on a copy of it.
+    """
+    sync_mode = sync_mode or settings.board_db_sync_mode
+
     def is_valid(db_path: str) -> bool:
-        # if require == "images":
-        if require == "layouts":
-            return has_image_capability(db_path)
-        if require == "catalog":
-            return has_catalog_capability(db_path)
-        if require == "geometry":
-            return has_geometry_capability(db_path)
-        # if require == "public":
-        #     return has_public_capability(db_path)
-        return has_logbook_capability(db_path)
+        return has_capability(db_path, capability)
 
     # ---------------------------------------------------
-    # 1️⃣ Local cache
+    # 1️⃣ Local cache (another worker may have built it while we waited)
     # ---------------------------------------------------
-    if os.path.exists(local_path):
-        if is_valid(local_path):
+    current = current_generation_path(board)
+    reprocess = reprocess and bool(current) and is_valid(current)
+    if current:
+        if reprocess:
+            if not needs_optimize(current):
+                return current  # already reprocessed by another worker
+        elif is_valid(current) and not (refresh and is_generation_stale(board, current)):
             print(f"✅ Using local {require}-capable DB for '{board}'")
-            return local_path
+            return current
+
+        # keep serving it until the new generation is published
+        if reprocess:
+            print(f"🧰 Local DB for '{board}' predates optimize v{OPTIMIZE_VERSION}, reprocessing a copy")
+        elif is_valid(current):
+            print(f"🌱 Local DB for '{board}' is stale, building new generation")
+        else:
+            print(f"♻️ Local DB missing {require} capability, building new generation")
 
-        print(f"♻️ Local DB missing {require} capability, rebuilding")
-        os.remove(local_path)
+    # the new generation replaces `current` for every caller, so it has to
+    # serve everything `current` could, not just `require`
+    kept_capabilities = db_capabilities(current) if current else set()
+
+    discard_partial_builds(board)
+    gen_path = new_generation_path(board)
+    build_path = gen_path + BUILDING_SUFFIX
 
     # ---------------------------------------------------
-    # 2️⃣ Supabase cache
+    # 2️⃣ Supabase cache (only when there's nothing to delta-sync from)
     # ---------------------------------------------------
-    # print(f"📡 Checking Supabase cache for '{board}.db'")
-    # if download_from_supabase(board, local_path):
-    #     if is_valid(local_path):
-    #         print(f"⬇️ Using Supabase {require}-capable DB for '{board}'")
-    #         return local_path
+    built = False
+    built_at = time.time()
+    if not current and board not in AUTH_REQUIRED_BOARDS:
+        _set_build_phase(board, "download")
+        print(f"📡 Checking Supabase cache for '{board}.db'")
+        artifact = download_from_supabase(board, build_path)
+        if artifact:
+            if is_valid(build_path):
+                print(f"⬇️ Using Supabase {require}-capable DB for '{board}'")
+                built = True
+                # the artifact's data is as old as its build, not this download
+                built_at = artifact.get("built_at") or artifact.get("uploaded_at") or built_at
+            else:
+                print(f"🧨 Supabase DB missing {require} capability, discarding")
+                _remove_db_files(build_path)
 
-    #     print(f"🧨 Supabase DB missing {require} capability, discarding")
-    #     os.remove(local_path)
+    # ---------------------------------------------------
+    # 3️⃣ Reprocess or delta sync a copy of the current generation,
+    #    else full build
+    # ---------------------------------------------------
+    if reprocess:
+        # same data, only the post-build stages (stats, FTS, indexes) change
+        _set_build_phase(board, "sync")
+        shutil.copyfile(current, build_path)
+        built = True
+        built_at = generation_built_at(current) or built_at
+    if not built and sync_mode == "delta" and current and is_valid(current):
+        if not username or not password:
+            print(f"🔑 No Aurora credentials to delta sync '{board}', running a full build")
+        else:
+            _set_build_phase(board, "sync")
+            built = _delta_sync_generation(board, current, build_path, username, password)
+    if not built:
+        _run_boardlib_build(board, build_path, username, password)
+
+    # ---------------------------------------------------
+    # 4️⃣ Validate built DB
+    # ---------------------------------------------------
+    _set_build_phase(board, "validate")
+    if not is_valid(build_path):
+        _record_stat("builds_failed")
+        _remove_db_files(build_path)
+        raise RuntimeError(
+            f"boardlib built DB without required '{require}' capability. "
+            "Authentication likely failed."
+        )
+    lost = sorted(kept_capabilities - db_capabilities(build_path))
+    if lost:
+        _record_stat("builds_failed")
+        _remove_db_files(build_path)
+        raise RuntimeError(
+            f"New '{board}' DB lacks capabilities the current generation has: {lost}"
+        )
+
+    print(f"🎉 Successfully built {require}-capable DB for '{board}'")
+
+    # ---------------------------------------------------
+    # 4️⃣b Catalog change log vs. the generation being replaced
+    # ---------------------------------------------------
+    _set_build_phase(board, "optimize")
+    try:
+        catalog_changes = record_catalog_changes(build_path, current)
+    except Exception as e:
+        print(f"⚠️ Could not record catalog changes for '{board}': {e}")
+        catalog_changes = {"error": str(e)}
 
     # ---------------------------------------------------
-    # 3️⃣ Build via boardlib
+    # 4️⃣c Stats aggregates (/boards/{board}/stats)
     # ---------------------------------------------------
+    try:
+        stats = build_board_stats(build_path)
+    except Exception as e:
+        print(f"⚠️ Could not build stats aggregates for '{board}': {e}")
+        stats = {"error": str(e)}
+
+    # ---------------------------------------------------
+    # 4️⃣d Indexes + ANALYZE (changes the file → manifest is recomputed)
+    # ---------------------------------------------------
+    optimized = optimize_board_db(build_path)
+    if optimized["query_plan_problems"]:
+        # a hot query lost its index: keep serving the current generation
+        _record_stat("builds_failed")
+        _remove_db_files(build_path)
+        raise RuntimeError(
+            f"Query plan regression in '{board}' build: {optimized['query_plan_problems']}"
+        )
+    update_db_manifest(
+        build_path,
+        built_at=built_at,
+        optimized=optimized,
+        catalog_changes=catalog_changes,
+        stats=stats,
+    )
+
+    # ---------------------------------------------------
+    # 5️⃣ Swap in the new generation
+    # ---------------------------------------------------
+    _set_build_phase(board, "publish")
+    _rename_db(build_path, gen_path)
+    publish_generation(board, gen_path)
+    gc_board_generations(board)
+
+    # ---------------------------------------------------
+    # 6️⃣ Cache to Supabase
+    # ---------------------------------------------------
+    # Disable Supabase caching for authenticated DBs. Only cache: public, catalog, geometry
+    if board not in AUTH_REQUIRED_BOARDS:
+        threading.Thread(
+            target=upload_to_supabase,
+            args=(board, gen_path),
+            name=f"board-db-upload-{board}",
+            daemon=True,
+        ).start()
+
+    return gen_path
+
+
+def _run_boardlib_build(board: str, build_path: str, username: str | None, password: str | None):
+    """
+    Full build: `boardlib database` downloads the app's DB into
+    `build_path`, then it is synced in-process with the account's cached
+    Aurora session (the CLI would log in again on every build).
+    """
     if board in AUTH_REQUIRED_BOARDS and (not username or not password):
         raise RuntimeError(
             f"Board '{board}' requires username/password for full DB"
@@ -249,44 +1243,78 @@ def build_or_download_board_db(
         "boardlib",
         "database",
         board,
-        local_path,
+        build_path,
     ]
 
-    if username:
-        cmd.append(f"--username={username}")
-
-    stdin_input = f"{password}\n" if password else None
-
+    _set_build_phase(board, "download")
     print("🛠 Running boardlib:")
     print(" ", " ".join(cmd))
 
+    _record_stat("builds_started")
+    started = time.perf_counter()
     result = subprocess.run(
         cmd,
-        input=stdin_input,
         capture_output=True,
         text=True,
     )
 
     if result.returncode != 0:
+        _record_stat("build_seconds_total", time.perf_counter() - started)
+        _record_stat("builds_failed")
+        _remove_db_files(build_path)
         print("❌ boardlib stdout:\n", result.stdout)
         print("❌ boardlib stderr:\n", result.stderr)
         raise RuntimeError("boardlib database build failed")
 
-    # ---------------------------------------------------
-    # 4️⃣ Validate built DB
-    # ---------------------------------------------------
-    if not is_valid(local_path):
-        raise RuntimeError(
-            f"boardlib built DB without required '{require}' capability. "
-            "Authentication likely failed."
-        )
+    if username and password:
+        _set_build_phase(board, "sync")
+        try:
+            row_counts = call_with_aurora_session(
+                board,
+                username,
+                password,
+                lambda session: delta_sync_board_db(board, build_path, token=session["token"]),
+            )
+        except Exception as e:
+            _record_stat("build_seconds_total", time.perf_counter() - started)
+            _record_stat("builds_failed")
+            _remove_db_files(build_path)
+            print(f"❌ Aurora sync failed for '{board}': {e}")
+            raise RuntimeError("boardlib database build failed") from e
+        print(f"📥 Synced '{board}' download: {row_counts or 'no changes'}")
 
-    print(f"🎉 Successfully built {require}-capable DB for '{board}'")
+    _record_stat("build_seconds_total", time.perf_counter() - started)
 
-    # ---------------------------------------------------
-    # 5️⃣ Cache to Supabase
-    # ---------------------------------------------------
-    upload_to_supabase(board, local_path) 
-    # Disable Supabase caching for authenticated DBs. Only cache: public, catalog, geometry
 
-    return local_path
+def _delta_sync_generation(
+    board: str,
+    current: str,
+    build_path: str,
+    username: str,
+    password: str,
+) -> bool:
+    """
+    Copy `current` to `build_path` and apply only rows changed since its
+    shared_syncs watermarks. Returns False (nothing left behind) if the
+    delta sync fails, so the caller can fall back to a full build.
+    """
+    print(f"🔄 Delta syncing '{board}' from {os.path.basename(current)}")
+    _record_stat("delta_syncs_started")
+    started = time.perf_counter()
+    try:
+        shutil.copyfile(current, build_path)
+        row_counts = call_with_aurora_session(
+            board,
+            username,
+            password,
+            lambda session: delta_sync_board_db(board, build_path, token=session["token"]),
+        )
+    except Exception as e:
+        _record_stat("delta_syncs_failed")
+        _remove_db_files(build_path)
+        print(f"⚠️ Delta sync failed for '{board}', falling back to full build: {e}")
+        return False
+
+    _record_stat("build_seconds_total", time.perf_counter() - started)
+    print(f"📥 Delta sync applied for '{board}': {row_counts or 'no changes'}")
+    return True
@@ -0,0 +1,102 @@
+import os
+import gzip
+import time
+from typing import Callable, Iterator
+
+try:
+    import zstandard
+except ImportError:  # optional: only gzip variants are produced without it
+    zstandard = None
+
+from services.board_artifacts import file_sha256
+from services.build_sqlite import CACHE_DIR
+from services.content_artifacts import get_content_artifact
+
+# ---------------------------------------------------
+#  Serialized catalog cache
+# ---------------------------------------------------
+#
+# The full /sync-public-data document only changes with the board DB, so
+# it is serialized once per DB content hash and kept on disk next to its
+# compressed variants:
+#
+#   catalog/<board>.<db sha256[:16]>.json(.gz|.zst)
+#   catalog/<board>.<db sha256[:16]>.info.json   {"sha256", "variants"}
+#
+# Each variant's sha256 is its strong ETag.
+
+CATALOG_DIR = os.path.join(CACHE_DIR, "catalog")
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+
+
+
+def _write_variants(tmp: str, chunks: Iterator[bytes]):
+    """
+    Stream the document into the identity, gzip and (if available) zstd
+    files in one pass.
+    """
+    with open(f"{tmp}.json", "wb") as raw, \
+            gzip.GzipFile(f"{tmp}.json.gz", "wb", compresslevel=GZIP_LEVEL, mtime=0) as gz:
+        zst_file = open(f"{tmp}.json.zst", "wb") if zstandard else None
+        zst = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(zst_file) if zst_file else None
+        try:
+            for chunk in chunks:
+                raw.write(chunk)
+                gz.write(chunk)
+                if zst:
+                    zst.write(chunk)
+        finally:
+            if zst:
+                zst.close()  # also closes zst_file
+
+
+def get_catalog_cache(board: str, db_path: str, render: Callable[[], Iterator[bytes]]) -> dict:
+    """
+    Returns {"sha256", "path", "variants": {"gzip"|"zstd": {"path", "sha256"}}}
+    for the catalog of `db_path`, calling `render()` (an iterator of
+    JSON bytes) only the first time for this DB content.
+    """
+    def build(tmp: str, base: str) -> tuple[dict, list[str]]:
+        started = time.perf_counter()
+        _write_variants(tmp, render())
+
+        print(
+            f"📦 Cached catalog for '{board}' "
+            f"({os.path.getsize(f'{tmp}.json') // 1024} KiB, "
+            f"{os.path.getsize(f'{tmp}.json.gz') // 1024} KiB gz) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        info = {
+            "path": f"{base}.json",
+            "sha256": file_sha256(f"{tmp}.json"),
+            "variants": {
+                "gzip": {"path": f"{base}.json.gz", "sha256": file_sha256(f"{tmp}.json.gz")},
+            },
+        }
+        suffixes = [".json", ".json.gz"]
+        if zstandard:
+            info["variants"]["zstd"] = {
+                "path": f"{base}.json.zst",
+                "sha256": file_sha256(f"{tmp}.json.zst"),
+            }
+            suffixes.append(".json.zst")
+        return info, suffixes
+
+    return get_content_artifact(CATALOG_DIR, board, db_path, "catalog", build, info_suffix=".info.json")
+
+
+def negotiate_encoding(accept_encoding: str, available: dict) -> str | None:
+    """
+    Pick zstd, then gzip, from what the client accepts and we have;
+    None → identity.
+    """
+    accepted = {
+        part.split(";")[0].strip().lower()
+        for part in accept_encoding.split(",")
+        if not part.strip().endswith(";q=0")
+    }
+    for encoding in ("zstd", "gzip"):
+        if encoding in accepted and encoding in available:
+            return encoding
+    return None
@@ -0,0 +1,133 @@
+import time
+import sqlite3
+from datetime import datetime, timezone
+
+# ---------------------------------------------------
+#  Climb catalog change log
+# ---------------------------------------------------
+#
+# Aurora rows carry no updated_at, so each new generation is diffed
+# against the one it replaces and the result is kept inside the board DB:
+#
+#   svc_climb_changes(climb_pk, changed_at, deleted)   latest change per climb
+#   svc_catalog_meta(key, value)                       tracked_since, watermark
+#
+# The log travels with the DB (delta-synced copies, artifacts), and is
+# carried over from the previous generation after a full rebuild.
+# Watermarks are UTC "YYYY-mm-ddTHH:MM:SS.ffffffZ" strings, so they
+# compare correctly as text.
+
+CHANGES_TABLE = "svc_climb_changes"
+META_TABLE = "svc_catalog_meta"
+
+
+def format_watermark(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def parse_watermark(value: str | int | float) -> str:
+    """
+    Normalize a client `since` (ISO timestamp, climbs.created_at style
+    "YYYY-mm-dd HH:MM:SS", or unix seconds). Raises ValueError.
+    """
+    if isinstance(value, (int, float)) or str(value).replace(".", "", 1).isdigit():
+        return format_watermark(datetime.fromtimestamp(float(value), timezone.utc))
+    dt = datetime.fromisoformat(str(value).strip())
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return format_watermark(dt)
+
+
+def _tables(conn, schema: str) -> set[str]:
+    return {
+        r[0] for r in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type='table'")
+    }
+
+
+def _columns(conn, schema: str, table: str) -> list[str]:
+    return [r[1] for r in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def _ensure_tables(conn, pk: str, now: str, prev_tables: set[str]):
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {CHANGES_TABLE} ("
+        "climb_pk PRIMARY KEY, changed_at TEXT NOT NULL, deleted INTEGER NOT NULL DEFAULT 0)"
+    )
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_{CHANGES_TABLE}_changed_at ON {CHANGES_TABLE}(changed_at)"
+    )
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {META_TABLE} (key TEXT PRIMARY KEY, value TEXT)")
+
+    # full rebuild from boardlib → bring the history over from the previous generation
+    if CHANGES_TABLE in prev_tables:
+        conn.execute(
+            f"INSERT OR IGNORE INTO main.{CHANGES_TABLE} "
+            f"SELECT climb_pk, changed_at, deleted FROM prev.{CHANGES_TABLE}"
+        )
+    if META_TABLE in prev_tables:
+        conn.execute(f"INSERT OR IGNORE INTO main.{META_TABLE} SELECT key, value FROM prev.{META_TABLE}")
+    conn.execute(f"INSERT OR IGNORE INTO {META_TABLE} VALUES ('tracked_since', ?)", (now,))
+    conn.execute(f"INSERT OR IGNORE INTO {META_TABLE} VALUES ('pk', ?)", (pk,))
+
+
+def record_catalog_changes(db_path: str, previous: str | None) -> dict:
+    """
+    Diff climbs in `db_path` (a generation being built) against
+    `previous` and append to its change log. Returns a summary for the
+    manifest.
+    """
+    started = time.perf_counter()
+    now = format_watermark(datetime.now(timezone.utc))
+    summary = {"watermark": now, "changed": 0, "deleted": 0, "baseline": previous is None}
+
+    conn = sqlite3.connect(db_path, isolation_level=None, uri=True)
+    try:
+        cols = _columns(conn, "main", "climbs")
+        pk = "id" if "id" in cols else "uuid" if "uuid" in cols else None
+        if not pk:
+            return {**summary, "error": "no climbs primary key"}
+
+        prev_tables: set[str] = set()
+        if previous:
+            conn.execute("ATTACH DATABASE ? AS prev", (f"file:{previous}?mode=ro&immutable=1",))
+            prev_tables = _tables(conn, "prev")
+
+        conn.execute("BEGIN IMMEDIATE")
+        _ensure_tables(conn, pk, now, prev_tables)
+
+        if "climbs" in prev_tables:
+            prev_cols = set(_columns(conn, "prev", "climbs"))
+            differs = " OR ".join(
+                f"o.{c} IS NOT n.{c}" for c in cols if c in prev_cols and c != pk
+            ) or "0"
+            summary["changed"] = conn.execute(
+                f"INSERT INTO {CHANGES_TABLE} (climb_pk, changed_at, deleted) "
+                f"SELECT n.{pk}, ?, 0 FROM main.climbs n "
+                f"LEFT JOIN prev.climbs o ON o.{pk} = n.{pk} "
+                f"WHERE o.{pk} IS NULL OR {differs} "
+                "ON CONFLICT(climb_pk) DO UPDATE SET changed_at = excluded.changed_at, deleted = 0",
+                (now,),
+            ).rowcount
+            summary["deleted"] = conn.execute(
+                f"INSERT INTO {CHANGES_TABLE} (climb_pk, changed_at, deleted) "
+                f"SELECT o.{pk}, ?, 1 FROM prev.climbs o "
+                f"WHERE NOT EXISTS (SELECT 1 FROM main.climbs n WHERE n.{pk} = o.{pk}) "
+                "ON CONFLICT(climb_pk) DO UPDATE SET changed_at = excluded.changed_at, deleted = 1",
+                (now,),
+            ).rowcount
+
+        conn.execute(f"INSERT OR REPLACE INTO {META_TABLE} VALUES ('watermark', ?)", (now,))
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    print(
+        f"📝 Catalog changes for {db_path.rsplit('/', 1)[-1]}: "
+        f"{summary['changed']} changed, {summary['deleted']} deleted"
+    )
+    return summary
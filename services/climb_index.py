@@ -0,0 +1,193 @@
+import os
+import sys
+import time
+import sqlite3
+import threading
+
+from config import get_settings
+from services.db_pool import pooled_connection
+
+settings = get_settings()
+
+# ---------------------------------------------------
+#  In-memory climb index
+# ---------------------------------------------------
+#
+# One index per DB generation file, built on first use with a single scan
+# of climbs ⋈ product_sizes_layouts_sets. Each climb is kept whole (every
+# climbs column + base_image_filename, the same row the SQL path returns)
+# as a plain tuple keyed by uuid, against one shared column tuple (no
+# per-row dict); repeated strings such as the base image filename are
+# interned. Generations are immutable, so an index only goes
+# away when its generation is retired or removed; each worker checks that
+# itself (the file's inode on every lookup, retired generations every
+# SWEEP_INTERVAL_SECONDS). A DB that can't be indexed is remembered, so
+# it isn't rescanned on every request.
+
+# same columns as climb_loader.CLIMB_BY_UUID_SQL
+INDEX_SQL = """
+    SELECT
+        c.*,
+        p.image_filename AS base_image_filename
+    FROM climbs c
+    LEFT JOIN product_sizes_layouts_sets p
+        ON p.id = c.product_sizes_layouts_set_id
+"""
+
+INTERNED_COLUMNS = {"base_image_filename", "setter_username"}
+SWEEP_INTERVAL_SECONDS = 5.0
+
+
+class ClimbIndex:
+    __slots__ = ("db_path", "inode", "columns", "records", "approx_bytes", "build_seconds", "built_at")
+
+    def __init__(self, db_path: str, inode: int):
+        self.db_path = db_path
+        self.inode = inode
+        self.columns: tuple[str, ...] = ()
+        self.records: dict[str, tuple] = {}
+        self.approx_bytes = 0
+        self.build_seconds = 0.0
+        self.built_at = None
+
+    def get(self, climb_uuid: str) -> dict | None:
+        record = self.records.get(climb_uuid)
+        return dict(zip(self.columns, record)) if record else None
+
+    def build(self):
+        started = time.perf_counter()
+        with pooled_connection(self.db_path) as conn:
+            rows = conn.execute(INDEX_SQL)
+            self.columns = tuple(c[0] for c in rows.description)
+            uuid_at = self.columns.index("uuid")
+            interned = [i for i, c in enumerate(self.columns) if c in INTERNED_COLUMNS]
+
+            seen: set[int] = set()
+            size = 0
+            for row in rows:
+                if interned:
+                    row = list(row)
+                    for i in interned:
+                        if isinstance(row[i], str):
+                            row[i] = sys.intern(row[i])
+                    row = tuple(row)
+                for value in row:
+                    if id(value) not in seen:
+                        seen.add(id(value))
+                        size += sys.getsizeof(value)
+                self.records[row[uuid_at]] = row
+                size += sys.getsizeof(row)
+
+        self.approx_bytes = size + sys.getsizeof(self.records)
+        self.build_seconds = round(time.perf_counter() - started, 3)
+        self.built_at = time.time()
+
+
+_indexes: dict[str, ClimbIndex] = {}
+_indexes_lock = threading.Lock()
+_build_locks: dict[str, threading.Lock] = {}
+# db_path → inode of a file that failed to index
+_failed: dict[str, int] = {}
+_next_sweep = 0.0
+
+
+def _build_lock(db_path: str) -> threading.Lock:
+    with _indexes_lock:
+        return _build_locks.setdefault(db_path, threading.Lock())
+
+
+def _sweep_indexes(keep: str):
+    """
+    Drop indexes (and remembered failures) for deleted, replaced or
+    retired generation files.
+    """
+    from services.build_sqlite import is_retired_generation  # avoid import cycle
+
+    with _indexes_lock:
+        entries = [(path, i.inode) for path, i in _indexes.items() if path != keep]
+        entries += [(path, inode) for path, inode in _failed.items() if path != keep]
+    for path, inode in entries:
+        try:
+            gone = os.stat(path).st_ino != inode or is_retired_generation(path)
+        except OSError:
+            gone = True
+        if gone:
+            drop_climb_index(path)
+
+
+def get_climb_index(db_path: str) -> ClimbIndex | None:
+    """
+    Returns the index for a published generation, building it on first
+    use. None when disabled or the DB can't be indexed (callers fall back
+    to SQL).
+    """
+    global _next_sweep
+    if not settings.climb_index_enabled:
+        return None
+
+    now = time.monotonic()
+    if now >= _next_sweep:
+        _next_sweep = now + SWEEP_INTERVAL_SECONDS
+        _sweep_indexes(keep=db_path)
+
+    try:
+        inode = os.stat(db_path).st_ino
+    except OSError:
+        drop_climb_index(db_path)
+        return None
+
+    index = _indexes.get(db_path)
+    if index is not None and index.inode == inode:
+        return index
+    if _failed.get(db_path) == inode:
+        return None
+
+    with _build_lock(db_path):
+        index = _indexes.get(db_path)
+        if index is not None and index.inode == inode:
+            return index
+        if _failed.get(db_path) == inode:
+            return None
+        index = ClimbIndex(db_path, inode)
+        try:
+            index.build()
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not index climbs in {os.path.basename(db_path)}: {e}")
+            with _indexes_lock:
+                _failed[db_path] = inode
+            return None
+        with _indexes_lock:
+            _indexes[db_path] = index
+            _failed.pop(db_path, None)
+
+    print(
+        f"🗂️ Indexed {len(index.records)} climbs from {os.path.basename(db_path)} "
+        f"(~{index.approx_bytes // (1024 * 1024)} MiB) in {index.build_seconds}s"
+    )
+    return index
+
+
+def drop_climb_index(db_path: str):
+    with _indexes_lock:
+        _indexes.pop(db_path, None)
+        _failed.pop(db_path, None)
+        _build_locks.pop(db_path, None)
+
+
+def get_climb_index_stats() -> dict:
+    """
+    Per-board footprint of the loaded indexes (generation files are named
+    <board>.<generation>.db).
+    """
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    return {
+        os.path.basename(index.db_path).split(".", 1)[0]: {
+            "generation": os.path.basename(index.db_path),
+            "climbs": len(index.records),
+            "approx_bytes": index.approx_bytes,
+            "build_seconds": index.build_seconds,
+            "built_at": index.built_at,
+        }
+        for index in indexes
+    }
@@ -1,27 +1,68 @@
 import sqlite3
+from typing import Iterable, Iterator
+
+from services.climb_index import get_climb_index
+from services.db_pool import pooled_connection
+
+CLIMB_BY_UUID_SQL = """
+    SELECT
+        c.*,
+        p.image_filename AS base_image_filename
+    FROM climbs c
+    LEFT JOIN product_sizes_layouts_sets p
+        ON p.id = c.product_sizes_layouts_set_id
+    WHERE c.uuid = ?
+    LIMIT 1
+"""
+
+CLIMBS_BY_UUIDS_SQL = """
+    SELECT
+        c.*,
+        p.image_filename AS base_image_filename
+    FROM climbs c
+    LEFT JOIN product_sizes_layouts_sets p
+        ON p.id = c.product_sizes_layouts_set_id
+    WHERE c.uuid IN ({placeholders})
+"""
+
+# stay well under SQLite's bound-parameter limit
+IN_CHUNK_SIZE = 500
 
 def load_climb_from_db(db_path: str, climb_uuid: str) -> dict | None:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT
-            c.*,
-            p.image_filename AS base_image_filename
-        FROM climbs c
-        LEFT JOIN product_sizes_layouts_sets p
-            ON p.id = c.product_sizes_layouts_set_id
-        WHERE c.uuid = ?
-        LIMIT 1
-        """,
-        (climb_uuid,)
-    )
-
-    row = cur.fetchone()
-    conn.close()
+    """
+    Every climbs column plus base_image_filename, from the in-memory
+    index when available (same row either way), else None.
+    """
+    index = get_climb_index(db_path)
+    if index is not None:
+        return index.get(climb_uuid)
+
+    with pooled_connection(db_path, row_factory=sqlite3.Row) as conn:
+        row = conn.execute(CLIMB_BY_UUID_SQL, (climb_uuid,)).fetchone()
+
     if not row:
         return None
 
     return {k: row[k] for k in row.keys()}
+
+
+def iter_climbs_from_db(db_path: str, climb_uuids: Iterable[str]) -> Iterator[dict]:
+    """
+    Yield climb records for `climb_uuids` (those that exist), from the
+    in-memory index when available, else in chunked IN (...) queries.
+    """
+    index = get_climb_index(db_path)
+    if index is not None:
+        for climb_uuid in climb_uuids:
+            climb = index.get(climb_uuid)
+            if climb:
+                yield climb
+        return
+
+    climb_uuids = list(climb_uuids)
+    with pooled_connection(db_path, row_factory=sqlite3.Row) as conn:
+        for i in range(0, len(climb_uuids), IN_CHUNK_SIZE):
+            chunk = climb_uuids[i:i + IN_CHUNK_SIZE]
+            sql = CLIMBS_BY_UUIDS_SQL.format(placeholders=", ".join("?" * len(chunk)))
+            for row in conn.execute(sql, chunk):
+                yield {k: row[k] for k in row.keys()}
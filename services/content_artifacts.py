@@ -0,0 +1,87 @@
+import os
+import glob
+import json
+import time
+import threading
+from typing import Callable
+
+from services.board_artifacts import unique_tmp_path
+from services.build_sqlite import GENERATION_GRACE_SECONDS, get_db_content_hash
+
+# ---------------------------------------------------
+#  Content-addressed files derived from a board DB
+# ---------------------------------------------------
+#
+# Exports and the serialized catalog are built once per DB content hash
+# and kept on disk:
+#
+#   <dir>/<board>.<db sha256[:16]>.<name><suffix>     the files
+#   <dir>/<board>.<db sha256[:16]>.<name><info>       their info (written last)
+#
+# A present info file means every file it describes is in place. Files of
+# older DB contents are removed once they are past the generation grace
+# period.
+
+_locks: dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock(key: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def _gc(artifact_dir: str, board: str, keep_prefix: str):
+    now = time.time()
+    for path in glob.glob(os.path.join(glob.escape(artifact_dir), f"{glob.escape(board)}.*")):
+        if os.path.basename(path).startswith(keep_prefix):
+            continue
+        try:
+            if now - os.path.getmtime(path) > GENERATION_GRACE_SECONDS:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def get_content_artifact(
+    artifact_dir: str,
+    board: str,
+    db_path: str,
+    name: str,
+    build: Callable[[str, str], tuple[dict, list[str]]],
+    *,
+    info_suffix: str = ".json",
+) -> dict:
+    """
+    The info dict for `name` derived from `db_path`. On first use for
+    this DB content, `build(tmp, base)` writes its files as
+    f"{tmp}{suffix}" and returns (info, suffixes); they are then moved to
+    f"{base}{suffix}" and the info saved. One build per file at a time in
+    this process; across workers the last complete build wins.
+    """
+    prefix = f"{board}.{get_db_content_hash(db_path)[:16]}."
+    base = os.path.join(artifact_dir, f"{prefix}{name}")
+    info_path = f"{base}{info_suffix}"
+
+    with _lock(base):
+        try:
+            with open(info_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+
+        os.makedirs(artifact_dir, exist_ok=True)
+        tmp = unique_tmp_path(base)
+        try:
+            info, suffixes = build(tmp, base)
+            for suffix in suffixes:
+                os.replace(f"{tmp}{suffix}", f"{base}{suffix}")
+            with open(f"{tmp}.info", "w") as f:
+                json.dump(info, f)
+            os.replace(f"{tmp}.info", info_path)
+        finally:
+            for leftover in glob.glob(f"{glob.escape(tmp)}*"):
+                os.remove(leftover)
+
+    _gc(artifact_dir, board, prefix)
+    return info
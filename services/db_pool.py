@@ -0,0 +1,153 @@
+import os
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from config import get_settings
+
+settings = get_settings()
+
+# ---------------------------------------------------
+#  Read-only SQLite connection pool
+# ---------------------------------------------------
+#
+# One pool per DB generation file. Generations never change once
+# published, so connections are opened mode=ro&immutable=1 (no locking,
+# no -wal/-shm) and keep their page cache and parsed schema between
+# requests. A connection is only ever used by the thread that checked it
+# out. When a generation is retired (or the path now points at a
+# different inode) its pool is closed; connections still checked out are
+# closed as they come back. Every worker notices that on its own: pools
+# are swept at most every SWEEP_INTERVAL_SECONDS from _get_pool.
+
+MAX_IDLE_PER_DB = 8
+SWEEP_INTERVAL_SECONDS = 5.0
+
+
+class _Pool:
+    def __init__(self, db_path: str, inode: int):
+        self.db_path = db_path
+        self.inode = inode
+        self.idle: list[sqlite3.Connection] = []
+        self.lock = threading.Lock()
+        self.closed = False
+        self.opened = 0
+        self.reused = 0
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro&immutable=1",
+            uri=True,
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA query_only = 1")
+        conn.execute(f"PRAGMA mmap_size = {settings.sqlite_mmap_bytes}")
+        conn.execute(f"PRAGMA cache_size = -{settings.sqlite_cache_kib}")
+        with self.lock:
+            self.opened += 1
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        with self.lock:
+            if self.idle:
+                self.reused += 1
+                return self.idle.pop()
+        return self._open()
+
+    def release(self, conn: sqlite3.Connection):
+        conn.row_factory = None
+        with self.lock:
+            if not self.closed and len(self.idle) < MAX_IDLE_PER_DB:
+                self.idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            conn.close()
+
+
+_pools: dict[str, _Pool] = {}
+_pools_lock = threading.Lock()
+_next_sweep = 0.0
+
+
+def _sweep_pools(keep: str):
+    """
+    Close pools on deleted, replaced or retired generation files.
+    """
+    from services.build_sqlite import is_retired_generation  # avoid import cycle
+
+    with _pools_lock:
+        pools = [p for path, p in _pools.items() if path != keep]
+    for pool in pools:
+        try:
+            gone = os.stat(pool.db_path).st_ino != pool.inode or is_retired_generation(pool.db_path)
+        except OSError:
+            gone = True
+        if gone:
+            with _pools_lock:
+                if _pools.get(pool.db_path) is pool:
+                    del _pools[pool.db_path]
+            pool.close()
+
+
+def _get_pool(db_path: str) -> _Pool:
+    global _next_sweep
+    now = time.monotonic()
+    if now >= _next_sweep:
+        _next_sweep = now + SWEEP_INTERVAL_SECONDS
+        _sweep_pools(keep=db_path)
+
+    inode = os.stat(db_path).st_ino
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is not None and pool.inode == inode:
+            return pool
+        stale = pool
+        pool = _pools[db_path] = _Pool(db_path, inode)
+    if stale is not None:
+        stale.close()
+    return pool
+
+
+@contextmanager
+def pooled_connection(db_path: str, row_factory=None) -> Iterator[sqlite3.Connection]:
+    """
+    Borrow a read-only connection to `db_path` for the duration of the block.
+    """
+    pool = _get_pool(db_path)
+    conn = pool.acquire()
+    conn.row_factory = row_factory
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+def close_db_pool(db_path: str):
+    """
+    Drop the pool for a retired / deleted generation.
+    """
+    with _pools_lock:
+        pool = _pools.pop(db_path, None)
+    if pool is not None:
+        pool.close()
+
+
+def get_pool_stats() -> dict:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {
+        os.path.basename(p.db_path): {
+            "idle": len(p.idle),
+            "opened": p.opened,
+            "reused": p.reused,
+        }
+        for p in pools
+    }
@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+# ---------------------------------------------------
+#  Per-user logbook store
+# ---------------------------------------------------
+#
+# One SQLite file per board + Aurora user:
+#
+#   server/user_logbooks/<board>/<user_id>.db
+#     raw_rows(table_name, uuid, data)          ascents / bids as synced
+#     sync_state(table_name, last_synchronized_at)   Aurora user_syncs watermark
+#     entries(entry_id, data, date, sync_id)   current logbook
+#     removed_entries(entry_id, sync_id)       ids that disappeared
+#     syncs(id, at, fetched_rows, added, updated, removed)
+#
+# sync ids are the client cursor: "everything added or changed after sync
+# N". Each write (one /sync page, one recorded sync) is its own short
+# transaction, so nothing is held open while Aurora is being fetched.
+
+LOGBOOK_DIR = "server/user_logbooks"
+BASE_SYNC_DATE = "1970-01-01 00:00:00.000000"
+USER_TABLES = ("ascents", "bids")
+
+_user_locks: dict[str, threading.Lock] = {}
+_user_locks_guard = threading.Lock()
+
+
+def logbook_store_path(board: str, user_id: int | str) -> str:
+    return os.path.join(LOGBOOK_DIR, board, f"{user_id}.db")
+
+
+def _user_lock(path: str) -> threading.Lock:
+    with _user_locks_guard:
+        return _user_locks.setdefault(path, threading.Lock())
+
+
+class LogbookStore:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def _init_schema(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS raw_rows (
+                table_name TEXT NOT NULL, uuid TEXT NOT NULL, data TEXT NOT NULL,
+                PRIMARY KEY (table_name, uuid)
+            );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                table_name TEXT PRIMARY KEY, last_synchronized_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                entry_id TEXT PRIMARY KEY, data TEXT NOT NULL,
+                date TEXT, sync_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_sync_id ON entries (sync_id);
+            CREATE TABLE IF NOT EXISTS removed_entries (
+                entry_id TEXT PRIMARY KEY, sync_id INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS syncs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, at REAL NOT NULL,
+                fetched_rows INTEGER NOT NULL, added INTEGER NOT NULL,
+                updated INTEGER NOT NULL, removed INTEGER NOT NULL
+            );
+        """)
+
+    # --- raw Aurora rows ---
+
+    def watermarks(self) -> dict[str, str]:
+        synced = dict(self.conn.execute("SELECT table_name, last_synchronized_at FROM sync_state"))
+        return {t: synced.get(t, BASE_SYNC_DATE) for t in USER_TABLES}
+
+    def apply_page(self, page: dict) -> int:
+        """
+        Upsert one /sync page's ascents/bids and advance watermarks, in
+        one transaction. Watermarks never move backwards.
+        """
+        count = 0
+        with self.conn:
+            for table in USER_TABLES:
+                rows = page.get(table) or []
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO raw_rows (table_name, uuid, data) VALUES (?, ?, ?)",
+                    ((table, row["uuid"], json.dumps(row)) for row in rows),
+                )
+                count += len(rows)
+            for sync_row in page.get("user_syncs", []):
+                if sync_row.get("table_name") in USER_TABLES and sync_row.get("last_synchronized_at"):
+                    self.conn.execute(
+                        "INSERT INTO sync_state VALUES (?, ?) ON CONFLICT (table_name) DO UPDATE "
+                        "SET last_synchronized_at = MAX(last_synchronized_at, excluded.last_synchronized_at)",
+                        (sync_row["table_name"], sync_row["last_synchronized_at"]),
+                    )
+        return count
+
+    def raw_rows(self, table: str) -> list[dict]:
+        return [
+            json.loads(data)
+            for (data,) in self.conn.execute("SELECT data FROM raw_rows WHERE table_name = ?", (table,))
+        ]
+
+    # --- entries ---
+
+    def last_sync_id(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM syncs").fetchone()[0]
+
+    def has_entries(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM entries LIMIT 1").fetchone() is not None
+
+    def record_sync(self, fetched_rows: int, entries: list[dict] | None) -> dict:
+        """
+        Start a new sync id. With `entries` (the recomputed logbook, each
+        with a unique entry_id), keep unchanged entries, add new ones,
+        re-stamp changed ones and mark vanished ones removed.
+        """
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO syncs (at, fetched_rows, added, updated, removed) VALUES (?, ?, 0, 0, 0)",
+                (time.time(), fetched_rows),
+            )
+            sync_id = cur.lastrowid
+            if entries is None:
+                return {"sync_id": sync_id, "added": 0, "updated": 0, "removed": 0}
+
+            existing = dict(self.conn.execute("SELECT entry_id, data FROM entries"))
+            current = {e["entry_id"]: json.dumps(e, sort_keys=True) for e in entries}
+            added = current.keys() - existing.keys()
+            updated = {k for k in current.keys() & existing.keys() if current[k] != existing[k]}
+            removed = existing.keys() - current.keys()
+
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO entries (entry_id, data, date, sync_id) VALUES (?, ?, ?, ?)",
+                ((k, current[k], json.loads(current[k]).get("date"), sync_id) for k in added | updated),
+            )
+            self.conn.executemany("DELETE FROM entries WHERE entry_id = ?", ((k,) for k in removed))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO removed_entries VALUES (?, ?)", ((k, sync_id) for k in removed)
+            )
+            # an id can come back (e.g. a deleted ascent restored)
+            self.conn.executemany("DELETE FROM removed_entries WHERE entry_id = ?", ((k,) for k in added))
+            self.conn.execute(
+                "UPDATE syncs SET added = ?, updated = ?, removed = ? WHERE id = ?",
+                (len(added), len(updated), len(removed), sync_id),
+            )
+        return {"sync_id": sync_id, "added": len(added), "updated": len(updated), "removed": len(removed)}
+
+    def entries(self, since_sync: int | None = None) -> list[dict]:
+        sql = "SELECT data FROM entries"
+        params: tuple = ()
+        if since_sync is not None:
+            sql += " WHERE sync_id > ?"
+            params = (since_sync,)
+        return [json.loads(data) for (data,) in self.conn.execute(sql + " ORDER BY date, entry_id", params)]
+
+    def removed_since(self, since_sync: int) -> list[str]:
+        return [
+            r[0] for r in self.conn.execute(
+                "SELECT entry_id FROM removed_entries WHERE sync_id > ? ORDER BY entry_id",
+                (since_sync,),
+            )
+        ]
+
+
+@contextmanager
+def open_logbook_store(board: str, user_id: int | str) -> Iterator[LogbookStore]:
+    """
+    Exclusive access to one user's store within this process. Writes
+    commit per page / per sync; across workers, watermarks only move
+    forward and a sync records whatever logbook it recomputed.
+    """
+    path = logbook_store_path(board, user_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _user_lock(path):
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            store = LogbookStore(conn)
+            with conn:
+                store._init_schema()
+            yield store
+        finally:
+            conn.close()
@@ -0,0 +1,198 @@
+import os
+import time
+import sqlite3
+import threading
+
+from config import get_settings
+
+settings = get_settings()
+
+# ---------------------------------------------------
+#  Rendered image index
+# ---------------------------------------------------
+#
+# Which <board>/<climb_uuid>.png objects already exist in the images
+# bucket, so a cached render is a set lookup instead of a bucket listing:
+#
+#   server/rendered_images.db
+#     rendered(board, name, seen_at)     one row per object
+#     reconciled(board, at, objects)     last full listing per board
+#
+# Uploads are recorded as they happen; every board is reconciled in the
+# background against a paginated listing when first used and then every
+# RENDERED_INDEX_RECONCILE_SECONDS. Until a board's first listing has
+# finished, a miss is double-checked with a single-object exists().
+
+RENDERED_INDEX_PATH = "server/rendered_images.db"
+LIST_PAGE_SIZE = 1000
+
+_index: dict[str, set[str]] = {}
+_reconciled_at: dict[str, float] = {}
+_reconciling: set[str] = set()
+_index_lock = threading.Lock()
+
+_stats = {"hits": 0, "misses": 0, "fallback_checks": 0, "reconciles": 0, "reconcile_failures": 0}
+
+
+def _connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(RENDERED_INDEX_PATH), exist_ok=True)
+    conn = sqlite3.connect(RENDERED_INDEX_PATH, timeout=30)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS rendered (
+            board TEXT NOT NULL, name TEXT NOT NULL, seen_at REAL NOT NULL,
+            PRIMARY KEY (board, name)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS reconciled (
+            board TEXT PRIMARY KEY, at REAL NOT NULL, objects INTEGER NOT NULL
+        );
+    """)
+    return conn
+
+
+def _load_board(board: str) -> set[str]:
+    """
+    The board's in-memory set, read from SQLite on first use. Call with
+    _index_lock held.
+    """
+    names = _index.get(board)
+    if names is None:
+        conn = _connect()
+        try:
+            names = {r[0] for r in conn.execute("SELECT name FROM rendered WHERE board = ?", (board,))}
+            row = conn.execute("SELECT at FROM reconciled WHERE board = ?", (board,)).fetchone()
+        finally:
+            conn.close()
+        _index[board] = names
+        if row:
+            _reconciled_at[board] = row[0]
+    return names
+
+
+def mark_rendered(board: str, climb_uuid: str):
+    name = f"{climb_uuid}.png"
+    with _index_lock:
+        _load_board(board).add(name)
+        conn = _connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO rendered (board, name, seen_at) VALUES (?, ?, ?)",
+                    (board, name, time.time()),
+                )
+        finally:
+            conn.close()
+
+
+def is_rendered(board: str, climb_uuid: str, bucket) -> bool:
+    """
+    Whether <board>/<climb_uuid>.png is already in `bucket` (a storage
+    bucket client), from the local index.
+    """
+    name = f"{climb_uuid}.png"
+    with _index_lock:
+        found = name in _load_board(board)
+        reconciled_at = _reconciled_at.get(board)
+        _stats["hits" if found else "misses"] += 1
+
+    if reconciled_at is None or time.time() - reconciled_at > settings.rendered_index_reconcile_seconds:
+        schedule_rendered_index_reconcile(board, bucket)
+
+    if found or reconciled_at is not None:
+        return found
+
+    # not listed yet: one object lookup rather than trusting an empty index
+    with _index_lock:
+        _stats["fallback_checks"] += 1
+    if bucket.exists(f"{board}/{name}"):
+        mark_rendered(board, climb_uuid)
+        return True
+    return False
+
+
+def _list_board_objects(board: str, bucket) -> set[str]:
+    names: set[str] = set()
+    offset = 0
+    while True:
+        page = bucket.list(board, {
+            "limit": LIST_PAGE_SIZE,
+            "offset": offset,
+            "sortBy": {"column": "name", "order": "asc"},
+        })
+        names.update(obj["name"] for obj in page if obj.get("name", "").endswith(".png"))
+        if len(page) < LIST_PAGE_SIZE:
+            return names
+        offset += LIST_PAGE_SIZE
+
+
+def reconcile_rendered_index(board: str, bucket) -> dict:
+    """
+    Replace the board's index with a full listing of the bucket folder.
+    Objects recorded by uploads after the listing started are kept.
+    """
+    started = time.time()
+    names = _list_board_objects(board, bucket)
+
+    with _index_lock:
+        conn = _connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO rendered (board, name, seen_at) VALUES (?, ?, ?)",
+                    ((board, name, started) for name in names),
+                )
+                # what the listing didn't return, unless an upload recorded it since
+                conn.execute(
+                    "DELETE FROM rendered WHERE board = ? AND seen_at < ?", (board, started)
+                )
+                count = conn.execute(
+                    "SELECT COUNT(*) FROM rendered WHERE board = ?", (board,)
+                ).fetchone()[0]
+                conn.execute(
+                    "INSERT OR REPLACE INTO reconciled (board, at, objects) VALUES (?, ?, ?)",
+                    (board, started, count),
+                )
+            _index[board] = {
+                r[0] for r in conn.execute("SELECT name FROM rendered WHERE board = ?", (board,))
+            }
+        finally:
+            conn.close()
+        _reconciled_at[board] = started
+        _stats["reconciles"] += 1
+
+    seconds = round(time.time() - started, 3)
+    print(f"🖼 Reconciled rendered image index for '{board}': {count} objects in {seconds}s")
+    return {"board": board, "objects": count, "seconds": seconds}
+
+
+def schedule_rendered_index_reconcile(board: str, bucket):
+    """
+    Reconcile `board` on a background thread (one at a time per board).
+    """
+    with _index_lock:
+        if board in _reconciling:
+            return
+        _reconciling.add(board)
+
+    def run():
+        try:
+            reconcile_rendered_index(board, bucket)
+        except Exception as e:
+            with _index_lock:
+                _stats["reconcile_failures"] += 1
+            print(f"⚠️ Rendered image index reconcile failed for '{board}': {e}")
+        finally:
+            with _index_lock:
+                _reconciling.discard(board)
+
+    threading.Thread(target=run, name=f"rendered-index-{board}", daemon=True).start()
+
+
+def get_rendered_index_stats() -> dict:
+    with _index_lock:
+        return {
+            **_stats,
+            "boards": {
+                board: {"objects": len(names), "reconciled_at": _reconciled_at.get(board)}
+                for board, names in _index.items()
+            },
+        }
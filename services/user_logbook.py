@@ -0,0 +1,416 @@
+import time
+import hashlib
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator
+
+import pandas as pd
+import boardlib.api.aurora
+import boardlib.api.moon
+import boardlib.db.aurora
+
+from config import get_settings
+from services.aurora_sync import fetch_sync_pages
+from services.aurora_sessions import call_with_aurora_session
+from services.build_sqlite import build_or_download_board_db
+from services.logbook_store import open_logbook_store
+
+settings = get_settings()
+
+# ---------------------------------------------------
+#  User logbook (in-process boardlib)
+# ---------------------------------------------------
+#
+# Raw ascents/bids are synced incrementally (Aurora user_syncs watermark)
+# into the user's local store, then the logbook is recomputed in-process
+# with boardlib's own helpers, on a bounded pool. Moon boards have no
+# sync API: boardlib.api.moon fetches the whole logbook each time and it
+# is diffed against the same kind of store. Rows are limited to the
+# CLI's CSV columns and values are rendered the way its csv writer did
+# (str(), None → ""), so the response shape is unchanged.
+
+LOGBOOK_FIELDS = (
+    "board",
+    "angle",
+    "climb_name",
+    "date",
+    "logged_grade",
+    "displayed_grade",
+    "is_benchmark",
+    "tries",
+    "is_mirror",
+    "sessions_count",
+    "tries_total",
+    "is_repeat",
+    "is_ascent",
+    "comment",
+)
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.logbook_workers,
+    thread_name_prefix="logbook",
+)
+
+# batches get their own pool: a 200-account batch queues behind itself,
+# not in front of interactive /fetch-user-board-data requests
+_batch_executor = ThreadPoolExecutor(
+    max_workers=settings.logbook_batch_workers,
+    thread_name_prefix="logbook-batch",
+)
+
+
+_board_slots: dict[str, threading.BoundedSemaphore] = {}
+_board_next_start: dict[str, float] = {}
+_board_lock = threading.Lock()
+
+
+def _check_deadline(deadline: float, what: str):
+    if time.monotonic() >= deadline:
+        raise TimeoutError(f"Logbook sync timed out {what}")
+
+
+@contextmanager
+def _board_rate_limit(board: str, deadline: float):
+    """
+    At most settings.logbook_board_concurrency Aurora syncs per board, and
+    starts spaced by settings.logbook_board_min_interval_seconds. Waiting
+    for a slot stops at `deadline` (TimeoutError).
+    """
+    with _board_lock:
+        slot = _board_slots.setdefault(
+            board, threading.BoundedSemaphore(settings.logbook_board_concurrency)
+        )
+    if not slot.acquire(timeout=max(0.0, deadline - time.monotonic())):
+        raise TimeoutError(f"Logbook sync timed out waiting for a '{board}' Aurora slot")
+    try:
+        with _board_lock:
+            now = time.monotonic()
+            start = max(now, _board_next_start.get(board, 0.0))
+            _board_next_start[board] = start + settings.logbook_board_min_interval_seconds
+        if start > now:
+            time.sleep(min(start, deadline) - now)
+            _check_deadline(deadline, f"waiting for a '{board}' Aurora slot")
+        yield
+    finally:
+        slot.release()
+
+
+def is_moon_board(board: str) -> bool:
+    return board in boardlib.api.moon.BOARD_IDS
+
+
+def is_logbook_board(board: str) -> bool:
+    return board in boardlib.api.aurora.HOST_BASES or is_moon_board(board)
+
+
+def _csv_value(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _logbook_dataframe(board: str, db_path: str, raw_bids: list[dict], raw_ascents: list[dict]) -> pd.DataFrame:
+    """
+    boardlib.api.aurora.logbook_entries, fed from stored rows instead of
+    a full /sync of the user's history.
+    """
+    aurora = boardlib.api.aurora
+    bids_entries = [
+        {
+            "climb_uuid": bid["climb_uuid"],
+            "user_id": bid["user_id"],
+            "climb_name": boardlib.db.aurora.get_climb_name(db_path, bid["climb_uuid"]),
+            "angle": bid["angle"],
+            "is_mirror": bid["is_mirror"],
+            "bid_count": bid["bid_count"],
+            "comment": bid["comment"],
+            "climbed_at": bid["climbed_at"],
+            "created_at": bid["created_at"],
+        }
+        for bid in raw_bids
+    ]
+    if not bids_entries and not raw_ascents:
+        return pd.DataFrame(columns=list(LOGBOOK_FIELDS))
+
+    if bids_entries:
+        bids_df = pd.DataFrame(bids_entries)
+        bids_df["climbed_at"] = pd.to_datetime(bids_df["climbed_at"])
+        bids_summary = aurora.summarize_bids(bids_df, board)
+    else:
+        bids_summary = pd.DataFrame(
+            columns=["climb_uuid", "climb_name", "date", "is_mirror", "angle", "tries", "board"]
+        )
+
+    ascents_df = pd.DataFrame(
+        aurora.process_raw_ascent_entries(raw_ascents, board, db_path),
+        columns=[
+            "board", "angle", "climb_uuid", "name", "date", "logged_grade",
+            "displayed_grade", "is_benchmark", "tries", "is_mirror", "comment",
+        ],
+    )
+
+    logbook = pd.DataFrame(
+        aurora.combine_ascents_and_bids(ascents_df, bids_summary, db_path),
+        columns=[
+            "climb_angle_uuid", "board", "angle", "climb_name", "date", "logged_grade",
+            "displayed_grade", "is_benchmark", "tries", "is_mirror", "is_ascent", "comment",
+        ],
+    )
+    if logbook.empty:
+        return pd.DataFrame(columns=list(LOGBOOK_FIELDS))
+
+    # boardlib's own per-group helpers, over the groups directly:
+    # groupby.apply drops the group columns on pandas 3
+    logbook["date"] = pd.to_datetime(logbook["date"])
+    group_keys = ["climb_name", "is_mirror", "angle"]
+    groups = [group for _, group in logbook.groupby(group_keys)]
+    if not groups:
+        return pd.DataFrame(columns=list(LOGBOOK_FIELDS))
+    logbook = pd.concat(
+        [aurora.calculate_tries_total(aurora.calculate_sessions_count(group)) for group in groups],
+        ignore_index=True,
+    )
+    logbook["is_repeat"] = logbook.duplicated(subset=group_keys, keep="first")
+    return logbook.sort_values(by="date", kind="stable")
+
+
+def to_logbook_entries(rows: list[dict]) -> list[dict]:
+    """
+    Drop rows without date/climb_name and attach board_attempt_id and a
+    unique entry_id.
+    """
+    logbook: list[dict] = []
+    for row in rows:
+        # Defensive: boardlib *should* include climb_name, but it’s the crash point right now.
+        # If it’s missing in some future format, skip row safely.
+        date = (row.get("date") or "").strip()
+        climb_name = (row.get("climb_name") or "").strip()
+
+        if not date or not climb_name:
+            continue
+
+        tries_total = (row.get("tries_total") or "1").strip()
+        sessions_count = (row.get("sessions_count") or "1").strip()
+
+        row["board_attempt_id"] = f"{date}|{climb_name}|{tries_total}|{sessions_count}"
+        logbook.append(row)
+
+    # board_attempt_id isn't unique (e.g. one climb at two angles on the
+    # same day), so entry_id adds the angle and mirror side: "<id>#40",
+    # "<id>#40-mirror". Editing or removing one of them leaves the others'
+    # ids alone. Rows that still collide are numbered in fetch order
+    # ("<id>#40-2", …).
+    seen: dict[str, int] = defaultdict(int)
+    for row in logbook:
+        entry_id = f"{row['board_attempt_id']}#{(row.get('angle') or '').strip()}"
+        if (row.get("is_mirror") or "").strip().lower() in ("true", "1"):
+            entry_id += "-mirror"
+        seen[entry_id] += 1
+        row["entry_id"] = entry_id if seen[entry_id] == 1 else f"{entry_id}-{seen[entry_id]}"
+    return logbook
+
+
+def _moon_store_id(username: str) -> str:
+    # Moon has no numeric user id; keep usernames out of file names
+    return "moon-" + hashlib.sha256(username.lower().encode()).hexdigest()[:24]
+
+
+def _sync_moon_logbook(
+    board: str,
+    username: str,
+    password: str,
+    since_sync: int | None,
+    deadline: float,
+) -> dict:
+    rows = []
+    with _board_rate_limit(board, deadline):
+        for entry in boardlib.api.moon.logbook_entries(board, username, password):
+            _check_deadline(deadline, "fetching the Moon logbook")
+            rows.append({k: _csv_value(entry.get(k)) for k in LOGBOOK_FIELDS})
+
+    with open_logbook_store(board, _moon_store_id(username)) as store:
+        sync = store.record_sync(len(rows), to_logbook_entries(rows))
+        return {
+            **sync,
+            "fetched_rows": len(rows),
+            "entries": store.entries(since_sync),
+            "removed_ids": store.removed_since(since_sync) if since_sync is not None else [],
+        }
+
+
+def _sync_user_logbook(
+    board: str,
+    username: str,
+    password: str,
+    db_path: str | None,
+    since_sync: int | None,
+    deadline: float,
+) -> dict:
+    """
+    Stops with TimeoutError once `deadline` (time.monotonic()) passes;
+    pages stored before that are kept for the next sync.
+    """
+    started = time.perf_counter()
+    _check_deadline(deadline, "waiting for a logbook worker")
+
+    if is_moon_board(board):
+        result = _sync_moon_logbook(board, username, password, since_sync, deadline)
+        print(
+            f"📘 Moon logbook sync for '{board}' user={username}: {result['fetched_rows']} rows, "
+            f"+{result['added']} / ~{result['updated']} / -{result['removed']} entries in {time.perf_counter() - started:.1f}s"
+        )
+        return result
+
+    def sync(session: dict) -> dict:
+        with open_logbook_store(board, session["user_id"]) as store:
+            fetched = 0
+            with _board_rate_limit(board, deadline):
+                for page in fetch_sync_pages(
+                    board, store.watermarks(), token=session["token"], deadline=deadline
+                ):
+                    fetched += store.apply_page(page)
+
+            entries = None
+            if fetched or not store.has_entries():
+                _check_deadline(deadline, "before rebuilding the logbook")
+                df = _logbook_dataframe(board, db_path, store.raw_rows("bids"), store.raw_rows("ascents"))
+                rows = [
+                    {k: _csv_value(entry.get(k)) for k in LOGBOOK_FIELDS}
+                    for entry in df.to_dict(orient="records")
+                ]
+                entries = to_logbook_entries(rows)
+
+            sync = store.record_sync(fetched, entries)
+            return {
+                **sync,
+                "fetched_rows": fetched,
+                "entries": store.entries(since_sync),
+                "removed_ids": store.removed_since(since_sync) if since_sync is not None else [],
+            }
+
+    # a rejected token fails the first /sync request, before any page is stored
+    result = call_with_aurora_session(board, username, password, sync)
+
+    print(
+        f"📘 Logbook sync for '{board}' user={username}: {result['fetched_rows']} new rows, "
+        f"+{result['added']} / ~{result['updated']} / -{result['removed']} entries in {time.perf_counter() - started:.1f}s"
+    )
+    return result
+
+
+def sync_user_logbook(
+    board: str,
+    username: str,
+    password: str,
+    db_path: str | None,
+    *,
+    since_sync: int | None = None,
+) -> dict:
+    """
+    Incrementally sync the user's logbook store and return
+    {"sync_id", "added", "updated", "removed", "fetched_rows", "entries",
+    "removed_ids"}. `entries` is everything, or only entries added or
+    changed after `since_sync`; `removed_ids` are entry_ids. Moon boards
+    need no board DB (db_path=None).
+    Raises ValueError for bad credentials / unknown boards, TimeoutError
+    past the configured limit.
+    """
+    if not is_logbook_board(board):
+        raise ValueError(f"Unknown board {board}")
+
+    # the worker stops itself at the deadline; the result wait is only a backstop
+    deadline = time.monotonic() + settings.logbook_timeout_seconds
+    future = _executor.submit(_sync_user_logbook, board, username, password, db_path, since_sync, deadline)
+    return future.result(timeout=settings.logbook_timeout_seconds + 5)
+
+
+# ---------------------------------------------------
+#  Batch (many linked accounts)
+# ---------------------------------------------------
+
+def _resolve_batch_dbs(accounts: list[dict]) -> dict[str, str | Exception]:
+    """
+    Board → logbook-capable DB path (or the build error), resolved once
+    per board with the first of its accounts that has a password.
+    """
+    resolved: dict[str, str | Exception] = {}
+    for account in accounts:
+        board = account["board"]
+        if board in resolved or not account["password"]:
+            continue
+        if not is_logbook_board(board) or is_moon_board(board):
+            continue
+        try:
+            resolved[board] = build_or_download_board_db(
+                board=board,
+                username=account["username"],
+                password=account["password"],
+                require="logbook",
+            )
+        except Exception as e:
+            print(f"❌ Batch DB build failed for '{board}': {e}")
+            resolved[board] = e
+    return resolved
+
+
+def _sync_account(account: dict, submitted_at: float, db_path: str | Exception | None) -> dict:
+    started = time.time()
+    board = account["board"]
+    out = {
+        "index": account["index"],
+        "board": board,
+        "username": account["username"],
+        "queue_seconds": round(started - submitted_at, 3),
+    }
+    try:
+        if not is_logbook_board(board):
+            raise ValueError(f"Unknown board {board}")
+        if not account["password"]:
+            raise ValueError(f"Password required for '{board}' logbook")
+        if isinstance(db_path, Exception):
+            raise RuntimeError(f"DB build failed: {db_path}")
+        result = _sync_user_logbook(
+            board,
+            account["username"],
+            account["password"],
+            db_path,
+            account.get("since_sync"),
+            time.monotonic() + settings.logbook_timeout_seconds,
+        )
+        out.update(
+            status="ok",
+            count=len(result["entries"]),
+            sync_id=result["sync_id"],
+            fetched_rows=result["fetched_rows"],
+            entries=result["entries"],
+        )
+        if account.get("since_sync") is not None:
+            out["removed"] = result["removed_ids"]
+    except Exception as e:
+        print(f"❌ Batch logbook sync failed for '{board}' user={account['username']}: {e}")
+        out.update(status="failed", error=f"{type(e).__name__}: {e}")
+    out["seconds"] = round(time.time() - started, 3)
+    return out
+
+
+def iter_logbook_batch(accounts: list[dict]) -> Iterator[dict]:
+    """
+    Resolve each board's DB once, then run every account on the batch
+    pool and yield each result as it finishes. A failure is reported in
+    that account's result only. Closing the iterator early cancels
+    accounts that haven't started.
+    """
+    db_paths = _resolve_batch_dbs(accounts)
+    submitted_at = time.time()
+    futures = [
+        _batch_executor.submit(
+            _sync_account, {**account, "index": i}, submitted_at, db_paths.get(account["board"])
+        )
+        for i, account in enumerate(accounts)
+    ]
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
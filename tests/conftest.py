@@ -0,0 +1,76 @@
+import os
+import sys
+import sqlite3
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# config.get_settings() is read at import time by every service module
+os.environ.setdefault("PUBLIC_SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "x" * 40)
+os.environ.setdefault("BOARD_ARTIFACT_STORE", "none")
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Run in an empty directory: server/… cache paths are relative.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def make_board_db(path: str, climbs: int = 50) -> str:
+    """
+    A small Aurora-shaped board DB (catalog + logbook capable).
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE product_sizes_layouts_sets (
+            id INTEGER PRIMARY KEY, product_size_id INT, layout_id INT, set_id INT,
+            image_filename TEXT, is_listed INT
+        );
+        CREATE TABLE climbs (
+            uuid TEXT PRIMARY KEY, layout_id INT, setter_id INT, setter_username TEXT,
+            name TEXT, description TEXT, hsm INT, edge_left INT, edge_right INT,
+            edge_bottom INT, edge_top INT, angle INT, frames_count INT, frames_pace INT,
+            frames TEXT, is_draft INT, is_listed INT, created_at TEXT,
+            product_sizes_layouts_set_id INT
+        );
+        CREATE TABLE climb_stats (
+            climb_uuid TEXT, angle INT, display_difficulty REAL, benchmark_difficulty REAL,
+            ascensionist_count INT, difficulty_average REAL, quality_average REAL,
+            fa_username TEXT, fa_at TEXT, PRIMARY KEY (climb_uuid, angle)
+        );
+        CREATE TABLE difficulty_grades (
+            difficulty INT PRIMARY KEY, boulder_name TEXT, route_name TEXT, is_listed INT
+        );
+        CREATE TABLE shared_syncs (table_name TEXT PRIMARY KEY, last_synchronized_at TEXT);
+        CREATE TABLE layouts (id INTEGER PRIMARY KEY, product_id INT, name TEXT, is_listed INT);
+    """)
+    conn.execute(
+        "INSERT INTO product_sizes_layouts_sets VALUES (1, 1, 1, 1, 'product_sizes_layouts_sets/1.png', 1)"
+    )
+    for grade in range(10, 30):
+        conn.execute("INSERT INTO difficulty_grades VALUES (?, ?, '', 1)", (grade, f"V{grade - 10}"))
+    for i in range(climbs):
+        conn.execute(
+            "INSERT INTO climbs (uuid, layout_id, setter_id, setter_username, name, hsm, angle, "
+            "frames, is_draft, is_listed, created_at, product_sizes_layouts_set_id) "
+            "VALUES (?, 1, ?, ?, ?, 3, 40, 'p1r12p2r13', 0, 1, ?, 1)",
+            (f"u{i:05d}", i % 7, f"setter{i % 7}", f"Climb {i}", f"2024-01-{1 + i % 28:02d} 00:00:00"),
+        )
+        for angle in (30, 40):
+            conn.execute(
+                "INSERT INTO climb_stats VALUES (?, ?, ?, NULL, ?, ?, ?, 'fa', '2024-01-01')",
+                (f"u{i:05d}", angle, 10 + i % 20, i * 3 % 97, 10 + i % 20, 1 + i % 3),
+            )
+    for table in ("climbs", "climb_stats"):
+        conn.execute("INSERT INTO shared_syncs VALUES (?, '2024-01-01 00:00:00.000000')", (table,))
+    conn.commit()
+    conn.close()
+    return path
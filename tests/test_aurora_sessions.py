@@ -0,0 +1,50 @@
+import threading
+import time
+import urllib.error
+
+import pytest
+
+from services import aurora_sessions as s
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    with s._sessions_lock:
+        s._sessions.clear()
+    yield
+    with s._sessions_lock:
+        s._sessions.clear()
+
+
+def test_concurrent_logins_for_one_account_log_in_once(monkeypatch):
+    logins = []
+
+    def login(board, username, password):
+        logins.append(username)
+        time.sleep(0.05)
+        return {"token": "t", "user_id": 1}
+    monkeypatch.setattr(s, "aurora_login", login)
+
+    threads = [
+        threading.Thread(target=s.get_aurora_session, args=("kilter", "alice", "pw"))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert logins == ["alice"]
+
+
+def test_failed_logins_leave_no_lock_behind(monkeypatch):
+    def login(board, username, password):
+        raise urllib.error.HTTPError("", 401, "Unauthorized", None, None)
+    monkeypatch.setattr(s, "aurora_login", login)
+
+    for i in range(500):
+        with pytest.raises(urllib.error.HTTPError):
+            s.get_aurora_session("kilter", f"user{i}", "wrong")
+
+    assert len(s._login_locks) == s.LOGIN_LOCK_STRIPES
+    assert s.get_session_cache_stats()["cached"] == 0
@@ -0,0 +1,67 @@
+import time
+import types
+
+import pytest
+
+from conftest import make_board_db
+from services import board_artifacts
+from services import build_sqlite as b
+
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture
+def artifact_store(workdir, monkeypatch):
+    monkeypatch.setattr(b.settings, "board_artifact_store", f"local:{workdir / 'bucket'}")
+    monkeypatch.setattr(b.settings, "board_db_ttl_seconds", DAY)
+    monkeypatch.setattr(b.settings, "board_db_ttl_overrides", {})
+    board_artifacts.get_artifact_store.cache_clear()
+    # publishing re-uploads in a background thread; not under test here
+    monkeypatch.setattr(b, "upload_to_supabase", lambda board, path: None)
+    yield
+    board_artifacts.get_artifact_store.cache_clear()
+
+
+def _fake_boardlib(monkeypatch):
+    def run(cmd, **kwargs):
+        make_board_db(cmd[5])
+        return types.SimpleNamespace(returncode=0, stdout="", stderr="")
+    monkeypatch.setattr(b.subprocess, "run", run)
+
+
+def test_downloaded_old_artifact_is_stale(artifact_store, workdir, monkeypatch):
+    src = make_board_db(str(workdir / "src.db"))
+    built_at = time.time() - 10 * DAY
+    board_artifacts.upload_board_artifact("decoy", src, board_artifacts.file_sha256(src), built_at=built_at)
+
+    def no_boardlib(cmd, **kwargs):
+        raise AssertionError("expected the artifact to be used")
+    monkeypatch.setattr(b.subprocess, "run", no_boardlib)
+
+    path = b.build_or_download_board_db("decoy", require="catalog")
+
+    # stats / optimize rewrote the file after the download
+    assert b.get_db_manifest(path)["key"]["mtime_ns"] / 1e9 > built_at + DAY
+    assert b.generation_built_at(path) == pytest.approx(built_at)
+    assert b.is_generation_stale("decoy", path)
+
+
+def test_artifact_without_built_at_uses_upload_time(artifact_store, workdir, monkeypatch):
+    src = make_board_db(str(workdir / "src.db"))
+    board_artifacts.upload_board_artifact("decoy", src, board_artifacts.file_sha256(src))
+    store = board_artifacts.get_artifact_store()
+    remote = store.read_json("decoy/manifest.json")
+    store.write_json("decoy/manifest.json", {**remote, "built_at": None, "uploaded_at": time.time() - 3 * DAY})
+
+    path = b.build_or_download_board_db("decoy", require="catalog")
+
+    assert b.is_generation_stale("decoy", path)
+
+
+def test_fresh_build_is_not_stale(artifact_store, monkeypatch):
+    _fake_boardlib(monkeypatch)
+
+    path = b.build_or_download_board_db("decoy", require="catalog")
+
+    assert time.time() - b.generation_built_at(path) < 60
+    assert not b.is_generation_stale("decoy", path)
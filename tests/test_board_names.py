@@ -0,0 +1,33 @@
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from routes.board_db import resolve_board_db
+from services import build_sqlite as b
+from services.board_jobs import submit_board_db_job
+
+
+@pytest.mark.parametrize("board", ["*", "k*", "kil?er", "[k]ilter", "../kilter", "kilter/x", "", "kilter board"])
+def test_invalid_board_names_are_rejected(workdir, board):
+    with pytest.raises(ValueError):
+        b.build_or_download_board_db(board)
+    with pytest.raises(ValueError):
+        submit_board_db_job(board)
+    with pytest.raises(HTTPException) as e:
+        resolve_board_db(board, require="catalog")
+    assert e.value.status_code == 400
+
+
+def test_generation_cleanup_only_matches_its_own_board(workdir):
+    os.makedirs(b.GENERATIONS_DIR)
+    other = os.path.join(b.GENERATIONS_DIR, "kilter.20240101T000000-abcd.db")
+    for path in (other, other + b.BUILDING_SUFFIX):
+        open(path, "w").close()
+        os.utime(path, (0, 0))
+
+    b.discard_partial_builds("k*")
+    assert b.gc_board_generations("k*", grace_seconds=0) == 0
+
+    assert os.path.exists(other)
+    assert os.path.exists(other + b.BUILDING_SUFFIX)
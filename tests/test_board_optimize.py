@@ -0,0 +1,80 @@
+import sqlite3
+
+from conftest import make_board_db
+from services import build_sqlite as b
+from services.board_stats import get_board_stats
+
+
+def _publish_legacy_db(board: str) -> str:
+    # a generation built before the stats / optimize stages existed
+    path = make_board_db(b.new_generation_path(board))
+    b.publish_generation(board, path)
+    return path
+
+
+def test_legacy_db_is_reprocessed_on_resolve(workdir, monkeypatch):
+    monkeypatch.setattr(b, "upload_to_supabase", lambda board, path: None)
+
+    def no_boardlib(cmd, **kwargs):
+        raise AssertionError("reprocessing must not fetch from Aurora")
+    monkeypatch.setattr(b.subprocess, "run", no_boardlib)
+
+    scheduled = []
+    monkeypatch.setattr(b, "schedule_board_refresh", lambda board, **kw: scheduled.append(kw))
+
+    legacy = _publish_legacy_db("decoy")
+    assert b.needs_optimize(legacy)
+    assert get_board_stats("decoy", legacy) is None
+
+    assert b.get_ready_board_db("decoy") == legacy
+    assert scheduled == [{"require": "catalog", "reprocess": True}]
+
+    path = b._single_flight_build(
+        "decoy",
+        require="catalog",
+        capability="catalog",
+        username=None,
+        password=None,
+        refresh=True,
+        reprocess=True,
+    )
+
+    assert path != legacy
+    assert b.current_generation_path("decoy") == path
+    manifest = b.get_db_manifest(path)
+    assert manifest["optimized"]["version"] == b.OPTIMIZE_VERSION
+    assert get_board_stats("decoy", path) is not None
+    assert not b.needs_optimize(path)
+    # same data: the reprocessed copy keeps the generation's age
+    assert b.generation_built_at(path) == b.generation_built_at(legacy)
+
+    scheduled.clear()
+    assert b.get_ready_board_db("decoy") == path
+    assert scheduled == []
+
+
+def test_older_optimize_version_needs_optimize(workdir):
+    path = _publish_legacy_db("decoy")
+    b.update_db_manifest(path, optimized={"version": b.OPTIMIZE_VERSION - 1})
+    assert b.needs_optimize(path)
+
+    b.update_db_manifest(path, optimized={"version": b.OPTIMIZE_VERSION})
+    assert not b.needs_optimize(path)
+
+
+def test_query_plan_error_is_a_problem(workdir):
+    path = make_board_db(str(workdir / "x.db"))
+    conn = sqlite3.connect(path)
+    conn.execute("ALTER TABLE climbs RENAME COLUMN product_sizes_layouts_set_id TO set_id")
+    conn.commit()
+
+    problems = b.check_query_plans(conn)
+
+    assert problems["climbs_by_set"][0].startswith("error: ")
+
+
+def test_query_plans_skip_absent_tables(workdir):
+    conn = sqlite3.connect(str(workdir / "geometry.db"))
+    conn.execute("CREATE TABLE holes (id INTEGER PRIMARY KEY)")
+
+    assert b.check_query_plans(conn) == {}
@@ -0,0 +1,67 @@
+import sqlite3
+import time
+import types
+
+import pytest
+
+from conftest import make_board_db
+from services import build_sqlite as b
+
+
+def _add_geometry(path: str) -> str:
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE problems (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE problem_holds (problem_id INT, hold_id INT);
+        CREATE TABLE holds (id INTEGER PRIMARY KEY, x INT, y INT);
+    """)
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def stale_board(workdir, monkeypatch):
+    monkeypatch.setattr(b.settings, "board_db_ttl_seconds", 60)
+    monkeypatch.setattr(b.settings, "board_db_ttl_overrides", {})
+    monkeypatch.setattr(b, "upload_to_supabase", lambda board, path: None)
+
+    current = _add_geometry(make_board_db(b.new_generation_path("decoy")))
+    b.publish_generation("decoy", current)
+    b.update_db_manifest(current, built_at=time.time() - 3600)
+    assert {"catalog", "geometry", "public"} <= b.db_capabilities(current)
+    assert b.is_generation_stale("decoy", current)
+    return current
+
+
+def _refresh(monkeypatch, build):
+    def run(cmd, **kwargs):
+        build(cmd[5])
+        return types.SimpleNamespace(returncode=0, stdout="", stderr="")
+    monkeypatch.setattr(b.subprocess, "run", run)
+
+    return b._build_board_db(
+        "decoy",
+        require="catalog",
+        capability="catalog",
+        username=None,
+        password=None,
+        refresh=True,
+        sync_mode="full",
+    )
+
+
+def test_refresh_losing_a_capability_is_not_published(stale_board, monkeypatch):
+    # catalog-capable, but without the geometry tables the current DB has
+    with pytest.raises(RuntimeError, match="geometry"):
+        _refresh(monkeypatch, make_board_db)
+
+    assert b.current_generation_path("decoy") == stale_board
+
+
+def test_refresh_keeping_capabilities_is_published(stale_board, monkeypatch):
+    path = _refresh(monkeypatch, lambda p: _add_geometry(make_board_db(p)))
+
+    assert path != stale_board
+    assert b.current_generation_path("decoy") == path
+    assert b.db_capabilities(stale_board) <= b.db_capabilities(path)
@@ -0,0 +1,141 @@
+import json
+import sqlite3
+import threading
+import time
+import types
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import make_board_db
+from services import aurora_sessions
+from services import aurora_sync
+from services import build_sqlite as b
+
+
+class _Aurora(BaseHTTPRequestHandler):
+    """
+    Stand-in for an Aurora host: /sessions logs anyone in, /sync serves
+    `pages` in order (then an empty complete page).
+    """
+    pages: list[dict] = []
+    syncs: list[dict] = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        if self.path == "/sessions":
+            out = {"session": {"token": "tok", "user_id": 1}}
+        else:
+            _Aurora.syncs.append(urllib.parse.parse_qs(body))
+            out = _Aurora.pages.pop(0) if _Aurora.pages else {"_complete": True}
+        data = json.dumps(out).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def aurora(workdir, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Aurora)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _Aurora.pages, _Aurora.syncs = [], []
+    monkeypatch.setattr(aurora_sync.settings, "aurora_api_base_url", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(aurora_sync.settings, "aurora_max_sync_pages", 2)
+    with aurora_sessions._sessions_lock:
+        aurora_sessions._sessions.clear()
+    yield _Aurora
+    server.shutdown()
+
+
+@pytest.fixture
+def stale_board(workdir, monkeypatch):
+    monkeypatch.setattr(b.settings, "board_db_ttl_seconds", 60)
+    monkeypatch.setattr(b.settings, "board_db_ttl_overrides", {})
+    monkeypatch.setattr(b, "upload_to_supabase", lambda board, path: None)
+
+    current = make_board_db(b.new_generation_path("decoy"))
+    b.publish_generation("decoy", current)
+    b.update_db_manifest(current, built_at=time.time() - 3600)
+
+    full_builds = []
+
+    def boardlib(cmd, **kwargs):
+        full_builds.append(cmd[5])
+        make_board_db(cmd[5], climbs=60)
+        return types.SimpleNamespace(returncode=0, stdout="", stderr="")
+    monkeypatch.setattr(b.subprocess, "run", boardlib)
+    return types.SimpleNamespace(path=current, full_builds=full_builds)
+
+
+def _refresh(username=None, password=None):
+    return b._build_board_db(
+        "decoy",
+        require="catalog",
+        capability="catalog",
+        username=username,
+        password=password,
+        refresh=True,
+        sync_mode="delta",
+    )
+
+
+def _climb_count(path: str) -> int:
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM climbs").fetchone()[0]
+
+
+def _climb_page(uuid: str, complete: bool) -> dict:
+    page = {
+        "climbs": [{"uuid": uuid, "layout_id": 1, "name": "New", "angle": 40}],
+        "shared_syncs": [{"table_name": "climbs", "last_synchronized_at": "2024-02-01 00:00:00.000000"}],
+    }
+    if complete:
+        page["_complete"] = True
+    return page
+
+
+def test_delta_without_credentials_runs_full_build(aurora, stale_board):
+    path = _refresh()
+
+    assert aurora.syncs == []  # no /sync request that would only get a 401
+    assert len(stale_board.full_builds) == 1
+    assert _climb_count(path) == 60
+
+
+def test_delta_applies_changed_rows(aurora, stale_board):
+    aurora.pages = [_climb_page("new1", complete=True)]
+
+    path = _refresh("alice", "pw")
+
+    assert stale_board.full_builds == []
+    assert _climb_count(path) == 51
+
+
+def test_partial_sync_rolls_back_and_falls_back_to_full_build(aurora, stale_board):
+    # never `_complete` within aurora_max_sync_pages
+    aurora.pages = [_climb_page("new1", complete=False), _climb_page("new2", complete=False)]
+    before = b.get_db_content_hash(stale_board.path)
+
+    path = _refresh("alice", "pw")
+
+    assert len(aurora.syncs) >= 2
+    assert len(stale_board.full_builds) == 1
+    assert _climb_count(path) == 60
+    assert b.get_db_content_hash(stale_board.path) == before
+    assert b.get_build_stats()["delta_syncs_failed"] >= 1
+
+
+def test_partial_sync_leaves_db_untouched(aurora, workdir):
+    path = make_board_db(str(workdir / "x.db"))
+    aurora.pages = [_climb_page("new1", complete=False), _climb_page("new2", complete=False)]
+
+    with pytest.raises(RuntimeError, match="not complete"):
+        aurora_sync.delta_sync_board_db("decoy", path, token="tok")
+
+    assert _climb_count(path) == 50
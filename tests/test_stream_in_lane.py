@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from routes.board_db import stream_in_lane
+from services import admission
+
+
+def _running(lane: str) -> int:
+    return admission.get_admission_stats()[lane]["running"]
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_slot_released_before_slow_client_reads():
+    produced = threading.Event()
+
+    def chunks():
+        yield "a"
+        yield "b"
+        yield "c"
+        produced.set()
+
+    body = stream_in_lane("read", chunks())
+
+    # nothing read yet, but the query is done → the slot is back
+    assert produced.wait(5)
+    _wait_for(lambda: _running("read") == 0)
+    assert list(body) == ["a", "b", "c"]
+
+
+def test_first_chunk_error_raised_before_response():
+    def chunks():
+        raise ValueError("bad filter")
+        yield
+
+    with pytest.raises(ValueError):
+        stream_in_lane("read", chunks())
+    assert _running("read") == 0
+
+
+def test_later_error_aborts_the_stream():
+    def chunks():
+        yield "a"
+        raise RuntimeError("cursor died")
+
+    body = stream_in_lane("read", chunks())
+
+    assert next(body) == "a"
+    with pytest.raises(RuntimeError, match="cursor died"):
+        next(body)
+    _wait_for(lambda: _running("read") == 0)
+
+
+def test_closed_body_stops_the_producer():
+    release = threading.Event()
+    closed = threading.Event()
+
+    def chunks():
+        try:
+            yield "a"
+            release.wait(5)
+            while True:
+                yield "x"
+        finally:
+            closed.set()
+
+    body = stream_in_lane("read", chunks())
+    assert next(body) == "a"
+    body.close()
+    release.set()
+
+    assert closed.wait(5)
+    _wait_for(lambda: _running("read") == 0)
+
+
+def test_full_lane_is_503(monkeypatch):
+    lane = admission._lanes["read"]
+    monkeypatch.setattr(lane, "running", lane.concurrency)
+    monkeypatch.setattr(lane, "max_queue", 0)
+
+    with pytest.raises(HTTPException) as e:
+        stream_in_lane("read", iter(["a"]))
+    assert e.value.status_code == 503
@@ -0,0 +1,197 @@
+import time
+import threading
+
+import boardlib.api.moon
+import pytest
+
+from conftest import make_board_db
+from services import user_logbook
+
+
+def _ascent(uuid, climb, at, angle=40, attempt_id=0, bid_count=1):
+    return {
+        "uuid": uuid, "climb_uuid": climb, "angle": angle, "is_mirror": False, "user_id": 7,
+        "attempt_id": attempt_id, "bid_count": bid_count, "quality": 3, "difficulty": 15,
+        "is_benchmark": 0, "comment": "", "climbed_at": at, "created_at": at, "is_listed": 1,
+    }
+
+
+def _bid(uuid, climb, at, count, angle=40):
+    return {
+        "uuid": uuid, "climb_uuid": climb, "angle": angle, "is_mirror": False, "user_id": 7,
+        "bid_count": count, "comment": "", "climbed_at": at, "created_at": at, "is_listed": 1,
+    }
+
+
+def test_logbook_dataframe_sessions_and_tries(workdir):
+    db_path = make_board_db(str(workdir / "board.db"))
+    bids = [
+        _bid("b1", "u00001", "2024-01-01 10:00:00", 2),
+        _bid("b2", "u00001", "2024-01-01 18:00:00", 1),  # same day → one session
+        _bid("b3", "u00002", "2024-01-05 10:00:00", 4, angle=30),
+    ]
+    ascents = [
+        _ascent("a1", "u00001", "2024-01-03 10:00:00", bid_count=2),
+        _ascent("a2", "u00001", "2024-01-09 10:00:00", angle=30),
+        _ascent("a3", "u00001", "2024-01-10 10:00:00"),
+    ]
+
+    df = user_logbook._logbook_dataframe("kilter", db_path, bids, ascents)
+    rows = [
+        (r["climb_name"], r["angle"], str(r["date"].date()), r["tries"], r["sessions_count"],
+         r["tries_total"], r["is_repeat"], r["is_ascent"])
+        for r in df.to_dict(orient="records")
+    ]
+
+    assert rows == [
+        ("Climb 1", 40, "2024-01-01", 3, 1, 3, False, False),
+        ("Climb 1", 40, "2024-01-03", 2, 2, 5, True, True),
+        ("Climb 2", 30, "2024-01-05", 4, 1, 4, False, False),
+        ("Climb 1", 30, "2024-01-09", 1, 1, 1, False, True),
+        ("Climb 1", 40, "2024-01-10", 1, 3, 6, True, True),
+    ]
+
+
+def test_logbook_dataframe_empty(workdir):
+    db_path = make_board_db(str(workdir / "board.db"))
+    df = user_logbook._logbook_dataframe("kilter", db_path, [], [])
+    assert df.empty
+    assert list(df.columns) == list(user_logbook.LOGBOOK_FIELDS)
+
+
+def test_moon_logbook_needs_no_board_db(workdir, monkeypatch):
+    def moon_entries(board, username, password):
+        assert (board, username, password) == ("moon2019", "al", "pw")
+        for day in ("2024-01-01", "2024-01-02"):
+            yield {
+                "board": board, "angle": 40, "climb_name": "Moon Problem", "date": day,
+                "displayed_grade": "6B+", "logged_grade": "6B+", "is_benchmark": True,
+                "tries": "2", "is_mirror": False, "comment": "",
+            }
+    monkeypatch.setattr(boardlib.api.moon, "logbook_entries", moon_entries)
+
+    result = user_logbook.sync_user_logbook("moon2019", "al", "pw", None)
+
+    assert result["added"] == 2
+    assert [e["date"] for e in result["entries"]] == ["2024-01-01", "2024-01-02"]
+    assert {e["board"] for e in result["entries"]} == {"moon2019"}
+
+    again = user_logbook.sync_user_logbook("moon2019", "al", "pw", None, since_sync=result["sync_id"])
+    assert (again["added"], again["updated"], again["removed"], again["entries"]) == (0, 0, 0, [])
+
+
+def test_unknown_board_is_rejected():
+    with pytest.raises(ValueError):
+        user_logbook.sync_user_logbook("moon", "al", "pw", None)
+
+
+def test_batch_resolves_each_board_once_on_its_own_pool(monkeypatch):
+    builds = []
+    monkeypatch.setattr(
+        user_logbook, "build_or_download_board_db",
+        lambda board, **kwargs: builds.append(board) or f"/dbs/{board}.db",
+    )
+
+    release = threading.Event()
+    threads = []
+
+    def fake_sync(board, username, password, db_path, since_sync, deadline):
+        threads.append(threading.current_thread().name)
+        if username.startswith("batch"):
+            release.wait(5)
+        return {"entries": [{"db": db_path}], "sync_id": 1, "fetched_rows": 0, "removed_ids": []}
+    monkeypatch.setattr(user_logbook, "_sync_user_logbook", fake_sync)
+
+    accounts = [
+        {"board": board, "username": f"batch{i}", "password": "pw", "since_sync": None}
+        for i, board in enumerate(["kilter", "tension"] * 10)
+    ]
+    batch = user_logbook.iter_logbook_batch(accounts)
+    first = threading.Thread(target=lambda: next(batch))
+    first.start()
+    time.sleep(0.2)
+
+    # every batch worker is busy; a single sync still runs right away
+    single = user_logbook.sync_user_logbook("kilter", "solo", "pw", "/dbs/kilter.db")
+    assert single["sync_id"] == 1
+
+    release.set()
+    first.join(5)
+    results = list(batch)
+
+    assert sorted(builds) == ["kilter", "tension"]
+    assert len(results) == len(accounts) - 1
+    assert all(r["status"] == "ok" for r in results)
+    batch_threads = {t for t in threads if t.startswith("logbook-batch")}
+    assert 0 < len(batch_threads) <= user_logbook.settings.logbook_batch_workers
+    assert sum(t.startswith("logbook-batch") for t in threads) == len(accounts)
+
+
+def test_batch_reports_a_board_build_failure_on_its_accounts(monkeypatch):
+    def build(board, **kwargs):
+        raise RuntimeError("boardlib database build failed")
+    monkeypatch.setattr(user_logbook, "build_or_download_board_db", build)
+
+    results = list(user_logbook.iter_logbook_batch([
+        {"board": "kilter", "username": f"u{i}", "password": "pw", "since_sync": None}
+        for i in range(3)
+    ]))
+
+    assert [r["status"] for r in results] == ["failed"] * 3
+    assert all("DB build failed" in r["error"] for r in results)
+
+
+def _attempt(angle: str, is_mirror: str = "False", comment: str = "") -> dict:
+    # one climb logged at several angles on the same day: same board_attempt_id
+    return {
+        "board": "kilter", "angle": angle, "climb_name": "Same Climb",
+        "date": "2024-01-01 10:00:00", "tries": "1", "is_mirror": is_mirror,
+        "sessions_count": "1", "tries_total": "1", "comment": comment,
+    }
+
+
+def _sync(rows: list[dict]) -> dict:
+    with user_logbook.open_logbook_store("kilter", 1) as store:
+        return store.record_sync(len(rows), user_logbook.to_logbook_entries(rows))
+
+
+def _ids(rows: list[dict]) -> dict[str, str]:
+    return {e["entry_id"]: (e["angle"], e["is_mirror"]) for e in user_logbook.to_logbook_entries(rows)}
+
+
+def test_duplicate_attempts_get_ids_from_angle_and_mirror():
+    ids = _ids([_attempt("40"), _attempt("45"), _attempt("40", is_mirror="True")])
+
+    attempt_id = "2024-01-01 10:00:00|Same Climb|1|1"
+    assert ids == {
+        f"{attempt_id}#40": ("40", "False"),
+        f"{attempt_id}#45": ("45", "False"),
+        f"{attempt_id}#40-mirror": ("40", "True"),
+    }
+    # fetch order doesn't matter
+    assert _ids([_attempt("40", is_mirror="True"), _attempt("45"), _attempt("40")]) == ids
+
+
+def test_editing_a_duplicate_keeps_the_others(workdir):
+    _sync([_attempt("40"), _attempt("40", is_mirror="True")])
+
+    # a comment that sorts it after its mirrored twin
+    result = _sync([_attempt("40", comment="zzz"), _attempt("40", is_mirror="True")])
+
+    assert (result["added"], result["updated"], result["removed"]) == (0, 1, 0)
+
+
+def test_removing_a_duplicate_keeps_the_others(workdir):
+    _sync([_attempt("40"), _attempt("45"), _attempt("50")])
+
+    result = _sync([_attempt("45"), _attempt("50")])
+
+    assert (result["added"], result["updated"], result["removed"]) == (0, 0, 1)
+    with user_logbook.open_logbook_store("kilter", 1) as store:
+        assert store.removed_since(0) == ["2024-01-01 10:00:00|Same Climb|1|1#40"]
+
+
+def test_identical_duplicates_numbered_in_fetch_order():
+    entries = user_logbook.to_logbook_entries([_attempt("40", comment="a"), _attempt("40", comment="b")])
+
+    assert [(e["entry_id"].split("#")[1], e["comment"]) for e in entries] == [("40", "a"), ("40-2", "b")]